@@ -0,0 +1,128 @@
+"""
+Print the query plans of the hot TimerSession queries
+
+Fills the table with --users users of --sessions sessions each (one
+running or paused session for every other user), updates the planner
+statistics and prints EXPLAIN for the queries of TimerEngine, the heartbeat
+flush, the reaper, the rollup and the admin changelist. --migrate-to
+stops at an earlier migration to compare plans before and after an index
+change. Run from the repository root:
+
+    python benchmarks/session_query_plans.py [--users 500] [--sessions 200] [--migrate-to 0010]
+
+Uses test_settings (in-memory SQLite) unless DJANGO_SETTINGS_MODULE is set.
+"""
+import argparse
+import os
+import sys
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'test_settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.models import Count, Q, Sum  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from task_timer.models import TimerSession  # noqa: E402
+from task_timer.services.timer_engine import ACTIVE_STATUSES  # noqa: E402
+
+FIELDS = ['task', 'start_time', 'duration', 'status', 'created_by_id', 'last_seen', 'updated_at']
+
+
+def populate(users, sessions, migrate_to):
+    call_command('migrate', verbosity=0)
+    if migrate_to:
+        call_command('migrate', 'task_timer', migrate_to, verbosity=0)
+
+    User.objects.bulk_create([User(username=f'user{i}') for i in range(users)])
+    user_ids = list(User.objects.order_by('pk').values_list('pk', flat=True))
+    first = timezone.now() - timedelta(days=2 * sessions)
+
+    rows = []
+    for number, user_id in enumerate(user_ids):
+        for index in range(sessions):
+            start = first + timedelta(days=2 * index, minutes=number)
+            if index == sessions - 1 and number % 2:
+                status = 'running' if number % 4 == 1 else 'paused'
+            else:
+                status = 'completed' if index % 5 else 'stopped'
+            start = start.isoformat()
+            rows.append(f"('Task', '', 1500, 0, '{status}', {user_id}, '{start}', '{start}', '{start}')")
+
+    # Raw inserts, so the script runs against the schema of --migrate-to
+    table = TimerSession._meta.db_table
+    with connection.cursor() as cursor:
+        for offset in range(0, len(rows), 1000):
+            cursor.execute(
+                f'INSERT INTO {table} (task, notes, duration, pause_duration, status, created_by_id, '
+                f'start_time, updated_at, last_seen) VALUES ' + ', '.join(rows[offset:offset + 1000])
+            )
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'VACUUM ANALYZE {table}')
+        else:
+            cursor.execute('ANALYZE')
+
+    return user_ids[len(user_ids) // 2]
+
+
+def queries(user_id):
+    now = timezone.now()
+    month = now - timedelta(days=30)
+    sessions = TimerSession.objects.filter(created_by_id=user_id).only(*FIELDS)
+
+    return {
+        'get_active_session': sessions.filter(status__in=ACTIVE_STATUSES),
+        'get_stats (30 days)': (
+            TimerSession.objects.filter(created_by_id=user_id, start_time__gte=month, start_time__lt=now)
+            .order_by()
+            .values('created_by_id')
+            .annotate(
+                total=Count('start_time'),
+                completed=Count('start_time', filter=Q(status='completed')),
+                seconds=Sum('duration')
+            )
+        ),
+        'history page': sessions.order_by('-start_time', '-id')[:20],
+        'history page (status)': sessions.filter(status='completed').order_by('-start_time', '-id')[:20],
+        'flush_heartbeats': (
+            TimerSession.objects.filter(status='running', pk__gt=0).order_by('pk').only(*FIELDS)[:500]
+        ),
+        'reap_sessions': (
+            TimerSession.objects.filter(status__in=ACTIVE_STATUSES, last_seen__lt=now - timedelta(hours=1))
+            .filter(status='running', pk__gt=0).order_by('pk').values_list('pk', flat=True)[:1000]
+        ),
+        'rollup users': TimerSession.objects.order_by().values_list('created_by_id', flat=True).distinct(),
+        'admin changelist': TimerSession.objects.order_by('-start_time', '-id').only(*FIELDS)[:100],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--sessions', type=int, default=200)
+    parser.add_argument('--migrate-to', help='task_timer migration to stop at, e.g. 0010')
+    args = parser.parse_args()
+
+    user_id = populate(args.users, args.sessions, args.migrate_to)
+
+    with connection.cursor() as cursor:
+        indexes = connection.introspection.get_constraints(cursor, TimerSession._meta.db_table)
+    print('Indexes:')
+    for name, info in sorted(indexes.items()):
+        if info['index']:
+            print(f"  {name} ({', '.join(info['columns'])})")
+
+    for name, queryset in queries(user_id).items():
+        print(f'\n{name}:')
+        for line in queryset.explain().splitlines():
+            print(f'  {line}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark per-row cost of session list serialization
+
+Compares TimerSessionSerializer(many=True) over model instances with
+serialize_session_values() over .values() rows, both including the
+query. Run from the repository root:
+
+    python benchmarks/session_serialization.py [--rows 5000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'test_settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from task_timer.models import TimerSession  # noqa: E402
+from task_timer.serializers import TimerSessionSerializer, serialize_session_values  # noqa: E402
+
+
+def populate(rows):
+    call_command('migrate', verbosity=0)
+    user = User.objects.create_user(username='bench', password='bench')
+    now = timezone.now()
+    TimerSession.objects.bulk_create([
+        TimerSession(
+            task=f'Task {i}',
+            notes='Notes ' * 20,
+            created_by=user,
+            status='completed',
+            duration=1500 + i,
+            start_time=now,
+            end_time=now
+        )
+        for i in range(rows)
+    ], batch_size=1000)
+    return TimerSession.objects.filter(created_by=user)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    queryset = populate(args.rows)
+    columns = TimerSessionSerializer.only_fields(TimerSessionSerializer.Meta.fields)
+
+    cases = {
+        'TimerSessionSerializer': lambda: TimerSessionSerializer(queryset, many=True).data,
+        'serialize_session_values': lambda: serialize_session_values(queryset.values(*columns)),
+    }
+
+    results = {}
+    for name, run in cases.items():
+        best = min(timeit.repeat(run, number=1, repeat=args.repeat))
+        results[name] = best
+        print(f'{name:<26} {best * 1e6 / args.rows:8.2f} us/row  ({best * 1000:.1f} ms for {args.rows} rows)')
+
+    speedup = results['TimerSessionSerializer'] / results['serialize_session_values']
+    print(f'speedup: {speedup:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
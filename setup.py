@@ -34,6 +34,9 @@ setup(
         "djangorestframework>=3.14",
     ],
     extras_require={
+        "channels": [
+            "channels>=4.0",
+        ],
         "dev": [
             "pytest>=7.0",
             "pytest-django>=4.5",
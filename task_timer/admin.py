@@ -1,14 +1,79 @@
 """
 Django admin configuration for task_timer
 """
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ERROR_FLAG, IGNORED_PARAMS, PAGE_VAR, SEARCH_VAR
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
 from django.utils.html import format_html
-from task_timer.models import TimerSession, TimerSettings
+from task_timer.db import estimate_count
+from task_timer.models import ArchivedTimerSession, BulkSessionJob, TimerSession, TimerSettings
+from task_timer.services import bulk_jobs, session_search
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that uses the planner's row estimate for large results
+
+    An exact COUNT(*) reads every matching row, which is what makes a
+    changelist over millions of sessions slow. On PostgreSQL, when the
+    planner expects more than EXACT_COUNT_LIMIT rows its estimate is shown
+    instead; smaller results and other backends are counted exactly.
+    """
+
+    # Results expected to be smaller than this are counted exactly
+    EXACT_COUNT_LIMIT = 10000
+
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list)
+        if estimate is not None and estimate > self.EXACT_COUNT_LIMIT:
+            return estimate
+        return super().count
+
+
+class UserFilter(admin.SimpleListFilter):
+    """
+    Filter by a typed username or user id
+
+    Unlike a related-field filter, which lists every user in the sidebar,
+    this renders a single text input and filters on the indexed
+    created_by_id column.
+    """
+    title = 'user'
+    parameter_name = 'user'
+    template = 'admin/task_timer/input_filter.html'
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        return session_search.filter_by_user(queryset, self.value())
+
+    def choices(self, changelist):
+        # Keep the other filters when the input is submitted; start again
+        # from the first page
+        yield {
+            'query_string': changelist.get_query_string(remove=[self.parameter_name]),
+            'params': {
+                name: value for name, value in changelist.params.items()
+                if name not in (self.parameter_name, 'p')
+            },
+        }
 
 
 @admin.register(TimerSession)
 class TimerSessionAdmin(admin.ModelAdmin):
-    """Admin interface for TimerSession"""
+    """
+    Admin interface for TimerSession
+
+    Built for tables with millions of rows: no full COUNT(*), no list of
+    every user, no DISTINCT date scans and no substring search, and the
+    changelist is only sorted by the indexed start_time.
+    """
 
     list_display = [
         'task_short',
@@ -19,17 +84,25 @@ class TimerSessionAdmin(admin.ModelAdmin):
         'end_time'
     ]
 
+    # start_time offers fixed ranges (today, past 7 days, ...) that are
+    # plain indexed range lookups
     list_filter = [
         'status',
-        'created_by',
+        UserFilter,
         'start_time'
     ]
 
+    # See get_search_results()
     search_fields = [
-        'task',
-        'notes',
-        'created_by__username'
+        'task'
     ]
+    search_help_text = 'Session id, exact username, or the start of the task'
+
+    list_select_related = ['created_by']
+    sortable_by = ['start_time']
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    autocomplete_fields = ['created_by']
 
     readonly_fields = [
         'start_time',
@@ -49,7 +122,9 @@ class TimerSessionAdmin(admin.ModelAdmin):
         }),
     )
 
-    date_hierarchy = 'start_time'
+    def get_search_results(self, request, queryset, search_term):
+        """See session_search.search()"""
+        return session_search.search(queryset, search_term), False
 
     def task_short(self, obj):
         """Display shortened task description"""
@@ -89,16 +164,43 @@ class TimerSessionAdmin(admin.ModelAdmin):
 
     actions = ['mark_as_completed', 'mark_as_stopped']
 
+    def _queue_job(self, request, queryset, action):
+        """
+        Queue a chunked background job instead of updating rows in the request
+
+        The job stores the ticked ids, or with "select all" the
+        changelist's filter parameters, and rebuilds its queryset from
+        them when it runs.
+        """
+        if request.POST.get('select_across') == '1':
+            ignored = (set(IGNORED_PARAMS) - {SEARCH_VAR}) | {PAGE_VAR, ERROR_FLAG}
+            selection = {
+                'filters': {name: value for name, value in request.GET.items() if name not in ignored}
+            }
+        else:
+            # A page of ticked rows, so the id list stays small
+            selection = {'pks': list(queryset.order_by('pk').values_list('pk', flat=True))}
+
+        try:
+            job = bulk_jobs.create_job(selection, action, requested_by=request.user)
+        except ValueError as e:
+            self.message_user(request, str(e), level=messages.ERROR)
+            return
+
+        self.message_user(
+            request,
+            f'Queued job #{job.pk}; it runs with "manage.py run_session_jobs" '
+            f'and its progress is shown under Bulk Session Jobs'
+        )
+
     def mark_as_completed(self, request, queryset):
         """Mark selected sessions as completed"""
-        count = queryset.update(status='completed')
-        self.message_user(request, f'{count} sessions marked as completed')
+        self._queue_job(request, queryset, 'complete')
     mark_as_completed.short_description = 'Mark selected as completed'
 
     def mark_as_stopped(self, request, queryset):
         """Mark selected sessions as stopped"""
-        count = queryset.update(status='stopped')
-        self.message_user(request, f'{count} sessions marked as stopped')
+        self._queue_job(request, queryset, 'stop')
     mark_as_stopped.short_description = 'Mark selected as stopped'
 
 
@@ -122,6 +224,9 @@ class TimerSettingsAdmin(admin.ModelAdmin):
         'user__username'
     ]
 
+    list_select_related = ['user']
+    autocomplete_fields = ['user']
+
     fieldsets = (
         ('User', {
             'fields': ('user',)
@@ -135,9 +240,113 @@ class TimerSettingsAdmin(admin.ModelAdmin):
     )
 
     def has_add_permission(self, request):
-        """Prevent manual creation (created automatically)"""
+        """Allow creating settings for users still on the defaults"""
         return True
 
     def has_delete_permission(self, request, obj=None):
         """Allow deletion"""
         return True
+
+
+@admin.register(BulkSessionJob)
+class BulkSessionJobAdmin(admin.ModelAdmin):
+    """Read-only progress view of queued bulk actions"""
+
+    list_display = [
+        '__str__',
+        'status',
+        'progress_display',
+        'processed',
+        'total',
+        'updated',
+        'requested_by',
+        'created_at',
+        'finished_at'
+    ]
+
+    list_filter = [
+        'status',
+        'action'
+    ]
+
+    list_select_related = ['requested_by']
+
+    fields = [
+        'action',
+        'status',
+        'progress_display',
+        'total',
+        'processed',
+        'updated',
+        'last_pk',
+        'error',
+        'requested_by',
+        'created_at',
+        'started_at',
+        'finished_at'
+    ]
+    readonly_fields = fields
+
+    def progress_display(self, obj):
+        """Display progress as a percentage"""
+        return f"{obj.get_progress()}%"
+    progress_display.short_description = 'Progress'
+
+    def has_add_permission(self, request):
+        """Jobs are queued from the TimerSession actions"""
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        """Jobs are changed only by the runner"""
+        return False
+
+
+@admin.register(ArchivedTimerSession)
+class ArchivedTimerSessionAdmin(admin.ModelAdmin):
+    """Read-only view of sessions moved out by archive_timer_sessions"""
+
+    list_display = [
+        'id',
+        'created_by',
+        'status',
+        'start_time',
+        'duration_display',
+        'archived_at'
+    ]
+
+    list_filter = [
+        'status',
+        UserFilter
+    ]
+
+    list_select_related = ['created_by']
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+    fields = [
+        'id',
+        'task',
+        'notes',
+        'created_by',
+        'status',
+        'start_time',
+        'end_time',
+        'duration',
+        'pause_duration',
+        'updated_at',
+        'archived_at'
+    ]
+    readonly_fields = fields
+
+    def duration_display(self, obj):
+        """Display duration in readable format"""
+        return obj.get_duration_formatted()
+    duration_display.short_description = 'Duration'
+
+    def has_add_permission(self, request):
+        """Sessions are archived by the management command"""
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        """Archived sessions are kept as they were"""
+        return False
@@ -0,0 +1,20 @@
+"""
+URL configuration for task_timer under ASGI
+
+Same routes as task_timer.urls, with the hot endpoints served by the async
+views in task_timer.async_views:
+
+    path('timer/', include('task_timer.async_urls')),
+"""
+from django.urls import path
+from task_timer import async_views, urls
+
+app_name = 'task_timer'
+
+urlpatterns = [
+    # Matched before the router's sync versions of the same URLs
+    path('api/timer/active/', async_views.active_session_view, name='timer-active'),
+    path('api/timer/stats/', async_views.stats_view, name='timer-stats'),
+    path('api/timer/heartbeat/', async_views.heartbeat_view, name='timer-heartbeat'),
+    path('api/timer/events/', async_views.timer_events_view, name='timer-events'),
+] + urls.urlpatterns
@@ -0,0 +1,204 @@
+"""
+Async API views for ASGI deployments
+
+Native async versions of the endpoints clients call most often: the active
+session, dashboard stats, duration heartbeats and the event stream. They
+answer with the same JSON as the sync views but await TimerEngine's async
+API, so under an ASGI server they do not each hold a worker thread. Include
+task_timer.async_urls instead of task_timer.urls to serve them.
+
+These are plain Django views rather than DRF actions, because DRF views
+are synchronous; they accept session authentication only.
+"""
+import asyncio
+import json
+from time import monotonic
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, HttpResponseNotAllowed, JsonResponse, QueryDict
+from rest_framework import status
+from task_timer.conditional import conditional_response, make_etag
+from task_timer.conf import get_setting
+from task_timer.serializers import TimerSessionSerializer
+from task_timer.services import TimerEngine, events
+from task_timer.views import event_stream_response, events_unavailable, last_event_id
+
+
+def _authenticated_user(request):
+    """Return the request's user, or None if not logged in (loads the session)"""
+    user = request.user
+    return user if user.is_authenticated else None
+
+
+def _request_data(request):
+    """
+    Parse a JSON or form-encoded request body
+
+    Raises:
+        ValueError: If a JSON body is malformed
+    """
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            raise ValueError('Invalid JSON body')
+        if not isinstance(data, dict):
+            raise ValueError('Expected a JSON object')
+        return data
+
+    # request.POST is only parsed for POST; this covers PATCH as well
+    return QueryDict(request.body)
+
+
+def _error(message, status_code=status.HTTP_400_BAD_REQUEST):
+    return JsonResponse({'error': message}, status=status_code)
+
+
+def _forbidden():
+    return JsonResponse(
+        {'detail': 'Authentication credentials were not provided.'},
+        status=status.HTTP_403_FORBIDDEN
+    )
+
+
+async def _get_engine(request):
+    """Return a TimerEngine for the logged-in user, or None"""
+    user = await sync_to_async(_authenticated_user)(request)
+    if user is None:
+        return None
+    return TimerEngine(user=user)
+
+
+async def active_session_view(request):
+    """Get currently active session (async GET /api/timer/active/)"""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    engine = await _get_engine(request)
+    if engine is None:
+        return _forbidden()
+
+    session = await engine.aget_active_session()
+
+    if not session:
+        return JsonResponse(
+            {'detail': 'No active session'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    def build():
+        return JsonResponse(TimerSessionSerializer(session).data)
+
+    # elapsed_seconds of a running session changes every second
+    if session.status == 'running':
+        return conditional_response(request, build)
+
+    return conditional_response(
+        request,
+        build,
+        etag=make_etag(session.pk, session.updated_at),
+        last_modified=session.updated_at
+    )
+
+
+async def stats_view(request):
+    """Get daily and weekly statistics (async GET /api/timer/stats/)"""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    engine = await _get_engine(request)
+    if engine is None:
+        return _forbidden()
+
+    stats = await engine.aget_dashboard_stats()
+
+    return conditional_response(
+        request,
+        lambda: JsonResponse(stats),
+        etag=make_etag(stats)
+    )
+
+
+async def heartbeat_view(request):
+    """Record the active session's duration or liveness (async POST/PATCH /api/timer/heartbeat/)"""
+    if request.method not in ('POST', 'PATCH'):
+        return HttpResponseNotAllowed(['POST', 'PATCH'])
+
+    engine = await _get_engine(request)
+    if engine is None:
+        return _forbidden()
+
+    try:
+        duration = _request_data(request).get('duration')
+    except ValueError as e:
+        return _error(str(e))
+
+    if duration is not None:
+        try:
+            duration = int(duration)
+        except (TypeError, ValueError):
+            return _error('Duration must be a whole number of seconds')
+
+    try:
+        if duration is None:
+            await engine.atouch_session()
+        else:
+            await engine.aupdate_session_duration(duration)
+    except ValueError as e:
+        return _error(str(e))
+
+    return HttpResponse(status=status.HTTP_204_NO_CONTENT)
+
+
+async def timer_events_view(request):
+    """
+    Stream the user's timer events as Server-Sent Events (async GET /api/timer/events/)
+
+    Same messages as views.timer_events_view, from an async generator, so
+    Django sends each one as it is produced instead of collecting the
+    whole stream first, and waiting between polls holds no thread.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    # Loads request.user, so events_unavailable() runs no query
+    await sync_to_async(_authenticated_user)(request)
+    error = events_unavailable(request.user)
+    if error:
+        return error
+
+    return event_stream_response(_event_stream(request.user, last_event_id(request)))
+
+
+async def _event_stream(user, after_id):
+    """Yield SSE messages for a user until the stream timeout"""
+    poll_interval = get_setting('PUSH_EVENTS_POLL_INTERVAL')
+    keepalive = get_setting('PUSH_EVENTS_KEEPALIVE')
+    deadline = monotonic() + get_setting('PUSH_EVENTS_STREAM_TIMEOUT')
+
+    yield 'retry: 3000\n\n'
+
+    if after_id is None:
+        after_id = await events.alast_event_id(user.pk)
+        engine = TimerEngine(user=user)
+        session = await engine.aget_active_session()
+        yield events.format_sse('session', TimerSessionSerializer(session).data if session else None)
+        yield events.format_sse('stats', await engine.aget_dashboard_stats())
+
+    last_sent = monotonic()
+
+    while True:
+        for event in await events.aread_events(user.pk, after_id):
+            after_id = event['id']
+            yield events.format_sse(event['event'], event['data'], event_id=event['id'])
+            last_sent = monotonic()
+
+        now = monotonic()
+        if now >= deadline:
+            return
+
+        if now - last_sent >= keepalive:
+            yield ': keep-alive\n\n'
+            last_sent = now
+
+        await asyncio.sleep(poll_interval)
@@ -0,0 +1,60 @@
+"""
+Conditional GET helpers for the task_timer API
+
+Views compute an ETag (and optionally Last-Modified) from data they have
+to read anyway, and pass a callable that builds the full response. When
+the client's If-None-Match matches, a 304 is returned and the callable
+(serialization included) is never run.
+
+Only the ETag is used to answer with a 304. Last-Modified has one-second
+resolution, so a copy fetched just before a write in the same second
+would still pass If-Modified-Since; it is sent for information only.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    """Return a quoted ETag for the repr of parts"""
+    digest = hashlib.sha256(repr(parts).encode()).hexdigest()
+    return quote_etag(digest[:32])
+
+
+def conditional_response(request, build, etag=None, last_modified=None, max_age=None):
+    """
+    Return a 304 if the client's copy is current, otherwise build()
+
+    Args:
+        request: Incoming request
+        build: Callable returning the full response
+        etag: Quoted ETag of the current representation, if any
+        last_modified: Aware datetime of the last change, if any; sent as
+            Last-Modified but never used to answer with a 304
+        max_age: Seconds the response may be reused without revalidating;
+            by default clients must revalidate every time
+
+    Returns:
+        HttpResponseNotModified or the built response, with validators and
+        Cache-Control set
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+
+    response = None
+    if etag:
+        response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = build()
+
+    if etag:
+        response['ETag'] = etag
+    if timestamp:
+        response['Last-Modified'] = http_date(timestamp)
+
+    if max_age:
+        patch_cache_control(response, private=True, max_age=max_age)
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+
+    return response
@@ -0,0 +1,61 @@
+"""
+App settings for django-task-timer
+
+Each setting is read from the project's Django settings with a
+TASK_TIMER_ prefix (e.g. TASK_TIMER_HEARTBEAT_WRITE_BEHIND), falling back
+to the defaults below.
+"""
+from django.conf import settings
+
+DEFAULTS = {
+    # Cache alias used by the app's buffers and caches
+    'CACHE_ALIAS': 'default',
+    # Seconds cached lookups are kept before they are re-read
+    'CACHE_TIMEOUT': 300,
+    # Serve get_active_session() from the cache (always on with HEARTBEAT_WRITE_BEHIND)
+    'CACHE_ACTIVE_SESSION': False,
+    # Cache daily/weekly stats per user under a version bumped on every write
+    'CACHE_STATS': False,
+    # Serve get_or_create_settings() from the cache
+    'CACHE_SETTINGS': False,
+    # Buffer update-duration heartbeats in the cache instead of saving each one
+    'HEARTBEAT_WRITE_BEHIND': False,
+    # Seconds a buffered heartbeat is kept if it is never flushed
+    'HEARTBEAT_TIMEOUT': 3600,
+    # Seconds clients may reuse a finished (completed/stopped) session
+    'FINISHED_SESSION_MAX_AGE': 86400 * 365,
+    # Publish timer events for the SSE view and WebSocket consumer
+    'PUSH_EVENTS': False,
+    # Seconds a published event is kept for clients to catch up
+    'PUSH_EVENTS_TIMEOUT': 300,
+    # Seconds between checks for new events in an open SSE stream
+    'PUSH_EVENTS_POLL_INTERVAL': 1.0,
+    # Seconds an SSE stream stays open before the client reconnects
+    'PUSH_EVENTS_STREAM_TIMEOUT': 300,
+    # Seconds between keep-alive comments on an idle SSE stream
+    'PUSH_EVENTS_KEEPALIVE': 15,
+    # Days after which finished sessions move to the archive table (None: never)
+    'ARCHIVE_AFTER_DAYS': None,
+    # zlib-compress task and notes of archived sessions when it saves space
+    'ARCHIVE_COMPRESS': False,
+    # Seconds without a sign of life before an active session counts as
+    # abandoned and may be stopped (None: never)
+    'ABANDONED_SESSION_TIMEOUT': None,
+    # Minimum seconds between last_seen writes for a session
+    'LAST_SEEN_INTERVAL': 60,
+    # Let migration 0009 partition TimerSession by month (PostgreSQL 13+ only)
+    'PARTITION_SESSIONS': False,
+}
+
+
+def get_setting(name):
+    """
+    Get an app setting
+
+    Args:
+        name: Setting name without the TASK_TIMER_ prefix
+
+    Returns:
+        Configured value, or the default
+    """
+    return getattr(settings, f'TASK_TIMER_{name}', DEFAULTS[name])
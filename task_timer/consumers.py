@@ -0,0 +1,40 @@
+"""
+WebSocket consumer for timer events (requires Django Channels)
+
+Each connection joins its user's channel layer group and receives the
+events published by task_timer.services.events as JSON messages:
+
+    {"id": 1718000000123, "event": "session", "data": {...}}
+
+Route it from your ASGI application, behind AuthMiddlewareStack, e.g.
+with task_timer.routing.websocket_urlpatterns, and enable
+TASK_TIMER_PUSH_EVENTS with a CHANNEL_LAYERS backend shared by every
+process that runs TimerEngine.
+"""
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from task_timer.services import events
+
+
+class TimerEventsConsumer(AsyncJsonWebsocketConsumer):
+    """Push a user's timer events over a WebSocket"""
+
+    async def connect(self):
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated:
+            await self.close()
+            return
+
+        self.group = events.group_name(user.pk)
+        await self.channel_layer.group_add(self.group, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        if hasattr(self, 'group'):
+            await self.channel_layer.group_discard(self.group, self.channel_name)
+
+    async def timer_event(self, message):
+        await self.send_json({
+            'id': message['id'],
+            'event': message['event'],
+            'data': message['data'],
+        })
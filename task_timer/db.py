@@ -0,0 +1,226 @@
+"""
+Database helpers for task_timer
+
+SecondsBetween: Portable whole-second difference between two datetimes
+update_returning: Conditional UPDATE that hands back the updated row
+estimate_count: Planner row estimate for a queryset on PostgreSQL
+CompressedTextField: Text column stored as optionally zlib-compressed bytes
+"""
+import json
+import zlib
+
+from django.db import connections, transaction
+from django.db.models import BinaryField, Func, IntegerField
+from django.db.models.sql import UpdateQuery
+from task_timer.conf import get_setting
+
+
+class SecondsBetween(Func):
+    """
+    Whole seconds from start to end, evaluated in the database
+
+    Returns NULL if either side is NULL, so wrap it in Coalesce where the
+    start may be unset.
+    """
+    arity = 2
+    output_field = IntegerField()
+
+    def _compile_pair(self, compiler, connection):
+        start, end = self.get_source_expressions()
+        start_sql, start_params = compiler.compile(start)
+        end_sql, end_params = compiler.compile(end)
+        return start_sql, start_params, end_sql, end_params
+
+    def as_sql(self, compiler, connection, **extra_context):
+        start_sql, start_params, end_sql, end_params = self._compile_pair(compiler, connection)
+        sql = f'CAST(FLOOR(EXTRACT(EPOCH FROM ({end_sql} - {start_sql}))) AS INTEGER)'
+        return sql, (*end_params, *start_params)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        start_sql, start_params, end_sql, end_params = self._compile_pair(compiler, connection)
+        # julianday() is a float; round to milliseconds before truncating
+        # so 600 seconds never comes back as 599.
+        sql = (
+            f'CAST(ROUND((julianday({end_sql}) - julianday({start_sql})) * 86400000) '
+            f'/ 1000 AS INTEGER)'
+        )
+        return sql, (*end_params, *start_params)
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        start_sql, start_params, end_sql, end_params = self._compile_pair(compiler, connection)
+        sql = f'TIMESTAMPDIFF(SECOND, {start_sql}, {end_sql})'
+        return sql, (*start_params, *end_params)
+
+
+def supports_update_returning(connection):
+    """Return True if the backend accepts UPDATE ... RETURNING"""
+    if connection.vendor == 'postgresql':
+        return True
+    if connection.vendor == 'sqlite':
+        # RETURNING arrived in SQLite 3.35, same as for INSERT
+        return connection.features.can_return_columns_from_insert
+    return False
+
+
+def _update_then_fetch(queryset, values):
+    """Fallback for backends without UPDATE ... RETURNING"""
+    with transaction.atomic(using=queryset.db):
+        pk = queryset.select_for_update().values_list('pk', flat=True).first()
+        if pk is None:
+            return None
+
+        # Let the UPDATE re-check the original conditions
+        if not queryset.filter(pk=pk).update(**values):
+            return None
+
+        return queryset.model._default_manager.using(queryset.db).get(pk=pk)
+
+
+def update_returning(queryset, **values):
+    """
+    Apply queryset.update(**values) and return the updated instance
+
+    On PostgreSQL and SQLite this is a single UPDATE ... RETURNING
+    statement, so the WHERE clause doubles as the state check and no row
+    lock is needed. Values are written in the order given, which matters
+    on MySQL where later SET clauses see earlier ones.
+
+    Args:
+        queryset: QuerySet selecting at most one row
+        **values: Field values or expressions, as for QuerySet.update()
+
+    Returns:
+        Model instance, or None if no row matched
+    """
+    model = queryset.model
+    using = queryset.db
+    connection = connections[using]
+
+    if not supports_update_returning(connection):
+        return _update_then_fetch(queryset, values)
+
+    query = queryset.query.chain(UpdateQuery)
+    query.add_update_values(values)
+    query.annotations = {}
+    update_sql, params = query.get_compiler(using).as_sql()
+
+    fields = model._meta.concrete_fields
+    returning = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+
+    with transaction.mark_for_rollback_on_error(using=using):
+        with connection.cursor() as cursor:
+            cursor.execute(f'{update_sql} RETURNING {returning}', params)
+            rows = cursor.fetchall()
+
+    if not rows:
+        return None
+
+    row = rows[0]
+
+    field_values = []
+    for field, value in zip(fields, row):
+        col = field.get_col(model._meta.db_table)
+        for converter in connection.ops.get_db_converters(col) + col.get_db_converters(connection):
+            value = converter(value, col, connection)
+        field_values.append(value)
+
+    return model.from_db(using, [field.attname for field in fields], field_values)
+
+
+def estimate_count(queryset):
+    """
+    Return the query planner's estimate of a queryset's row count
+
+    Runs EXPLAIN rather than COUNT(*), so it costs the same however many
+    rows match. The estimate comes from table statistics and can be off,
+    especially before the table has been analyzed.
+
+    Args:
+        queryset: QuerySet to estimate
+
+    Returns:
+        Estimated number of rows, or None if the backend gives no estimate
+        (anything but PostgreSQL)
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+
+    # psycopg2 decodes the json result; other drivers may not
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+# First byte of a CompressedTextField value
+_PLAIN = b'p'
+_ZLIB = b'z'
+
+
+def compress_text(value, compress=None):
+    """
+    Encode text for a CompressedTextField column
+
+    Args:
+        value: str to store
+        compress: zlib-compress when that is smaller (defaults to the
+            TASK_TIMER_ARCHIVE_COMPRESS setting)
+
+    Returns:
+        bytes, prefixed with a marker saying how the rest is encoded
+    """
+    if compress is None:
+        compress = get_setting('ARCHIVE_COMPRESS')
+
+    data = value.encode('utf-8')
+    if compress:
+        packed = zlib.compress(data)
+        if len(packed) < len(data):
+            return _ZLIB + packed
+    return _PLAIN + data
+
+
+def decompress_text(value):
+    """Decode a value written by compress_text()"""
+    value = bytes(value)
+    if value[:1] == _ZLIB:
+        return zlib.decompress(value[1:]).decode('utf-8')
+    return value[1:].decode('utf-8')
+
+
+class CompressedTextField(BinaryField):
+    """
+    Text stored as bytes, zlib-compressed when that saves space
+
+    Instances always see a str. Each value records whether it was
+    compressed, so TASK_TIMER_ARCHIVE_COMPRESS can be changed at any time
+    and old rows still read back. The column cannot be searched or
+    filtered on.
+    """
+
+    def _check_str_default_value(self):
+        # Defaults are text, unlike a plain BinaryField
+        return []
+
+    def get_prep_value(self, value):
+        if isinstance(value, str):
+            value = compress_text(value)
+        return super().get_prep_value(value)
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return decompress_text(value)
+
+    def to_python(self, value):
+        if isinstance(value, (bytes, memoryview)):
+            return decompress_text(value)
+        return value
+
+    def value_to_string(self, obj):
+        return self.value_from_object(obj)
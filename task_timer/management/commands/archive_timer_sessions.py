@@ -0,0 +1,39 @@
+"""
+Move old finished timer sessions to the archive table
+"""
+from django.core.management.base import BaseCommand, CommandError
+from task_timer.services import archive
+
+
+class Command(BaseCommand):
+    help = 'Archive sessions that finished more than TASK_TIMER_ARCHIVE_AFTER_DAYS days ago'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Sessions moved per transaction (default: 1000)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count the sessions that would be archived'
+        )
+
+    def handle(self, *args, **options):
+        if not archive.is_enabled():
+            raise CommandError('Archiving is off; set TASK_TIMER_ARCHIVE_AFTER_DAYS')
+
+        before = archive.horizon()
+
+        if options['dry_run']:
+            count = archive.archivable_sessions(before).count()
+            self.stdout.write(f'{count} sessions started before {before:%Y-%m-%d %H:%M} would be archived')
+            return
+
+        def report(archived):
+            self.stdout.write(f'{archived} sessions archived')
+
+        archived = archive.archive_sessions(before, batch_size=options['batch_size'], progress=report)
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} sessions'))
@@ -0,0 +1,46 @@
+"""
+Verify the DailyTimerStats rollup against session history
+"""
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from task_timer.services.rollup import check_daily_stats, refresh_days
+
+
+class Command(BaseCommand):
+    help = 'Report DailyTimerStats rows that differ from TimerSession history'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            action='append',
+            dest='usernames',
+            help='Only check this user (may be repeated)'
+        )
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Recompute the rows that differ'
+        )
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options['usernames']:
+            user_ids = list(
+                User.objects.filter(username__in=options['usernames']).values_list('pk', flat=True)
+            )
+
+        mismatches = check_daily_stats(user_ids=user_ids)
+
+        for user_id, date, expected, actual in mismatches:
+            self.stdout.write(f'user {user_id} on {date}: expected {expected}, found {actual}')
+
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS('Daily stats are consistent'))
+            return
+
+        if options['fix']:
+            refresh_days((user_id, date) for user_id, date, expected, actual in mismatches)
+            self.stdout.write(self.style.SUCCESS(f'Fixed {len(mismatches)} daily stats rows'))
+            return
+
+        raise CommandError(f'{len(mismatches)} daily stats rows are out of date')
@@ -0,0 +1,38 @@
+"""
+Create upcoming monthly partitions of the TimerSession table
+"""
+from django.core.management.base import BaseCommand, CommandError
+from task_timer.services import partitions
+
+
+class Command(BaseCommand):
+    help = 'Create monthly TimerSession partitions ahead of time (PostgreSQL only); run it monthly'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=3,
+            help='Months after the current one to create partitions for (default: 3)'
+        )
+        parser.add_argument(
+            '--convert',
+            action='store_true',
+            help='Partition the table first if it is still a plain table; locks it while rows are copied'
+        )
+
+    def handle(self, *args, **options):
+        if not partitions.is_supported():
+            raise CommandError('Partitioning sessions needs PostgreSQL')
+
+        if options['convert'] and partitions.convert_table(months_ahead=options['months']):
+            self.stdout.write(f'Partitioned {partitions.TABLE} by month')
+
+        try:
+            created = partitions.create_partitions(months_ahead=options['months'])
+        except ValueError as e:
+            raise CommandError(f'{e}; run with --convert first')
+
+        for name in created:
+            self.stdout.write(f'Created {name}')
+        self.stdout.write(self.style.SUCCESS(f'Created {len(created)} partitions'))
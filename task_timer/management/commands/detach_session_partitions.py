@@ -0,0 +1,46 @@
+"""
+Detach or drop old monthly partitions of the TimerSession table
+"""
+from django.core.management.base import BaseCommand, CommandError
+from task_timer.services import partitions
+
+
+class Command(BaseCommand):
+    help = 'Detach (or drop) TimerSession partitions of old months (PostgreSQL only)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep-months',
+            type=int,
+            required=True,
+            help='Keep the current month and this many before it'
+        )
+        parser.add_argument(
+            '--drop',
+            action='store_true',
+            help='Drop the detached tables instead of keeping them'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only list the partitions that would go'
+        )
+
+    def handle(self, *args, **options):
+        if options['keep_months'] < 0:
+            raise CommandError('--keep-months cannot be negative')
+        if not partitions.is_partitioned():
+            raise CommandError(f'{partitions.TABLE} is not partitioned')
+
+        before = partitions.add_months(partitions.current_month(), -options['keep_months'])
+
+        if options['dry_run']:
+            for name, month in partitions.list_partitions():
+                if month is not None and month < before:
+                    self.stdout.write(f'Would detach {name}')
+            return
+
+        detached = partitions.detach_partitions(before, drop=options['drop'])
+        for name in detached:
+            self.stdout.write(f"{'Dropped' if options['drop'] else 'Detached'} {name}")
+        self.stdout.write(self.style.SUCCESS(f'{len(detached)} partitions before {before:%Y-%m} removed'))
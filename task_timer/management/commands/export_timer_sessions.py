@@ -0,0 +1,130 @@
+"""
+Export timer sessions as NDJSON or CSV
+"""
+from datetime import date, datetime, time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from task_timer.models import ArchivedTimerSession, TimerSession
+from task_timer.serializers import TimerSessionSerializer
+from task_timer.services import TimerEngine, archive
+from task_timer.services.export import FORMATS, encode_chunks, export_lines
+
+
+def _parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+
+class Command(BaseCommand):
+    help = 'Stream session history to a file or stdout as NDJSON or CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            dest='username',
+            help='Only export this user (default: every user)'
+        )
+        parser.add_argument(
+            '--from',
+            dest='first_day',
+            help='First day to export, YYYY-MM-DD'
+        )
+        parser.add_argument(
+            '--to',
+            dest='last_day',
+            help='Last day to export (inclusive), YYYY-MM-DD'
+        )
+        parser.add_argument(
+            '--status',
+            choices=[value for value, label in TimerSession.STATUS_CHOICES],
+            help='Only export sessions with this status'
+        )
+        parser.add_argument(
+            '--format',
+            dest='export_format',
+            choices=FORMATS,
+            default='ndjson',
+            help='Output format (default: ndjson)'
+        )
+        parser.add_argument(
+            '--fields',
+            help='Comma-separated fields to include (default: all)'
+        )
+        parser.add_argument(
+            '--output',
+            help='File to write (default: stdout)'
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='gzip-compress the output'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Rows fetched per query (default: 2000)'
+        )
+
+    def handle(self, *args, **options):
+        if options['gzip'] and not options['output']:
+            raise CommandError('--gzip needs --output')
+
+        start_date = end_date = None
+        if options['first_day']:
+            start_date = timezone.make_aware(datetime.combine(_parse_date(options['first_day']), time.min))
+        if options['last_day']:
+            end_date = timezone.make_aware(datetime.combine(_parse_date(options['last_day']), time.max))
+
+        if options['username']:
+            try:
+                user = User.objects.get(username=options['username'])
+            except User.DoesNotExist:
+                raise CommandError(f"Unknown username '{options['username']}'")
+            sessions = TimerEngine(user=user).get_history_sources(start_date, end_date, options['status'])
+        else:
+            models = [TimerSession]
+            if archive.reaches(start_date):
+                models.append(ArchivedTimerSession)
+
+            sessions = []
+            for model in models:
+                queryset = model.objects.order_by('pk')
+                if start_date:
+                    queryset = queryset.filter(start_time__gte=start_date)
+                if end_date:
+                    queryset = queryset.filter(start_time__lte=end_date)
+                if options['status']:
+                    queryset = queryset.filter(status=options['status'])
+                sessions.append(queryset)
+
+        fields = None
+        if options['fields']:
+            try:
+                fields = TimerSessionSerializer.select_fields(
+                    [name.strip() for name in options['fields'].split(',') if name.strip()]
+                )
+            except ValidationError as e:
+                raise CommandError(str(e.detail['fields']))
+
+        lines = export_lines(
+            sessions,
+            options['export_format'],
+            fields=fields,
+            chunk_size=options['chunk_size']
+        )
+        chunks = encode_chunks(lines, chunk_size=options['chunk_size'], compress=options['gzip'])
+
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                for chunk in chunks:
+                    output.write(chunk)
+            return
+
+        for chunk in chunks:
+            self.stdout.write(chunk.decode(), ending='')
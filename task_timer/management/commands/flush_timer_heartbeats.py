@@ -0,0 +1,34 @@
+"""
+Write buffered duration heartbeats to the database
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from task_timer.services.heartbeats import flush_heartbeats
+
+
+class Command(BaseCommand):
+    help = 'Flush buffered update-duration heartbeats with bulk_update'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Sessions per bulk_update (default: 500)'
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Keep running and flush every N seconds (default: flush once)'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            count = flush_heartbeats(batch_size=options['batch_size'])
+            self.stdout.write(f'Flushed {count} heartbeats')
+
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
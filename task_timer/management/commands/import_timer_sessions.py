@@ -0,0 +1,64 @@
+"""
+Import historical timer sessions from NDJSON or CSV
+"""
+import gzip
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from task_timer.services.session_import import FORMATS, decode_lines, import_sessions, read_records
+
+
+class Command(BaseCommand):
+    help = 'Bulk-insert historical sessions for a user from an NDJSON or CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='File to import (.ndjson, .jsonl or .csv, optionally .gz)'
+        )
+        parser.add_argument(
+            '--user',
+            dest='username',
+            required=True,
+            help='Owner of the imported sessions'
+        )
+        parser.add_argument(
+            '--format',
+            dest='import_format',
+            choices=FORMATS,
+            help='File format (default: from the file name)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Sessions inserted per transaction (default: 500)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"Unknown username '{options['username']}'")
+
+        path = options['path']
+        name = path[:-3] if path.endswith('.gz') else path
+        import_format = options['import_format'] or ('csv' if name.endswith('.csv') else 'ndjson')
+        opener = gzip.open if path.endswith('.gz') else open
+
+        try:
+            with opener(path, 'rb') as source:
+                result = import_sessions(
+                    user,
+                    read_records(decode_lines(source), import_format),
+                    batch_size=options['batch_size']
+                )
+        except OSError as e:
+            raise CommandError(f'Could not read {path}: {e}')
+
+        for error in result.errors:
+            self.stderr.write(f"line {error['line']}: {error['error']}")
+
+        self.stdout.write(self.style.SUCCESS(f'Imported {result.created} sessions'))
+        if result.failed:
+            self.stdout.write(self.style.WARNING(f'Skipped {result.failed} invalid rows'))
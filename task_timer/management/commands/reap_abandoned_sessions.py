@@ -0,0 +1,53 @@
+"""
+Stop running or paused sessions whose client went away
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from task_timer.services import reaper
+
+
+class Command(BaseCommand):
+    help = 'Stop sessions not seen for TASK_TIMER_ABANDONED_SESSION_TIMEOUT seconds, ending them at their last sign of life'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--timeout',
+            type=int,
+            help='Seconds without a sign of life, overriding TASK_TIMER_ABANDONED_SESSION_TIMEOUT (which must be set)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Sessions per UPDATE (default: 1000)'
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Keep running and reap every N seconds (default: reap once)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count the abandoned sessions'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                if options['dry_run']:
+                    count = reaper.abandoned_sessions(options['timeout']).count()
+                    self.stdout.write(f'{count} abandoned sessions')
+                    return
+
+                count = reaper.reap_sessions(options['timeout'], batch_size=options['batch_size'])
+            except ValueError as e:
+                raise CommandError(str(e))
+
+            self.stdout.write(f'Stopped {count} abandoned sessions')
+
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,36 @@
+"""
+Rebuild the DailyTimerStats rollup from session history
+"""
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from task_timer.services.rollup import rebuild_daily_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute DailyTimerStats rows from TimerSession history'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            action='append',
+            dest='usernames',
+            help='Only rebuild this user (may be repeated)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=100,
+            help='Users rebuilt per transaction (default: 100)'
+        )
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options['usernames']:
+            user_ids = list(
+                User.objects.filter(username__in=options['usernames']).values_list('pk', flat=True)
+            )
+            if len(user_ids) != len(set(options['usernames'])):
+                raise CommandError('Unknown username given')
+
+        written = rebuild_daily_stats(user_ids=user_ids, chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} daily stats rows'))
@@ -0,0 +1,64 @@
+"""
+Run queued admin bulk actions on timer sessions
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from task_timer.services.bulk_jobs import claim_job, run_job
+
+
+class Command(BaseCommand):
+    help = 'Process queued bulk session jobs in primary key chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Sessions per transaction (default: 1000)'
+        )
+        parser.add_argument(
+            '--job',
+            type=int,
+            dest='job_id',
+            help='Run or resume this job only, even if it failed'
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Keep running and look for new jobs every N seconds (default: run what is queued and exit)'
+        )
+
+    def handle(self, *args, **options):
+        if options['job_id'] is not None:
+            job = claim_job(options['job_id'])
+            if job is None:
+                raise CommandError(f"No unfinished job #{options['job_id']}")
+            self._run(job, options['batch_size'])
+            return
+
+        while True:
+            job = claim_job()
+            if job is not None:
+                self._run(job, options['batch_size'])
+                continue
+
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def _run(self, job, batch_size):
+        self.stdout.write(f'Job #{job.pk}: {job.get_action_display()}')
+
+        def report(job):
+            self.stdout.write(f'Job #{job.pk}: {job.processed}/{job.total} ({job.get_progress()}%)')
+
+        try:
+            run_job(job, batch_size=batch_size, progress=report)
+        except Exception as e:
+            # Recorded on the job; carry on with the next one
+            self.stderr.write(f'Job #{job.pk} failed: {e}')
+            return
+
+        self.stdout.write(f'Job #{job.pk}: done, {job.updated} sessions updated')
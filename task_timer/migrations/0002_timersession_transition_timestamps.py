@@ -0,0 +1,48 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:51
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_transition_timestamps(apps, schema_editor):
+    """
+    Start the open stretch of active sessions at the upgrade
+
+    Durations are now derived from these timestamps. Their stored duration
+    and pause_duration are what clients last reported, so counting resumes
+    from now. There is no better timestamp to use at this point:
+    updated_at arrives in 0005.
+    """
+    TimerSession = apps.get_model("task_timer", "TimerSession")
+    now = timezone.now()
+    TimerSession.objects.filter(status="running", last_resumed_at__isnull=True).update(last_resumed_at=now)
+    TimerSession.objects.filter(status="paused", paused_at__isnull=True).update(paused_at=now)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_timer", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="timersession",
+            name="last_resumed_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When the session last started running (null unless running)",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="timersession",
+            name="paused_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When the session was paused (null unless paused)",
+                null=True,
+            ),
+        ),
+        migrations.RunPython(backfill_transition_timestamps, migrations.RunPython.noop),
+    ]
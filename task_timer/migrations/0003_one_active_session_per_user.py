@@ -0,0 +1,48 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:56
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.utils import timezone
+
+
+def stop_duplicate_active_sessions(apps, schema_editor):
+    """Keep only each user's newest active session so the constraint can be added"""
+    TimerSession = apps.get_model("task_timer", "TimerSession")
+    active = TimerSession.objects.filter(status__in=["running", "paused"])
+
+    duplicated_users = (
+        active.values("created_by")
+        .annotate(active_count=Count("id"))
+        .filter(active_count__gt=1)
+        .values_list("created_by", flat=True)
+    )
+
+    for user_id in duplicated_users:
+        keep = active.filter(created_by=user_id).order_by("-start_time", "-id").first()
+        active.filter(created_by=user_id).exclude(pk=keep.pk).update(
+            status="stopped",
+            end_time=timezone.now(),
+            last_resumed_at=None,
+            paused_at=None,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_timer", "0002_timersession_transition_timestamps"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            stop_duplicate_active_sessions, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name="timersession",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status__in", ["running", "paused"])),
+                fields=("created_by",),
+                name="task_timer_one_active_session",
+            ),
+        ),
+    ]
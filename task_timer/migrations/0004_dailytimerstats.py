@@ -0,0 +1,117 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:00
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+import django.db.models.deletion
+
+
+def populate_daily_stats(apps, schema_editor):
+    """Build the rollup from existing finished sessions"""
+    TimerSession = apps.get_model("task_timer", "TimerSession")
+    DailyTimerStats = apps.get_model("task_timer", "DailyTimerStats")
+
+    rows = (
+        TimerSession.objects.filter(status__in=["completed", "stopped"])
+        .order_by()
+        .annotate(day=TruncDate("start_time"))
+        .values("created_by_id", "day")
+        .annotate(
+            total_sessions=Count("id"),
+            completed_sessions=Count("id", filter=Q(status="completed")),
+            total_seconds=Sum("duration"),
+            pause_seconds=Sum("pause_duration"),
+        )
+    )
+
+    DailyTimerStats.objects.bulk_create(
+        (
+            DailyTimerStats(
+                user_id=row["created_by_id"],
+                date=row["day"],
+                total_sessions=row["total_sessions"],
+                completed_sessions=row["completed_sessions"],
+                total_seconds=row["total_seconds"] or 0,
+                pause_seconds=row["pause_seconds"] or 0,
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("task_timer", "0003_one_active_session_per_user"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyTimerStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "date",
+                    models.DateField(
+                        help_text="Day the sessions started on, in the site timezone"
+                    ),
+                ),
+                (
+                    "total_sessions",
+                    models.IntegerField(
+                        default=0, help_text="Finished sessions started on this day"
+                    ),
+                ),
+                (
+                    "completed_sessions",
+                    models.IntegerField(
+                        default=0, help_text="Sessions that ran to completion"
+                    ),
+                ),
+                (
+                    "total_seconds",
+                    models.IntegerField(
+                        default=0, help_text="Seconds worked across finished sessions"
+                    ),
+                ),
+                (
+                    "pause_seconds",
+                    models.IntegerField(
+                        default=0, help_text="Seconds paused across finished sessions"
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        help_text="User these totals belong to",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_timer_stats",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Daily Timer Stats",
+                "verbose_name_plural": "Daily Timer Stats",
+                "ordering": ["-date"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="dailytimerstats",
+            constraint=models.UniqueConstraint(
+                fields=("user", "date"), name="task_timer_daily_stats_user_date"
+            ),
+        ),
+        migrations.RunPython(populate_daily_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:20
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_timer", "0004_dailytimerstats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="timersession",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True,
+                default=django.utils.timezone.now,
+                help_text="When the session was last changed",
+            ),
+            preserve_default=False,
+        ),
+    ]
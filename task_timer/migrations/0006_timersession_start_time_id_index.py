@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_timer", "0005_timersession_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="timersession",
+            index=models.Index(
+                fields=["start_time", "id"], name="task_timer__start_t_8104c8_idx"
+            ),
+        ),
+    ]
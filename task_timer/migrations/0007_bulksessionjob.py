@@ -0,0 +1,129 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:41
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("task_timer", "0006_timersession_start_time_id_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BulkSessionJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[
+                            ("complete", "Mark as completed"),
+                            ("stop", "Mark as stopped"),
+                        ],
+                        help_text="What to do with the selected sessions",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        help_text="Current job state",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "query",
+                    models.BinaryField(
+                        help_text="Pickled query selecting the sessions"
+                    ),
+                ),
+                (
+                    "total",
+                    models.IntegerField(
+                        blank=True,
+                        help_text="Sessions selected when the job started",
+                        null=True,
+                    ),
+                ),
+                (
+                    "processed",
+                    models.IntegerField(default=0, help_text="Sessions handled so far"),
+                ),
+                (
+                    "updated",
+                    models.IntegerField(
+                        default=0, help_text="Sessions whose status changed"
+                    ),
+                ),
+                (
+                    "last_pk",
+                    models.BigIntegerField(
+                        default=0,
+                        help_text="Highest session id handled; the job resumes after it",
+                    ),
+                ),
+                ("error", models.TextField(blank=True, help_text="Why the job failed")),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, help_text="When the job was queued"
+                    ),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(
+                        blank=True, help_text="When the job started running", null=True
+                    ),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="When the job finished or failed",
+                        null=True,
+                    ),
+                ),
+                (
+                    "requested_by",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Admin user who queued the job",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Bulk Session Job",
+                "verbose_name_plural": "Bulk Session Jobs",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "created_at"],
+                        name="task_timer__status_f9e6f0_idx",
+                    )
+                ],
+            },
+        ),
+    ]
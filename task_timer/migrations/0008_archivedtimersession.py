@@ -0,0 +1,129 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:46
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import task_timer.db
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("task_timer", "0007_bulksessionjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedTimerSession",
+            fields=[
+                (
+                    "id",
+                    models.BigIntegerField(
+                        help_text="Id the session had in the TimerSession table",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "task",
+                    task_timer.db.CompressedTextField(
+                        help_text="Description of what you're working on"
+                    ),
+                ),
+                (
+                    "notes",
+                    task_timer.db.CompressedTextField(
+                        blank=True,
+                        default="",
+                        help_text="Optional notes about the task",
+                    ),
+                ),
+                (
+                    "start_time",
+                    models.DateTimeField(help_text="When the session started"),
+                ),
+                (
+                    "end_time",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="When the session completed/stopped",
+                        null=True,
+                    ),
+                ),
+                (
+                    "duration",
+                    models.IntegerField(
+                        default=0, help_text="Total seconds worked (excluding pauses)"
+                    ),
+                ),
+                (
+                    "pause_duration",
+                    models.IntegerField(default=0, help_text="Total seconds paused"),
+                ),
+                (
+                    "last_resumed_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="Always null; kept so rows match TimerSession",
+                        null=True,
+                    ),
+                ),
+                (
+                    "paused_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="Always null; kept so rows match TimerSession",
+                        null=True,
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        help_text="When the session was last changed before it was archived"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("running", "Running"),
+                            ("paused", "Paused"),
+                            ("completed", "Completed"),
+                            ("stopped", "Stopped"),
+                        ],
+                        help_text="Final session status",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "archived_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        help_text="When the session was moved to the archive",
+                    ),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        help_text="User who owns this session",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_timer_sessions",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Archived Timer Session",
+                "verbose_name_plural": "Archived Timer Sessions",
+                "ordering": ["-start_time"],
+                "indexes": [
+                    models.Index(
+                        fields=["created_by", "start_time"],
+                        name="task_timer__created_ca9ce6_idx",
+                    )
+                ],
+            },
+        ),
+    ]
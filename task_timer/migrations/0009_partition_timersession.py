@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:30
+
+from django.conf import settings
+from django.db import migrations
+
+from . import _0009_partitioning
+
+
+def partition_sessions(apps, schema_editor):
+    """Partition TimerSession by month if enabled (PostgreSQL only)"""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    if not getattr(settings, "TASK_TIMER_PARTITION_SESSIONS", False):
+        return
+
+    _0009_partitioning.convert_table(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_timer", "0008_archivedtimersession"),
+    ]
+
+    operations = [
+        # The migration state is shared by every backend, so it is left
+        # unchanged: id stays the model's primary key and the
+        # task_timer_one_active_session UniqueConstraint stays declared.
+        # On a converted table that constraint is really a plain partial
+        # index plus a trigger (see task_timer.services.partitions), so a
+        # later migration that alters or removes it has to do so with
+        # SeparateDatabaseAndState and SQL for both forms.
+        migrations.RunPython(partition_sessions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:59
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def seed_last_seen(apps, schema_editor):
+    """Treat active sessions as last seen when they last changed"""
+    TimerSession = apps.get_model("task_timer", "TimerSession")
+    TimerSession.objects.filter(status__in=["running", "paused"]).update(last_seen=F("updated_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_timer", "0009_partition_timersession"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="timersession",
+            name="last_seen",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Last sign that a client still had the session open",
+                null=True,
+            ),
+        ),
+        migrations.RunPython(seed_last_seen, migrations.RunPython.noop),
+    ]
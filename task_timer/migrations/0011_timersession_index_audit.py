@@ -0,0 +1,67 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("task_timer", "0010_timersession_last_seen"),
+    ]
+
+    operations = [
+        # Built before the indexes it replaces are dropped
+        migrations.AddIndex(
+            model_name="timersession",
+            index=models.Index(
+                fields=["created_by", "start_time"],
+                include=("duration", "status"),
+                name="task_timer_user_start_covering",
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="timersession",
+            name="task_timer__created_9f980f_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="timersession",
+            name="task_timer__created_3acd7b_idx",
+        ),
+        migrations.AlterField(
+            model_name="timersession",
+            name="created_by",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="User who owns this session",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="timer_sessions",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="timersession",
+            name="start_time",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, help_text="When the session started"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="timersession",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("running", "Running"),
+                    ("paused", "Paused"),
+                    ("completed", "Completed"),
+                    ("stopped", "Stopped"),
+                ],
+                default="running",
+                help_text="Current session status",
+                max_length=20,
+            ),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:34
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fail_unfinished_jobs(apps, schema_editor):
+    """
+    Fail jobs queued with a pickled query
+
+    Their selection cannot be turned into the new description; the admin
+    has to queue them again.
+    """
+    BulkSessionJob = apps.get_model("task_timer", "BulkSessionJob")
+    BulkSessionJob.objects.exclude(status="done").update(
+        status="failed",
+        error="Queued before selections were stored as JSON; queue the action again",
+        finished_at=timezone.now(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_timer", "0011_timersession_index_audit"),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_unfinished_jobs, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="bulksessionjob",
+            name="query",
+        ),
+        migrations.AddField(
+            model_name="bulksessionjob",
+            name="selection",
+            field=models.JSONField(
+                default=dict,
+                help_text="Selected session ids ({'pks': [...]}) or changelist filter parameters ({'filters': {...}})",
+            ),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.30 on 2026-10-17 03:12
+
+from django.db import migrations
+
+INDEX = "task_timer_task_upper_prefix"
+TABLE = "task_timer_timersession"
+
+
+def create_index(apps, schema_editor):
+    """
+    Index the upper-cased task for prefix search (PostgreSQL only)
+
+    task__istartswith compiles to UPPER("task"::text) LIKE UPPER('...%'),
+    which only an index on that expression can serve; text_pattern_ops
+    makes it usable for LIKE whatever the database collation.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    quote = schema_editor.connection.ops.quote_name
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {quote(INDEX)} ON {quote(TABLE)} "
+        f"(UPPER({quote('task')}::text) text_pattern_ops)"
+    )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute(f"DROP INDEX IF EXISTS {schema_editor.connection.ops.quote_name(INDEX)}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_timer", "0012_bulksessionjob_selection"),
+    ]
+
+    operations = [
+        # Left out of the migration state: an expression index with an
+        # operator class has no form every backend accepts
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-17 03:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_timer", "0013_timersession_task_prefix_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="timersession",
+            index=models.Index(fields=["status", "id"], name="task_timer_status_id"),
+        ),
+    ]
@@ -0,0 +1,148 @@
+"""
+Frozen copy of the table conversion run by migration 0009
+
+This is task_timer.services.partitions.convert_table() as it stood when
+0009 was written, with the names it used spelled out. A migration has to
+do the same thing whenever it runs, so this module imports nothing from
+the app, and later changes to the live helpers must not be copied here.
+
+The leading underscore keeps Django's migration loader from treating
+this module as a migration.
+"""
+import re
+from datetime import date, datetime
+
+from django.db import transaction
+from django.utils import timezone
+
+TABLE = "task_timer_timersession"
+DEFAULT_PARTITION = f"{TABLE}_default"
+ACTIVE_SESSION_TRIGGER = "task_timer_one_active_session"
+
+# Serializes inserts per user, then rejects a second active session
+ACTIVE_SESSION_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION {ACTIVE_SESSION_TRIGGER}() RETURNS trigger AS $$
+BEGIN
+    IF NEW.status IN ('running', 'paused') THEN
+        PERFORM pg_advisory_xact_lock(hashtextextended('{ACTIVE_SESSION_TRIGGER}:' || NEW.created_by_id, 0));
+        IF EXISTS (
+            SELECT 1 FROM {TABLE}
+            WHERE created_by_id = NEW.created_by_id
+              AND status IN ('running', 'paused')
+              AND id <> NEW.id
+        ) THEN
+            RAISE unique_violation USING
+                MESSAGE = 'duplicate key value violates unique constraint "{ACTIVE_SESSION_TRIGGER}"';
+        END IF;
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def _month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _bounds(month):
+    tzinfo = timezone.get_default_timezone()
+    start = timezone.make_aware(datetime.combine(month, datetime.min.time()), tzinfo)
+    end = timezone.make_aware(datetime.combine(_add_months(month, 1), datetime.min.time()), tzinfo)
+    return start, end
+
+
+def _is_partitioned(cursor):
+    cursor.execute(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s))",
+        [TABLE]
+    )
+    return cursor.fetchone()[0]
+
+
+def convert_table(connection, months_ahead=3):
+    """
+    Turn the plain TimerSession table into one partitioned by month
+
+    Returns:
+        False if the table was already partitioned, True otherwise
+    """
+    quote = connection.ops.quote_name
+    table = quote(TABLE)
+    old_name = f"{TABLE}_unpartitioned"
+    old = quote(old_name)
+
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        if _is_partitioned(cursor):
+            return False
+
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {old}")
+
+        # Collected before the old table goes, recreated under the same names
+        cursor.execute(
+            "SELECT pg_get_indexdef(indexrelid) FROM pg_index "
+            "WHERE indrelid = to_regclass(%s) AND NOT indisprimary",
+            [old_name]
+        )
+        indexes = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+            [old_name]
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute("SELECT MIN(start_time) FROM " + old)
+        oldest = cursor.fetchone()[0]
+
+        cursor.execute(
+            f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS INCLUDING IDENTITY "
+            f"INCLUDING CONSTRAINTS INCLUDING STORAGE INCLUDING COMMENTS) "
+            f"PARTITION BY RANGE (start_time)"
+        )
+        cursor.execute(f"CREATE TABLE {quote(DEFAULT_PARTITION)} PARTITION OF {table} DEFAULT")
+
+        tzinfo = timezone.get_default_timezone()
+        current = _month_start(timezone.localdate(timezone=tzinfo))
+        month = _month_start(timezone.localtime(oldest, tzinfo)) if oldest else current
+        while month <= _add_months(current, months_ahead):
+            start, end = _bounds(month)
+            cursor.execute(
+                f"CREATE TABLE {quote(f'{TABLE}_p{month:%Y_%m}')} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+            month = _add_months(month, 1)
+
+        cursor.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+
+        # A serial id keeps its sequence; an identity column got a new one
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [old_name])
+        old_sequence = cursor.fetchone()[0]
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [TABLE])
+        sequence = cursor.fetchone()[0]
+        if sequence:
+            cursor.execute(f"SELECT setval(%s, COALESCE(MAX(id), 0) + 1, false) FROM {table}", [sequence])
+        elif old_sequence:
+            cursor.execute(f"ALTER SEQUENCE {old_sequence} OWNED BY {table}.id")
+
+        cursor.execute(f"DROP TABLE {old}")
+
+        cursor.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, start_time)")
+        for definition in indexes:
+            definition = definition.replace("CREATE UNIQUE INDEX", "CREATE INDEX", 1)
+            definition = re.sub(r" ON (ONLY )?\S+ USING ", f" ON {table} USING ", definition, count=1)
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {quote(name)} {definition}")
+
+        cursor.execute(ACTIVE_SESSION_FUNCTION)
+        cursor.execute(
+            f"CREATE TRIGGER {ACTIVE_SESSION_TRIGGER} BEFORE INSERT OR UPDATE OF status, created_by_id "
+            f"ON {table} FOR EACH ROW EXECUTE FUNCTION {ACTIVE_SESSION_TRIGGER}()"
+        )
+
+    return True
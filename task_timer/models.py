@@ -3,10 +3,32 @@ Models for django-task-timer
 
 TimerSession: Stores individual Pomodoro timer sessions
 TimerSettings: User preferences for timer durations
+DailyTimerStats: Per-user daily totals of finished sessions
+BulkSessionJob: Queued admin bulk action over many sessions
+ArchivedTimerSession: Finished session moved out of the TimerSession table
 """
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
+from task_timer.db import CompressedTextField
+
+
+def seconds_between(start, end):
+    """Return whole seconds from start to end, or 0 if start is unset"""
+    if start is None or end is None:
+        return 0
+    return max(0, int((end - start).total_seconds()))
+
+
+def format_duration(seconds):
+    """Return a duration in seconds formatted as 'Xh Ym'"""
+    minutes = seconds // 60
+    hours = minutes // 60
+    remaining_minutes = minutes % 60
+
+    if hours > 0:
+        return f"{hours}h {remaining_minutes}m"
+    return f"{minutes}m"
 
 
 class TimerSession(models.Model):
@@ -30,7 +52,6 @@ class TimerSession(models.Model):
     )
     start_time = models.DateTimeField(
         default=timezone.now,
-        db_index=True,
         help_text="When the session started"
     )
     end_time = models.DateTimeField(
@@ -46,17 +67,37 @@ class TimerSession(models.Model):
         default=0,
         help_text="Total seconds paused"
     )
+    last_resumed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the session last started running (null unless running)"
+    )
+    paused_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the session was paused (null unless paused)"
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text="When the session was last changed"
+    )
+    last_seen = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Last sign that a client still had the session open"
+    )
     status = models.CharField(
         max_length=20,
         choices=STATUS_CHOICES,
         default='running',
-        db_index=True,
         help_text="Current session status"
     )
     created_by = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
         related_name='timer_sessions',
+        # Served by the indexes below, which all start with created_by
+        db_index=False,
         help_text="User who owns this session"
     )
 
@@ -65,26 +106,56 @@ class TimerSession(models.Model):
         verbose_name_plural = "Timer Sessions"
         ordering = ['-start_time']
         indexes = [
-            models.Index(fields=['created_by', 'status']),
-            models.Index(fields=['created_by', 'start_time']),
+            # History and stats of one user; on PostgreSQL the included
+            # columns let get_stats() and the series run as index-only scans
+            models.Index(
+                fields=['created_by', 'start_time'],
+                include=['duration', 'status'],
+                name='task_timer_user_start_covering',
+            ),
+            # Admin changelist order (-start_time, -id) across all users
+            models.Index(fields=['start_time', 'id']),
+            # Running and paused sessions of every user, walked in id
+            # order by the heartbeat flush and the reaper. Not partial:
+            # SQLite only uses a partial index when the query spells out
+            # its condition as literals, and Django binds them as parameters
+            models.Index(fields=['status', 'id'], name='task_timer_status_id'),
+        ]
+        constraints = [
+            # At most one running or paused session per user; also the
+            # (partial) index for get_active_session()
+            models.UniqueConstraint(
+                fields=['created_by'],
+                condition=models.Q(status__in=['running', 'paused']),
+                name='task_timer_one_active_session',
+            ),
         ]
 
     def __str__(self):
         return f"{self.task} - {self.status}"
 
+    def get_elapsed_seconds(self, now=None):
+        """
+        Return seconds worked up to now, including the current running stretch
+
+        `duration` only holds the time accrued up to `last_resumed_at`, so a
+        running session keeps counting without being written to.
+        """
+        if self.status != 'running' or self.last_resumed_at is None:
+            return self.duration
+
+        if now is None:
+            now = timezone.now()
+
+        return self.duration + seconds_between(self.last_resumed_at, now)
+
     def get_duration_minutes(self):
         """Return duration in minutes"""
         return self.duration / 60.0
 
     def get_duration_formatted(self):
         """Return formatted duration as 'Xh Ym'"""
-        minutes = self.duration // 60
-        hours = minutes // 60
-        remaining_minutes = minutes % 60
-
-        if hours > 0:
-            return f"{hours}h {remaining_minutes}m"
-        return f"{minutes}m"
+        return format_duration(self.duration)
 
 
 class TimerSettings(models.Model):
@@ -124,3 +195,239 @@ class TimerSettings(models.Model):
     def get_work_duration_seconds(self):
         """Return work duration in seconds"""
         return self.work_duration * 60
+
+
+class DailyTimerStats(models.Model):
+    """
+    Per-user, per-day totals of finished timer sessions
+
+    Maintained incrementally by TimerEngine and signals; rebuild with the
+    rebuild_timer_stats management command.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='daily_timer_stats',
+        help_text="User these totals belong to"
+    )
+    date = models.DateField(
+        help_text="Day the sessions started on, in the site timezone"
+    )
+    total_sessions = models.IntegerField(
+        default=0,
+        help_text="Finished sessions started on this day"
+    )
+    completed_sessions = models.IntegerField(
+        default=0,
+        help_text="Sessions that ran to completion"
+    )
+    total_seconds = models.IntegerField(
+        default=0,
+        help_text="Seconds worked across finished sessions"
+    )
+    pause_seconds = models.IntegerField(
+        default=0,
+        help_text="Seconds paused across finished sessions"
+    )
+
+    class Meta:
+        verbose_name = "Daily Timer Stats"
+        verbose_name_plural = "Daily Timer Stats"
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'date'],
+                name='task_timer_daily_stats_user_date',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} on {self.date}"
+
+
+class BulkSessionJob(models.Model):
+    """
+    An admin bulk action over TimerSessions, run in chunks in the background
+
+    Queued by TimerSessionAdmin and processed by the run_session_jobs
+    management command (task_timer.services.bulk_jobs).
+    """
+    ACTION_CHOICES = [
+        ('complete', 'Mark as completed'),
+        ('stop', 'Mark as stopped'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    action = models.CharField(
+        max_length=20,
+        choices=ACTION_CHOICES,
+        help_text="What to do with the selected sessions"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending',
+        help_text="Current job state"
+    )
+    selection = models.JSONField(
+        default=dict,
+        help_text="Selected session ids ({'pks': [...]}) or changelist filter parameters ({'filters': {...}})"
+    )
+    requested_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        help_text="Admin user who queued the job"
+    )
+    total = models.IntegerField(
+        null=True,
+        blank=True,
+        help_text="Sessions selected when the job started"
+    )
+    processed = models.IntegerField(
+        default=0,
+        help_text="Sessions handled so far"
+    )
+    updated = models.IntegerField(
+        default=0,
+        help_text="Sessions whose status changed"
+    )
+    last_pk = models.BigIntegerField(
+        default=0,
+        help_text="Highest session id handled; the job resumes after it"
+    )
+    error = models.TextField(
+        blank=True,
+        help_text="Why the job failed"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="When the job was queued"
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the job started running"
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the job finished or failed"
+    )
+
+    class Meta:
+        verbose_name = "Bulk Session Job"
+        verbose_name_plural = "Bulk Session Jobs"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_action_display()} #{self.pk} - {self.status}"
+
+    def get_progress(self):
+        """Return the share of selected sessions handled, from 0 to 100"""
+        if self.status == 'done':
+            return 100
+        if not self.total:
+            return 0
+        return min(100, self.processed * 100 // self.total)
+
+
+class ArchivedTimerSession(models.Model):
+    """
+    A finished TimerSession moved to cold storage
+
+    Written by the archive_timer_sessions management command
+    (task_timer.services.archive). Rows keep the id and every column of the
+    original session, so history and stats reads can merge them with
+    TimerSession rows; task and notes may be stored compressed.
+    """
+    id = models.BigIntegerField(
+        primary_key=True,
+        help_text="Id the session had in the TimerSession table"
+    )
+    task = CompressedTextField(
+        help_text="Description of what you're working on"
+    )
+    notes = CompressedTextField(
+        blank=True,
+        default='',
+        help_text="Optional notes about the task"
+    )
+    start_time = models.DateTimeField(
+        help_text="When the session started"
+    )
+    end_time = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the session completed/stopped"
+    )
+    duration = models.IntegerField(
+        default=0,
+        help_text="Total seconds worked (excluding pauses)"
+    )
+    pause_duration = models.IntegerField(
+        default=0,
+        help_text="Total seconds paused"
+    )
+    last_resumed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Always null; kept so rows match TimerSession"
+    )
+    paused_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Always null; kept so rows match TimerSession"
+    )
+    updated_at = models.DateTimeField(
+        help_text="When the session was last changed before it was archived"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=TimerSession.STATUS_CHOICES,
+        help_text="Final session status"
+    )
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_timer_sessions',
+        help_text="User who owns this session"
+    )
+    archived_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="When the session was moved to the archive"
+    )
+
+    class Meta:
+        verbose_name = "Archived Timer Session"
+        verbose_name_plural = "Archived Timer Sessions"
+        ordering = ['-start_time']
+        indexes = [
+            models.Index(fields=['created_by', 'start_time']),
+        ]
+
+    def __str__(self):
+        return f"{self.task} - {self.status}"
+
+    def get_elapsed_seconds(self, now=None):
+        """Return seconds worked; archived sessions are always finished"""
+        return self.duration
+
+    def get_duration_minutes(self):
+        """Return duration in minutes"""
+        return self.duration / 60.0
+
+    def get_duration_formatted(self):
+        """Return formatted duration as 'Xh Ym'"""
+        return format_duration(self.duration)
@@ -0,0 +1,245 @@
+"""
+Pagination for task_timer
+
+Sessions are paged by keyset on (start_time, id), newest first: each page
+filters past the last row of the previous one instead of counting and
+skipping rows, so the (created_by, start_time) index serves every page
+and deep pages cost the same as the first. Archived sessions are merged
+in from a second query only once a page reaches past the archive horizon.
+
+paginate_keyset: Keyset page of sessions, shared by the API and templates
+SessionCursorPagination: DRF pagination class built on paginate_keyset
+StandardResultsSetPagination: Page-number pagination (needs COUNT/OFFSET)
+"""
+import base64
+import binascii
+from datetime import datetime
+
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from task_timer.services import archive as session_archive
+
+ORDERING = ('-start_time', '-id')
+
+
+def _position(session):
+    """Return the (start_time, id) sort key of a session or .values() dict"""
+    if isinstance(session, dict):
+        return session['start_time'], session['id']
+    return session.start_time, session.pk
+
+
+def encode_cursor(session, previous=False):
+    """
+    Encode the position of a session as an opaque cursor
+
+    Args:
+        session: TimerSession (or .values() dict) the page starts after
+        previous: True if the cursor pages towards newer sessions
+    """
+    start_time, pk = _position(session)
+    position = f"{'p' if previous else 'n'}|{start_time.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor made by encode_cursor()
+
+    Returns:
+        (previous, start_time, pk) tuple
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        direction, start_time, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError('Invalid cursor')
+
+    if direction not in ('n', 'p'):
+        raise ValueError('Invalid cursor')
+
+    return direction == 'p', datetime.fromisoformat(start_time), int(pk)
+
+
+class KeysetPage:
+    """One page of sessions with the cursors for its neighbours"""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def _page_rows(queryset, previous, position, limit):
+    """Fetch up to limit rows past a cursor position, in page order"""
+    queryset = queryset.order_by(*ORDERING)
+
+    if position:
+        start_time, pk = position
+        # Written as a range on start_time plus a tie-break, so the index
+        # range scan stops at the cursor.
+        if previous:
+            queryset = queryset.filter(
+                Q(start_time__gte=start_time),
+                Q(start_time__gt=start_time) | Q(id__gt=pk)
+            ).order_by('start_time', 'id')
+        else:
+            queryset = queryset.filter(
+                Q(start_time__lte=start_time),
+                Q(start_time__lt=start_time) | Q(id__lt=pk)
+            )
+
+    return list(queryset[:limit])
+
+
+def _reaches_archive(rows, previous, position, limit):
+    """Return True if archived sessions could belong on a page"""
+    edge = session_archive.horizon()
+    if edge is None:
+        return False
+
+    # Archived sessions all started before the horizon, so they only fit
+    # on pages that are not already full of later sessions
+    if previous:
+        return position[0] < edge
+    return len(rows) < limit or _position(rows[-1])[0] < edge
+
+
+def paginate_keyset(queryset, cursor=None, page_size=20, archive=None):
+    """
+    Return one page of sessions, newest first
+
+    Runs a single LIMIT query whatever the depth of the page, plus one on
+    the archive for pages that reach past the archive horizon.
+
+    Args:
+        queryset: TimerSession QuerySet (instances or .values() dicts)
+        cursor: Cursor from a previous page, or None for the first page
+        page_size: Number of sessions per page
+        archive: Matching ArchivedTimerSession QuerySet to merge in (optional)
+
+    Returns:
+        KeysetPage
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    previous = False
+    position = None
+
+    if cursor:
+        previous, start_time, pk = decode_cursor(cursor)
+        position = (start_time, pk)
+
+    rows = _page_rows(queryset, previous, position, page_size + 1)
+
+    if archive is not None and _reaches_archive(rows, previous, position, page_size + 1):
+        rows = sorted(
+            rows + _page_rows(archive, previous, position, page_size + 1),
+            key=_position,
+            reverse=not previous
+        )[:page_size + 1]
+
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    if previous:
+        rows.reverse()
+        has_next, has_previous = True, has_more
+    else:
+        has_next, has_previous = has_more, bool(cursor)
+
+    return KeysetPage(
+        rows,
+        next_cursor=encode_cursor(rows[-1]) if rows and has_next else None,
+        previous_cursor=encode_cursor(rows[0], previous=True) if rows and has_previous else None
+    )
+
+
+class SessionCursorPagination(BasePagination):
+    """Keyset pagination for sessions: 20 items per page, no COUNT(*)"""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = _('Invalid cursor')
+
+    def paginate_queryset(self, queryset, request, view=None, archive=None):
+        self.request = request
+        try:
+            self.page = paginate_keyset(
+                queryset,
+                request.query_params.get(self.cursor_query_param),
+                self.get_page_size(request),
+                archive=archive
+            )
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        return self.page.object_list
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def _link(self, cursor):
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        return self._link(self.page.next_cursor)
+
+    def get_previous_link(self):
+        return self._link(self.page.previous_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class StandardResultsSetPagination(PageNumberPagination):
+    """Standard pagination: 20 items per page"""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
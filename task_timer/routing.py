@@ -0,0 +1,9 @@
+"""
+WebSocket routing for task_timer (requires Django Channels)
+"""
+from django.urls import path
+from task_timer.consumers import TimerEventsConsumer
+
+websocket_urlpatterns = [
+    path('ws/timer/events/', TimerEventsConsumer.as_asgi()),
+]
@@ -1,15 +1,30 @@
 """
 Serializers for task_timer API
 """
-from rest_framework import serializers
-from task_timer.models import TimerSession, TimerSettings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from task_timer.models import TimerSession, TimerSettings, format_duration, seconds_between
 
 
 class TimerSessionSerializer(serializers.ModelSerializer):
-    """Serializer for TimerSession model"""
+    """
+    Serializer for TimerSession model
+
+    Pass fields=[...] to return only some fields (see select_fields()), and
+    narrow the queryset with only_fields() so the rest are never loaded.
+    """
 
     duration_minutes = serializers.SerializerMethodField()
     duration_formatted = serializers.SerializerMethodField()
+    elapsed_seconds = serializers.SerializerMethodField()
+
+    # Model fields read by the computed fields
+    field_sources = {
+        'duration_minutes': ['duration'],
+        'duration_formatted': ['duration'],
+        'elapsed_seconds': ['status', 'duration', 'last_resumed_at'],
+    }
 
     class Meta:
         model = TimerSession
@@ -24,9 +39,59 @@ class TimerSessionSerializer(serializers.ModelSerializer):
             'duration_formatted',
             'pause_duration',
             'status',
-            'created_by'
+            'created_by',
+            'last_resumed_at',
+            'paused_at',
+            'elapsed_seconds'
+        ]
+        read_only_fields = [
+            'id', 'start_time', 'end_time', 'created_by', 'status',
+            'last_resumed_at', 'paused_at'
         ]
-        read_only_fields = ['id', 'start_time', 'end_time', 'created_by', 'status']
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def select_fields(cls, fields=None, omit=None):
+        """
+        Resolve a sparse fieldset
+
+        Args:
+            fields: Field names to include (defaults to all)
+            omit: Field names to leave out
+
+        Returns:
+            List of field names, in the serializer's order
+
+        Raises:
+            ValidationError: If a name is not a serializer field
+        """
+        available = cls.Meta.fields
+        unknown = [name for name in (fields or []) + (omit or []) if name not in available]
+        if unknown:
+            raise serializers.ValidationError(
+                {'fields': f"Unknown field(s): {', '.join(unknown)}"}
+            )
+
+        return [
+            name for name in available
+            if (not fields or name in fields) and name not in (omit or [])
+        ]
+
+    @classmethod
+    def only_fields(cls, fields):
+        """Return the model fields to load for the given serializer fields"""
+        columns = ['id']
+        for name in fields:
+            for column in cls.field_sources.get(name, [name]):
+                if column not in columns:
+                    columns.append(column)
+        return columns
 
     def get_duration_minutes(self, obj):
         return obj.get_duration_minutes()
@@ -34,6 +99,85 @@ class TimerSessionSerializer(serializers.ModelSerializer):
     def get_duration_formatted(self, obj):
         return obj.get_duration_formatted()
 
+    def get_elapsed_seconds(self, obj):
+        return obj.get_elapsed_seconds()
+
+
+def _datetime_representation():
+    """Return a function equivalent to DateTimeField().to_representation"""
+    field = serializers.DateTimeField()
+    output_format = api_settings.DATETIME_FORMAT
+    field_timezone = field.default_timezone()
+
+    if not isinstance(output_format, str) or output_format.lower() != ISO_8601 or field_timezone is None:
+        return field.to_representation
+
+    # Same output as DRF, with the timezone looked up once per listing
+    def represent(value):
+        value = value.astimezone(field_timezone).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+
+    return represent
+
+
+def _elapsed_seconds(row, now):
+    if row['status'] != 'running' or row['last_resumed_at'] is None:
+        return row['duration']
+    return row['duration'] + seconds_between(row['last_resumed_at'], now)
+
+
+def serialize_session_values(rows, fields=None):
+    """
+    Build TimerSessionSerializer output from .values() rows
+
+    Skips per-row serializer and model instances, which dominate the cost
+    of long listings. The output matches TimerSessionSerializer(many=True).
+
+    Args:
+        rows: Dicts from TimerSession.objects.values(*only_fields(fields))
+        fields: Serializer field names to include (defaults to all)
+
+    Returns:
+        List of dicts
+    """
+    return list(iter_session_values(rows, fields))
+
+
+def iter_session_values(rows, fields=None):
+    """Lazy version of serialize_session_values(), for streaming"""
+    if fields is None:
+        fields = TimerSessionSerializer.Meta.fields
+
+    represent_datetime = _datetime_representation()
+    now = timezone.now()
+
+    def to_datetime(name):
+        return lambda row: None if row[name] is None else represent_datetime(row[name])
+
+    def copy(name):
+        return lambda row: row[name]
+
+    computed = {
+        'duration_minutes': lambda row: row['duration'] / 60.0,
+        'duration_formatted': lambda row: format_duration(row['duration']),
+        'elapsed_seconds': lambda row: _elapsed_seconds(row, now),
+    }
+
+    converters = []
+    for name in fields:
+        if name in computed:
+            converter = computed[name]
+        elif TimerSession._meta.get_field(name).get_internal_type() == 'DateTimeField':
+            converter = to_datetime(name)
+        else:
+            converter = copy(name)
+        converters.append((name, converter))
+
+    for row in rows:
+        yield {name: converter(row) for name, converter in converters}
+
 
 class TimerSettingsSerializer(serializers.ModelSerializer):
     """Serializer for TimerSettings model"""
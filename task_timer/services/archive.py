@@ -0,0 +1,153 @@
+"""
+Retention: moving old finished sessions to ArchivedTimerSession
+
+With TASK_TIMER_ARCHIVE_AFTER_DAYS set, the archive_timer_sessions
+management command moves completed and stopped sessions that started
+more than that many days ago out of the TimerSession table, one batch of
+primary keys per short transaction, so the hot table and its indexes
+only hold recent history. With TASK_TIMER_ARCHIVE_COMPRESS enabled, task
+and notes are zlib-compressed on the way.
+
+Readers do not need to know:
+- DailyTimerStats rows are left alone, and rollup recomputation counts
+  archived sessions too
+- history and stats reads whose range starts before the archive horizon
+  (see reaches()) merge archived rows in; reads of recent ranges never
+  touch the archive table
+
+Every archived session started before the horizon in force when it was
+moved. Lowering the setting later is safe, but raising it hides sessions
+archived under the old value from ranges that start after the new
+horizon.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+from task_timer.conf import get_setting
+from task_timer.models import ArchivedTimerSession, TimerSession
+from task_timer.services import rollup
+
+# Columns copied from TimerSession; archived_at is set on the way
+FIELDS = [
+    field.attname for field in ArchivedTimerSession._meta.concrete_fields
+    if field.name != 'archived_at'
+]
+
+
+def is_enabled():
+    """Return True if sessions are archived after TASK_TIMER_ARCHIVE_AFTER_DAYS"""
+    return get_setting('ARCHIVE_AFTER_DAYS') is not None
+
+
+def horizon(now=None):
+    """
+    Return the start time before which finished sessions are archived
+
+    Returns:
+        Aware datetime, or None if archiving is off
+    """
+    days = get_setting('ARCHIVE_AFTER_DAYS')
+    if days is None:
+        return None
+
+    if now is None:
+        now = timezone.now()
+
+    return now - timedelta(days=days)
+
+
+def reaches(start):
+    """
+    Return True if a read of sessions from start on must include the archive
+
+    Args:
+        start: Earliest start_time read, or None for all history
+    """
+    edge = horizon()
+    if edge is None:
+        return False
+    return start is None or start < edge
+
+
+def archivable_sessions(before=None):
+    """
+    Return the finished sessions that started before a cutoff
+
+    Args:
+        before: Cutoff datetime (defaults to horizon())
+
+    Raises:
+        ValueError: If no cutoff is given and archiving is off
+    """
+    if before is None:
+        before = horizon()
+        if before is None:
+            raise ValueError('Archiving is off; set TASK_TIMER_ARCHIVE_AFTER_DAYS')
+
+    return TimerSession.objects.filter(status__in=rollup.FINISHED_STATUSES, start_time__lt=before)
+
+
+def _archive_batch(sessions, last_pk, batch_size, now):
+    """
+    Move the next primary key range of sessions in one transaction
+
+    Returns:
+        List of the ids moved (empty once nothing is left)
+    """
+    with transaction.atomic():
+        rows = list(
+            sessions.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .select_for_update()
+            .values(*FIELDS)[:batch_size]
+        )
+        if not rows:
+            return []
+
+        ArchivedTimerSession.objects.bulk_create(
+            [ArchivedTimerSession(archived_at=now, **row) for row in rows]
+        )
+
+        # A raw DELETE skips the post_delete signals, which would recompute
+        # the rollup days the sessions were counted on; the totals do not
+        # change, since recomputation reads the archive as well.
+        batch = sessions.filter(pk__gt=last_pk, pk__lte=rows[-1]['id'])
+        batch._raw_delete(batch.db)
+
+    return [row['id'] for row in rows]
+
+
+def archive_sessions(before=None, batch_size=1000, progress=None):
+    """
+    Move finished sessions that started before a cutoff to the archive
+
+    Args:
+        before: Cutoff datetime (defaults to horizon()); readers only look
+            in the archive before the horizon, so pass an earlier one only
+        batch_size: Sessions moved per transaction
+        progress: Optional callable, called with the running total after
+            each batch
+
+    Returns:
+        Number of sessions archived
+
+    Raises:
+        ValueError: If no cutoff is given and archiving is off
+    """
+    sessions = archivable_sessions(before)
+    now = timezone.now()
+    archived = 0
+    last_pk = 0
+
+    while True:
+        moved = _archive_batch(sessions, last_pk, batch_size, now)
+        if not moved:
+            break
+
+        archived += len(moved)
+        last_pk = moved[-1]
+        if progress:
+            progress(archived)
+
+    return archived
@@ -0,0 +1,232 @@
+"""
+Chunked background execution of admin bulk actions
+
+Instead of updating every selected session inside the admin request,
+TimerSessionAdmin queues a BulkSessionJob holding a JSON description of
+the selection: the ticked ids, or the changelist's filter parameters when
+every matching session was selected. run_job() (via the run_session_jobs management command) walks
+the selection in primary key ranges of batch_size sessions, each range in
+its own short transaction:
+
+- sessions are finished with timer_engine.finish_sessions(), the same
+  UPDATE TimerEngine uses for stop and complete
+- the rollup days they touch are refreshed and the owners' cached
+  sessions and stats are dropped
+- the job's progress is saved, so an interrupted job resumes where it
+  stopped
+
+Only the filter parameters in FILTERS are accepted, so a stored selection
+can never widen into something the changelist could not show.
+"""
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from task_timer.models import BulkSessionJob, TimerSession
+from task_timer.services import rollup, session_cache, session_search, stats_cache
+from task_timer.services.timer_engine import finish_sessions
+
+# Final session status for each job action
+ACTION_STATUSES = {
+    'complete': 'completed',
+    'stop': 'stopped',
+}
+
+# Changelist filter parameters a job can be queued with, and how each
+# narrows the sessions
+FILTERS = {
+    'status__exact': lambda queryset, value: queryset.filter(status=value),
+    'start_time__gte': lambda queryset, value: queryset.filter(start_time__gte=value),
+    'start_time__lt': lambda queryset, value: queryset.filter(start_time__lt=value),
+    'user': session_search.filter_by_user,
+    'q': session_search.search,
+}
+
+
+def selection_queryset(selection):
+    """
+    Build the sessions a job selection describes
+
+    Args:
+        selection: {'pks': [ids]} or {'filters': {parameter: value}} with
+            parameters from FILTERS
+
+    Returns:
+        TimerSession QuerySet
+
+    Raises:
+        ValueError: If the selection is malformed or uses an unknown filter
+    """
+    queryset = TimerSession.objects.all()
+
+    if not isinstance(selection, dict) or len(selection) != 1:
+        raise ValueError("Selection must have either 'pks' or 'filters'")
+
+    if 'pks' in selection:
+        pks = selection['pks']
+        if not isinstance(pks, list) or not all(isinstance(pk, int) for pk in pks):
+            raise ValueError('Selection pks must be a list of ids')
+        return queryset.filter(pk__in=pks)
+
+    filters = selection.get('filters')
+    if not isinstance(filters, dict):
+        raise ValueError("Selection must have either 'pks' or 'filters'")
+
+    unknown = sorted(set(filters) - set(FILTERS))
+    if unknown:
+        raise ValueError(f"Cannot queue a job filtered by: {', '.join(unknown)}")
+
+    try:
+        for name, value in filters.items():
+            queryset = FILTERS[name](queryset, value)
+    except ValidationError as e:
+        raise ValueError('; '.join(e.messages))
+
+    return queryset
+
+
+def create_job(selection, action, requested_by=None):
+    """
+    Queue a bulk action over a selection of sessions
+
+    Only the selection is stored; nothing is counted or updated until the
+    job runs.
+
+    Args:
+        selection: Sessions to change, as described in selection_queryset()
+        action: Key of ACTION_STATUSES
+        requested_by: User who asked for it (optional)
+
+    Returns:
+        The pending BulkSessionJob
+
+    Raises:
+        ValueError: If the action is unknown or the selection is invalid
+    """
+    if action not in ACTION_STATUSES:
+        raise ValueError(f"Action must be one of: {', '.join(ACTION_STATUSES)}")
+
+    # Validates without running a query
+    selection_queryset(selection)
+
+    return BulkSessionJob.objects.create(
+        action=action,
+        selection=selection,
+        requested_by=requested_by
+    )
+
+
+def job_queryset(job):
+    """Return the sessions a job was queued for"""
+    return selection_queryset(job.selection)
+
+
+def claim_job(job_id=None):
+    """
+    Mark a job as running and return it
+
+    Args:
+        job_id: Job to resume, whatever its state short of done; by default
+            the oldest pending job, skipping any another runner has locked
+
+    Returns:
+        BulkSessionJob, or None if there is nothing to run
+    """
+    with transaction.atomic():
+        jobs = BulkSessionJob.objects.select_for_update(skip_locked=True).order_by('created_at', 'pk')
+        if job_id is None:
+            jobs = jobs.filter(status='pending')
+        else:
+            jobs = jobs.filter(pk=job_id).exclude(status='done')
+
+        job = jobs.first()
+        if job is None:
+            return None
+
+        job.status = 'running'
+        job.error = ''
+        job.started_at = job.started_at or timezone.now()
+        job.save(update_fields=['status', 'error', 'started_at'])
+
+    return job
+
+
+def invalidate_owners(queryset):
+    """Drop cached active sessions and stats for the owners of queryset's sessions"""
+    if session_cache.is_enabled() or stats_cache.is_enabled():
+        user_ids = list(queryset.order_by().values_list('created_by_id', flat=True).distinct())
+        if session_cache.is_enabled():
+            session_cache.invalidate(*user_ids)
+        if stats_cache.is_enabled():
+            stats_cache.invalidate(*user_ids)
+
+
+def _run_batch(job, selection, status, batch_size):
+    """
+    Handle the next primary key range of a job in one transaction
+
+    Returns:
+        False once nothing is left
+    """
+    with transaction.atomic():
+        pks = list(
+            selection.filter(pk__gt=job.last_pk)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not pks:
+            return False
+
+        batch = selection.filter(pk__gt=job.last_pk, pk__lte=pks[-1])
+
+        refresh_daily_stats = rollup.refresh_for_sessions(batch)
+        invalidate_owners(batch)
+        job.updated += finish_sessions(batch, status)
+        refresh_daily_stats()
+
+        job.processed += len(pks)
+        job.last_pk = pks[-1]
+        job.save(update_fields=['processed', 'updated', 'last_pk'])
+
+    return True
+
+
+def run_job(job, batch_size=1000, progress=None):
+    """
+    Process a claimed job to the end
+
+    Args:
+        job: BulkSessionJob from claim_job()
+        batch_size: Sessions per transaction
+        progress: Optional callable, called with the job after each batch
+
+    Returns:
+        The job, now done
+
+    Raises:
+        Exception: Whatever stopped the job; it is saved as failed first,
+            and can be resumed with claim_job(job.pk)
+    """
+    status = ACTION_STATUSES[job.action]
+
+    try:
+        selection = job_queryset(job).order_by()
+
+        if job.total is None:
+            job.total = selection.count()
+            job.save(update_fields=['total'])
+
+        while _run_batch(job, selection, status, batch_size):
+            if progress:
+                progress(job)
+    except Exception as e:
+        job.status = 'failed'
+        job.error = str(e)
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'finished_at'])
+        raise
+
+    job.status = 'done'
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'finished_at'])
+
+    return job
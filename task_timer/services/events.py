@@ -0,0 +1,182 @@
+"""
+Push events for timer state changes
+
+When TASK_TIMER_PUSH_EVENTS is enabled, TimerEngine publishes an event
+for every state change once its transaction commits:
+
+- session: the session as returned by /api/timer/active/
+- stats: fresh get_dashboard_stats() totals
+
+Each event is appended to a short per-user log in the Django cache, which
+the Server-Sent Events views read (views.timer_events_view under WSGI,
+async_views.timer_events_view under ASGI), so SSE works with any shared
+cache backend. If Django Channels is
+installed and CHANNEL_LAYERS is configured, events are also sent to the
+user's group for the WebSocket consumer in task_timer.consumers.
+"""
+import json
+import time
+
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from task_timer.conf import get_setting
+
+KEY_PREFIX = 'task_timer:events:'
+
+# Most events returned by one read_events() call
+MAX_READ = 100
+
+
+def _cache():
+    return caches[get_setting('CACHE_ALIAS')]
+
+
+def is_enabled():
+    """Return True if timer events are published"""
+    return get_setting('PUSH_EVENTS')
+
+
+def group_name(user_id):
+    """Return the channel layer group holding a user's connections"""
+    return f'task_timer.events.{user_id}'
+
+
+def _last_id_key(user_id):
+    return f'{KEY_PREFIX}{user_id}:last'
+
+
+def _event_key(user_id, event_id):
+    return f'{KEY_PREFIX}{user_id}:{event_id}'
+
+
+def _start_id():
+    # Start from the clock rather than 0, so an evicted counter never
+    # hands out ids that clients have already seen. Microseconds keep ids
+    # apart across quick evictions and still fit in a JavaScript number.
+    return time.time_ns() // 1000
+
+
+def last_event_id(user_id):
+    """Return the id of a user's most recent event (0 if none are stored)"""
+    return _cache().get(_last_id_key(user_id), 0)
+
+
+async def alast_event_id(user_id):
+    """Async version of last_event_id()"""
+    return await _cache().aget(_last_id_key(user_id), 0)
+
+
+def _next_id(user_id):
+    cache = _cache()
+    key = _last_id_key(user_id)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, _start_id(), None)
+        return cache.incr(key)
+
+
+def _channel_layer():
+    try:
+        from channels.layers import get_channel_layer
+    except ImportError:
+        return None
+    return get_channel_layer()
+
+
+def send_event(user_id, event, data):
+    """
+    Store an event and send it to the user's channel layer group
+
+    Args:
+        user_id: Primary key of the user
+        event: Event name ('session' or 'stats')
+        data: JSON-serializable payload
+
+    Returns:
+        The event id
+    """
+    data = json.loads(json.dumps(data, cls=DjangoJSONEncoder))
+    event_id = _next_id(user_id)
+    _cache().set(
+        _event_key(user_id, event_id),
+        {'id': event_id, 'event': event, 'data': data},
+        get_setting('PUSH_EVENTS_TIMEOUT')
+    )
+
+    layer = _channel_layer()
+    if layer is not None:
+        from asgiref.sync import async_to_sync
+        async_to_sync(layer.group_send)(group_name(user_id), {
+            'type': 'timer.event',
+            'id': event_id,
+            'event': event,
+            'data': data,
+        })
+
+    return event_id
+
+
+def read_events(user_id, after_id):
+    """
+    Return the user's stored events newer than after_id, oldest first
+
+    Expired events are skipped; at most MAX_READ are returned per call.
+    """
+    keys = _event_keys(user_id, after_id, last_event_id(user_id))
+    if not keys:
+        return []
+
+    stored = _cache().get_many(keys)
+    return [stored[key] for key in keys if key in stored]
+
+
+async def aread_events(user_id, after_id):
+    """Async version of read_events()"""
+    keys = _event_keys(user_id, after_id, await alast_event_id(user_id))
+    if not keys:
+        return []
+
+    stored = await _cache().aget_many(keys)
+    return [stored[key] for key in keys if key in stored]
+
+
+def _event_keys(user_id, after_id, last_id):
+    """Return the cache keys of the events after after_id, up to MAX_READ"""
+    if last_id <= after_id:
+        return []
+
+    first_id = max(after_id + 1, last_id - MAX_READ + 1)
+    return [_event_key(user_id, event_id) for event_id in range(first_id, last_id + 1)]
+
+
+def publish_state(user_id, session, get_stats):
+    """
+    Publish a session's new state and the user's stats after commit
+
+    Args:
+        user_id: Primary key of the user
+        session: TimerSession instance after the change
+        get_stats: Callable returning get_dashboard_stats(), called after
+            commit so it sees the committed rollup
+    """
+    from task_timer.serializers import TimerSessionSerializer
+
+    data = TimerSessionSerializer(session).data
+
+    def send():
+        send_event(user_id, 'session', data)
+        send_event(user_id, 'stats', get_stats())
+
+    transaction.on_commit(send)
+
+
+def format_sse(event, data, event_id=None):
+    """Format one Server-Sent Events message"""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data, cls=DjangoJSONEncoder)}')
+    return '\n'.join(lines) + '\n\n'
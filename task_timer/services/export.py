@@ -0,0 +1,130 @@
+"""
+Streaming export of timer sessions
+
+Sessions are read with QuerySet.iterator(chunk_size=...) and written out
+one chunk at a time as NDJSON or CSV, optionally gzip-compressed, so
+memory use stays flat however long the history is. The same generators
+feed the API's StreamingHttpResponse and the export_timer_sessions
+management command; under ASGI, async_chunks() hands them to Django one
+chunk at a time, since Django reads a sync iterator to the end before
+sending anything there.
+"""
+import csv
+import json
+import zlib
+from itertools import chain
+
+from asgiref.sync import sync_to_async
+from task_timer.serializers import TimerSessionSerializer, iter_session_values
+
+FORMATS = ['ndjson', 'csv']
+
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+class _Echo:
+    """File-like object whose write() returns the value, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def _ndjson_lines(rows, fields):
+    for row in rows:
+        yield json.dumps(row, separators=(',', ':')) + '\n'
+
+
+def _csv_lines(rows, fields):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([row[name] for name in fields])
+
+
+def export_lines(queryset, export_format='ndjson', fields=None, chunk_size=2000):
+    """
+    Yield a session export line by line
+
+    Args:
+        queryset: TimerSession QuerySet to export, in its own ordering, or a
+            list of QuerySets (e.g. live and archived sessions) exported one
+            after the other
+        export_format: 'ndjson' or 'csv'
+        fields: Serializer field names to include (defaults to all)
+        chunk_size: Rows fetched from the database at a time
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if export_format not in FORMATS:
+        raise ValueError(f"Format must be one of: {', '.join(FORMATS)}")
+
+    if fields is None:
+        fields = TimerSessionSerializer.Meta.fields
+
+    querysets = queryset if isinstance(queryset, (list, tuple)) else [queryset]
+    columns = TimerSessionSerializer.only_fields(fields)
+    rows = chain.from_iterable(
+        queryset.values(*columns).iterator(chunk_size=chunk_size) for queryset in querysets
+    )
+    rows = iter_session_values(rows, fields)
+
+    if export_format == 'csv':
+        return _csv_lines(rows, fields)
+    return _ndjson_lines(rows, fields)
+
+
+def encode_chunks(lines, chunk_size=2000, compress=False):
+    """
+    Join lines into UTF-8 byte chunks, optionally as one gzip stream
+
+    Args:
+        lines: Iterable of str
+        chunk_size: Lines per chunk
+        compress: gzip-compress the output
+
+    Yields:
+        bytes
+    """
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compress else None
+    batch = []
+
+    def flush():
+        data = ''.join(batch).encode()
+        batch.clear()
+        return compressor.compress(data) if compressor else data
+
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= chunk_size:
+            data = flush()
+            if data:
+                yield data
+
+    data = flush()
+    if compressor:
+        data += compressor.flush()
+    if data:
+        yield data
+
+
+async def async_chunks(chunks):
+    """
+    Yield the items of a sync iterator, fetching each in the sync thread
+
+    Each chunk is produced in the thread the sync view ran in, which owns
+    the database connection and the export's cursor.
+
+    Args:
+        chunks: Iterable, e.g. from encode_chunks()
+    """
+    iterator = iter(chunks)
+    fetch = sync_to_async(next, thread_sensitive=True)
+    while True:
+        chunk = await fetch(iterator, None)
+        if chunk is None:
+            return
+        yield chunk
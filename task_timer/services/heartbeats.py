@@ -0,0 +1,173 @@
+"""
+Write-behind buffer for duration heartbeats
+
+When TASK_TIMER_HEARTBEAT_WRITE_BEHIND is enabled, update-duration calls
+only write the reported duration to the cache. flush_heartbeats() writes
+the buffered values back in batches, and the engine folds a session's
+pending heartbeat into the update that pauses or finishes it.
+"""
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+from task_timer.conf import get_setting
+from task_timer.models import TimerSession
+from task_timer.services import session_cache, stats_cache
+
+KEY_PREFIX = 'task_timer:heartbeat:'
+
+
+def _cache():
+    return caches[get_setting('CACHE_ALIAS')]
+
+
+def heartbeat_key(user_id):
+    """Return the cache key holding a user's pending heartbeat"""
+    return f'{KEY_PREFIX}{user_id}'
+
+
+def is_enabled():
+    """Return True if heartbeats are buffered instead of saved"""
+    return get_setting('HEARTBEAT_WRITE_BEHIND')
+
+
+def record_heartbeat(session, duration, at=None):
+    """
+    Buffer a reported duration for a session
+
+    Args:
+        session: Active TimerSession instance
+        duration: Duration in seconds as reported by the client
+        at: When the duration was reported (defaults to now)
+    """
+    if at is None:
+        at = timezone.now()
+
+    _cache().set(
+        heartbeat_key(session.created_by_id),
+        {'session_id': session.pk, 'duration': duration, 'at': at},
+        get_setting('HEARTBEAT_TIMEOUT')
+    )
+
+
+async def arecord_heartbeat(session, duration, at=None):
+    """Async counterpart of record_heartbeat()"""
+    if at is None:
+        at = timezone.now()
+
+    await _cache().aset(
+        heartbeat_key(session.created_by_id),
+        {'session_id': session.pk, 'duration': duration, 'at': at},
+        get_setting('HEARTBEAT_TIMEOUT')
+    )
+
+
+def _apply(session, entry):
+    """
+    Copy a buffered heartbeat onto a session instance if it is newer
+
+    Returns:
+        True if the session was changed
+    """
+    if not entry or entry['session_id'] != session.pk:
+        return False
+
+    if session.status != 'running':
+        return False
+
+    if session.last_resumed_at is not None and entry['at'] <= session.last_resumed_at:
+        return False
+
+    session.duration = entry['duration']
+    session.last_resumed_at = entry['at']
+    session.last_seen = entry['at']
+    session.updated_at = entry['at']
+    return True
+
+
+def pending_heartbeat(user_id):
+    """
+    Return a user's buffered heartbeat without removing it
+
+    Args:
+        user_id: Primary key of the session owner
+
+    Returns:
+        dict with keys session_id, duration and at, or None
+    """
+    return _cache().get(heartbeat_key(user_id))
+
+
+def discard_heartbeat(user_id, entry):
+    """
+    Drop a buffered heartbeat once the current transaction commits
+
+    The entry is only removed if it is still the one that was read, so a
+    heartbeat recorded in the meantime is kept. On rollback the entry
+    stays buffered for the next flush or state change.
+
+    Args:
+        user_id: Primary key of the session owner
+        entry: Entry returned by pending_heartbeat()
+    """
+    def discard():
+        cache = _cache()
+        key = heartbeat_key(user_id)
+        if cache.get(key) == entry:
+            cache.delete(key)
+
+    transaction.on_commit(discard)
+
+
+def flush_heartbeats(batch_size=500, user_ids=None):
+    """
+    Write buffered heartbeats for running sessions to the database
+
+    Running sessions are walked in primary key order and each batch is
+    written with a single bulk_update. Buffered entries are left in the
+    cache; they are ignored once applied because the session's
+    last_resumed_at moves up to the heartbeat time.
+
+    Args:
+        batch_size: Number of sessions to handle per query
+        user_ids: Only flush these users' sessions (defaults to everyone)
+
+    Returns:
+        Number of sessions updated
+    """
+    cache = _cache()
+    updated = 0
+    last_pk = 0
+
+    running = TimerSession.objects.filter(status='running')
+    if user_ids is not None:
+        running = running.filter(created_by_id__in=user_ids)
+
+    while True:
+        with transaction.atomic():
+            sessions = list(
+                running
+                .select_for_update(skip_locked=True)
+                .filter(pk__gt=last_pk)
+                .only('id', 'created_by_id', 'status', 'duration', 'last_resumed_at', 'last_seen')
+                .order_by('pk')[:batch_size]
+            )
+            if not sessions:
+                break
+
+            last_pk = sessions[-1].pk
+            entries = cache.get_many([heartbeat_key(s.created_by_id) for s in sessions])
+            dirty = [
+                session for session in sessions
+                if _apply(session, entries.get(heartbeat_key(session.created_by_id)))
+            ]
+
+            if dirty:
+                TimerSession.objects.bulk_update(dirty, fields=['duration', 'last_resumed_at', 'last_seen', 'updated_at'])
+                owners = [session.created_by_id for session in dirty]
+                if session_cache.is_enabled():
+                    session_cache.invalidate(*owners)
+                if stats_cache.is_enabled():
+                    stats_cache.invalidate(*owners)
+                updated += len(dirty)
+
+    return updated
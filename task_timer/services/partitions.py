@@ -0,0 +1,330 @@
+"""
+Monthly range partitioning of TimerSession on PostgreSQL
+
+Optional, and only on PostgreSQL 13 or later. convert_table() turns
+the TimerSession table into one partitioned by month on start_time;
+migration 0009 runs it when TASK_TIMER_PARTITION_SESSIONS is enabled,
+and `create_session_partitions --convert` runs it on a database that
+was migrated before. Queries that filter on start_time (history ranges,
+stats windows and series) are then pruned to the months they cover, and
+old months can be detached or dropped whole instead of deleted row by
+row.
+
+PostgreSQL requires unique indexes on a partitioned table to include
+the partition key, so a converted table differs in two ways:
+- the primary key is (id, start_time); ids still come from the same
+  sequence, so they stay unique
+- task_timer_one_active_session is a plain partial index, and a trigger
+  enforces one running or paused session per user instead, raising the
+  same unique violation (IntegrityError) the constraint did
+
+Django's migration state is shared by every backend and still declares
+the model's primary key and the UniqueConstraint. Migrations that change
+either must handle the converted form in their own SQL. Migration 0009
+runs a frozen copy of convert_table()
+(task_timer/migrations/_0009_partitioning.py), so changes here do not
+alter what that migration does.
+
+Monthly partitions are named <table>_pYYYY_MM and cover months of the
+site timezone. Rows outside all of them go to the <table>_default
+partition until a partition for their month is created. On other
+backends the table stays as it is and these helpers are never called.
+"""
+import re
+from datetime import date, datetime
+
+from django.db import connections, transaction
+from django.utils import timezone
+from task_timer.models import TimerSession
+
+TABLE = TimerSession._meta.db_table
+DEFAULT_PARTITION = f'{TABLE}_default'
+
+_PARTITION_NAME = re.compile(rf'^{TABLE}_p(\d{{4}})_(\d{{2}})$')
+
+ACTIVE_SESSION_TRIGGER = 'task_timer_one_active_session'
+
+# Serializes inserts per user, then rejects a second active session
+_ACTIVE_SESSION_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION {ACTIVE_SESSION_TRIGGER}() RETURNS trigger AS $$
+BEGIN
+    IF NEW.status IN ('running', 'paused') THEN
+        PERFORM pg_advisory_xact_lock(hashtextextended('{ACTIVE_SESSION_TRIGGER}:' || NEW.created_by_id, 0));
+        IF EXISTS (
+            SELECT 1 FROM {TABLE}
+            WHERE created_by_id = NEW.created_by_id
+              AND status IN ('running', 'paused')
+              AND id <> NEW.id
+        ) THEN
+            RAISE unique_violation USING
+                MESSAGE = 'duplicate key value violates unique constraint "{ACTIVE_SESSION_TRIGGER}"';
+        END IF;
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def is_supported(using='default'):
+    """Return True if the database can partition sessions (PostgreSQL)"""
+    return connections[using].vendor == 'postgresql'
+
+
+def is_partitioned(using='default'):
+    """Return True if the TimerSession table is partitioned"""
+    if not is_supported(using):
+        return False
+
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            'SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s))',
+            [TABLE]
+        )
+        return cursor.fetchone()[0]
+
+
+def month_start(day):
+    """Return the first day of the month containing day"""
+    return date(day.year, day.month, 1)
+
+
+def add_months(month, count):
+    """Return the first day of the month count months after month"""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def current_month():
+    """Return the first day of the current month in the site timezone"""
+    return month_start(timezone.localdate(timezone=timezone.get_default_timezone()))
+
+
+def partition_name(month):
+    """Return the name of the partition holding a month"""
+    return f'{TABLE}_p{month:%Y_%m}'
+
+
+def partition_month(name):
+    """Return the month a partition holds, or None for the default partition"""
+    match = _PARTITION_NAME.match(name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def partition_bounds(month):
+    """Return the aware (start, end) datetimes of a month in the site timezone"""
+    tzinfo = timezone.get_default_timezone()
+    start = timezone.make_aware(datetime.combine(month, datetime.min.time()), tzinfo)
+    end = timezone.make_aware(datetime.combine(add_months(month, 1), datetime.min.time()), tzinfo)
+    return start, end
+
+
+def list_partitions(using='default'):
+    """
+    Return the partitions of the TimerSession table
+
+    Returns:
+        List of (name, month) tuples in name order; month is None for the
+        default partition
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+            'WHERE i.inhparent = to_regclass(%s) ORDER BY c.relname',
+            [TABLE]
+        )
+        return [(name, partition_month(name)) for name, in cursor.fetchall()]
+
+
+def _create_partition(cursor, connection, month):
+    """
+    Create and attach the partition for a month
+
+    The partition is filled from the default partition before it is
+    attached, since PostgreSQL refuses a new range while the default
+    partition still holds rows in it.
+    """
+    quote = connection.ops.quote_name
+    name = quote(partition_name(month))
+    start, end = partition_bounds(month)
+    bounds = f"FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+
+    cursor.execute(f'CREATE TABLE {name} (LIKE {quote(TABLE)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+    cursor.execute(
+        f'WITH moved AS (DELETE FROM {quote(DEFAULT_PARTITION)} '
+        f'WHERE start_time >= %s AND start_time < %s RETURNING *) '
+        f'INSERT INTO {name} SELECT * FROM moved',
+        [start, end]
+    )
+    cursor.execute(f'ALTER TABLE {quote(TABLE)} ATTACH PARTITION {name} FOR VALUES {bounds}')
+
+
+def create_partitions(months_ahead=3, first_month=None, using='default'):
+    """
+    Create the monthly partitions that do not exist yet
+
+    Args:
+        months_ahead: Months after the current one to create
+        first_month: Earliest month to create (defaults to the current one)
+
+    Returns:
+        List of the names of the partitions created
+
+    Raises:
+        ValueError: If the table is not partitioned
+    """
+    if not is_partitioned(using):
+        raise ValueError(f'{TABLE} is not partitioned')
+
+    connection = connections[using]
+    current = current_month()
+    month = month_start(first_month or current)
+    last = add_months(current, months_ahead)
+
+    existing = {name for name, _ in list_partitions(using)}
+    created = []
+
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        while month <= last:
+            if partition_name(month) not in existing:
+                _create_partition(cursor, connection, month)
+                created.append(partition_name(month))
+            month = add_months(month, 1)
+
+    return created
+
+
+def detach_partitions(before, drop=False, using='default'):
+    """
+    Detach (and optionally drop) the monthly partitions of old months
+
+    Detaching is instant and keeps the month as a standalone table;
+    dropping deletes it. Either way no row-level delete runs, so the
+    DailyTimerStats rollup keeps counting those months until it is
+    rebuilt (check_timer_stats --fix).
+
+    Args:
+        before: Partitions of months entirely before this date's month go
+        drop: Drop the tables after detaching them
+
+    Returns:
+        List of the names of the partitions detached
+
+    Raises:
+        ValueError: If the table is not partitioned
+    """
+    if not is_partitioned(using):
+        raise ValueError(f'{TABLE} is not partitioned')
+
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    cutoff = month_start(before)
+
+    old = [name for name, month in list_partitions(using) if month is not None and month < cutoff]
+
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        for name in old:
+            cursor.execute(f'ALTER TABLE {quote(TABLE)} DETACH PARTITION {quote(name)}')
+            if drop:
+                cursor.execute(f'DROP TABLE {quote(name)}')
+
+    return old
+
+
+def convert_table(months_ahead=3, using='default'):
+    """
+    Turn the plain TimerSession table into a partitioned one
+
+    Copies every row, so the table is locked for the duration; run it
+    during a maintenance window on large tables. Indexes, foreign keys
+    and the id sequence carry over under their original names.
+
+    Args:
+        months_ahead: Months after the current one to create partitions for
+
+    Returns:
+        False if the table was already partitioned, True otherwise
+
+    Raises:
+        ValueError: If the database is not PostgreSQL
+    """
+    if not is_supported(using):
+        raise ValueError('Partitioning sessions needs PostgreSQL')
+    if is_partitioned(using):
+        return False
+
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    table = quote(TABLE)
+    old_name = f'{TABLE}_unpartitioned'
+    old = quote(old_name)
+
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE {table} RENAME TO {old}')
+
+        # Collected before the old table goes, recreated under the same names
+        cursor.execute(
+            'SELECT pg_get_indexdef(indexrelid) FROM pg_index '
+            'WHERE indrelid = to_regclass(%s) AND NOT indisprimary',
+            [old_name]
+        )
+        indexes = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+            [old_name]
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute('SELECT MIN(start_time) FROM ' + old)
+        oldest = cursor.fetchone()[0]
+
+        cursor.execute(
+            f'CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS INCLUDING IDENTITY '
+            f'INCLUDING CONSTRAINTS INCLUDING STORAGE INCLUDING COMMENTS) '
+            f'PARTITION BY RANGE (start_time)'
+        )
+        cursor.execute(f'CREATE TABLE {quote(DEFAULT_PARTITION)} PARTITION OF {table} DEFAULT')
+
+        current = current_month()
+        month = month_start(timezone.localtime(oldest, timezone.get_default_timezone())) if oldest else current
+        while month <= add_months(current, months_ahead):
+            start, end = partition_bounds(month)
+            cursor.execute(
+                f'CREATE TABLE {quote(partition_name(month))} PARTITION OF {table} '
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+            month = add_months(month, 1)
+
+        cursor.execute(f'INSERT INTO {table} SELECT * FROM {old}')
+
+        # A serial id keeps its sequence; an identity column got a new one
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [old_name])
+        old_sequence = cursor.fetchone()[0]
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [TABLE])
+        sequence = cursor.fetchone()[0]
+        if sequence:
+            cursor.execute(f'SELECT setval(%s, COALESCE(MAX(id), 0) + 1, false) FROM {table}', [sequence])
+        elif old_sequence:
+            cursor.execute(f'ALTER SEQUENCE {old_sequence} OWNED BY {table}.id')
+
+        # Frees the index and constraint names; they are built again below,
+        # after the copy, which is faster than maintaining them row by row
+        cursor.execute(f'DROP TABLE {old}')
+
+        cursor.execute(f'ALTER TABLE {table} ADD PRIMARY KEY (id, start_time)')
+        for definition in indexes:
+            definition = definition.replace('CREATE UNIQUE INDEX', 'CREATE INDEX', 1)
+            definition = re.sub(r' ON (ONLY )?\S+ USING ', f' ON {table} USING ', definition, count=1)
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE {table} ADD CONSTRAINT {quote(name)} {definition}')
+
+        cursor.execute(_ACTIVE_SESSION_FUNCTION)
+        cursor.execute(
+            f'CREATE TRIGGER {ACTIVE_SESSION_TRIGGER} BEFORE INSERT OR UPDATE OF status, created_by_id '
+            f'ON {table} FOR EACH ROW EXECUTE FUNCTION {ACTIVE_SESSION_TRIGGER}()'
+        )
+
+    return True
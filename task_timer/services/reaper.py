@@ -0,0 +1,125 @@
+"""
+Stopping sessions whose client went away
+
+A session stays running or paused until a client stops it, so a browser
+closed mid-session would leave it active for good and block the user's
+next start_session(). Every state change and heartbeat records
+TimerSession.last_seen. With TASK_TIMER_ABANDONED_SESSION_TIMEOUT set,
+the dashboard also pings POST /api/timer/heartbeat/ every
+TASK_TIMER_LAST_SEEN_INTERVAL seconds while a session is open, and
+active sessions not seen for the timeout count as abandoned:
+- start_session() stops the user's own abandoned session instead of
+  refusing to start
+- reap_sessions() (via the reap_abandoned_sessions management command)
+  stops all of them, one primary key batch per transaction with a single
+  UPDATE each
+
+Abandoned sessions end at last_seen, and their durations are computed up
+to it (see timer_engine.stop_abandoned_sessions()).
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+from task_timer.models import TimerSession
+from task_timer.services import heartbeats, rollup
+from task_timer.services.bulk_jobs import invalidate_owners
+from task_timer.services.timer_engine import ACTIVE_STATUSES, abandoned_before, stop_abandoned_sessions
+
+
+def abandoned_sessions(timeout=None, now=None):
+    """
+    Return the active sessions not seen within a timeout
+
+    Args:
+        timeout: Seconds (defaults to TASK_TIMER_ABANDONED_SESSION_TIMEOUT)
+        now: Reference time (defaults to now)
+
+    Raises:
+        ValueError: If TASK_TIMER_ABANDONED_SESSION_TIMEOUT is unset
+    """
+    if now is None:
+        now = timezone.now()
+
+    # Pings only keep last_seen current while the setting is on, so a
+    # timeout given here cannot stand in for it
+    cutoff = abandoned_before(now)
+    if cutoff is None:
+        raise ValueError('Abandoned-session detection is off; set TASK_TIMER_ABANDONED_SESSION_TIMEOUT')
+
+    if timeout is not None:
+        cutoff = now - timedelta(seconds=timeout)
+
+    return TimerSession.objects.filter(status__in=ACTIVE_STATUSES, last_seen__lt=cutoff)
+
+
+def _reap_batch(sessions, last_pk, batch_size, now):
+    """
+    Stop the next primary key range of abandoned sessions in one transaction
+
+    Returns:
+        (highest id handled, sessions stopped), or None once nothing is left
+    """
+    with transaction.atomic():
+        pks = list(
+            sessions.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not pks:
+            return None
+
+        # The filter is applied again by the UPDATE, so a session seen since
+        # the ids were read is left alone
+        batch = sessions.filter(pk__gt=last_pk, pk__lte=pks[-1])
+
+        refresh_daily_stats = rollup.refresh_for_sessions(batch)
+        invalidate_owners(batch)
+        stopped = stop_abandoned_sessions(batch, now)
+        refresh_daily_stats()
+
+    return pks[-1], stopped
+
+
+def reap_sessions(timeout=None, batch_size=1000, progress=None):
+    """
+    Stop every abandoned session
+
+    Buffered write-behind heartbeats are flushed first, since they are the
+    latest sign of life of running sessions.
+
+    Args:
+        timeout: Seconds (defaults to TASK_TIMER_ABANDONED_SESSION_TIMEOUT)
+        batch_size: Sessions per transaction
+        progress: Optional callable, called with the running total after
+            each batch
+
+    Returns:
+        Number of sessions stopped
+
+    Raises:
+        ValueError: If TASK_TIMER_ABANDONED_SESSION_TIMEOUT is unset
+    """
+    now = timezone.now()
+    sessions = abandoned_sessions(timeout, now)
+
+    if heartbeats.is_enabled():
+        heartbeats.flush_heartbeats()
+
+    stopped = 0
+
+    # One status at a time: an equality lets every backend walk the
+    # (status, id) index, where SQLite would scan the table for an IN
+    for status in ACTIVE_STATUSES:
+        last_pk = 0
+        while True:
+            result = _reap_batch(sessions.filter(status=status), last_pk, batch_size, now)
+            if result is None:
+                break
+
+            last_pk, count = result
+            stopped += count
+            if progress:
+                progress(stopped)
+
+    return stopped
@@ -0,0 +1,263 @@
+"""
+Daily rollup of finished timer sessions
+
+DailyTimerStats holds one row per user per day with the totals of the
+sessions that finished (completed or stopped). Running and paused
+sessions are left out; at most one exists per user and readers add it
+on top. TimerEngine adds a session's totals with F() expressions when it
+finishes, and signals recompute the affected days for other writes.
+Recomputation reads ArchivedTimerSession as well, so archiving sessions
+leaves the totals unchanged.
+"""
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from task_timer.models import ArchivedTimerSession, DailyTimerStats, TimerSession
+from task_timer.services import archive, stats_cache
+
+FINISHED_STATUSES = ['completed', 'stopped']
+
+COUNTERS = ['total_sessions', 'completed_sessions', 'total_seconds', 'pause_seconds']
+
+
+def local_date(moment):
+    """
+    Return the rollup day of a timestamp
+
+    Days follow the project's TIME_ZONE rather than whichever timezone the
+    current request activated, so every writer files a session under the
+    same row.
+    """
+    return timezone.localdate(moment, timezone=timezone.get_default_timezone())
+
+
+def session_date(session):
+    """Return the day a session is counted on (the date it started)"""
+    return local_date(session.start_time)
+
+
+def contribution(session):
+    """
+    Return what a session adds to its day's rollup row
+
+    Args:
+        session: TimerSession instance
+
+    Returns:
+        dict of counter deltas, or None while the session is still active
+    """
+    if session.status not in FINISHED_STATUSES:
+        return None
+
+    return {
+        'total_sessions': 1,
+        'completed_sessions': 1 if session.status == 'completed' else 0,
+        'total_seconds': session.duration,
+        'pause_seconds': session.pause_duration,
+    }
+
+
+def add_session(session):
+    """Add a newly finished session to its day's rollup row"""
+    deltas = contribution(session)
+    if deltas:
+        apply_delta(session.created_by_id, session_date(session), **deltas)
+
+
+def apply_delta(user_id, date, **deltas):
+    """
+    Add to a user's rollup row for a day, creating the row if needed
+
+    Args:
+        user_id: Primary key of the user
+        date: Day of the row
+        **deltas: Amount to add to each counter
+    """
+    updates = {name: F(name) + value for name, value in deltas.items() if value}
+    if not updates:
+        return
+
+    rows = DailyTimerStats.objects.filter(user_id=user_id, date=date)
+    if rows.update(**updates):
+        return
+
+    try:
+        with transaction.atomic():
+            DailyTimerStats.objects.create(user_id=user_id, date=date, **deltas)
+    except IntegrityError:
+        # Another request created the row first
+        rows.update(**updates)
+
+
+def _aggregate(sessions_filter, archived=True):
+    """
+    Total finished sessions per (user, day)
+
+    Args:
+        sessions_filter: Q object selecting the sessions
+        archived: Count ArchivedTimerSession rows as well
+
+    Returns:
+        dict mapping (user_id, date) to a dict of counters
+    """
+    totals = {}
+
+    for model in (TimerSession, ArchivedTimerSession) if archived else (TimerSession,):
+        rows = (
+            model.objects.filter(sessions_filter, status__in=FINISHED_STATUSES)
+            .order_by()
+            .annotate(day=TruncDate('start_time', tzinfo=timezone.get_default_timezone()))
+            .values('created_by_id', 'day')
+            .annotate(
+                total_sessions=Count('id'),
+                completed_sessions=Count('id', filter=Q(status='completed')),
+                total_seconds=Sum('duration'),
+                pause_seconds=Sum('pause_duration'),
+            )
+        )
+
+        for row in rows:
+            counters = totals.setdefault((row['created_by_id'], row['day']), dict.fromkeys(COUNTERS, 0))
+            for name in COUNTERS:
+                counters[name] += row[name] or 0
+
+    return totals
+
+
+def _day_filter(user_id, date):
+    start = timezone.make_aware(
+        timezone.datetime.combine(date, timezone.datetime.min.time()),
+        timezone.get_default_timezone()
+    )
+    return Q(created_by_id=user_id, start_time__gte=start, start_time__lt=start + timedelta(days=1))
+
+
+def refresh_days(pairs, chunk_size=100):
+    """
+    Recompute specific rollup rows from the sessions table
+
+    Args:
+        pairs: Iterable of (user_id, date) tuples
+        chunk_size: Days recomputed per query
+    """
+    pairs = list(set(pairs))
+    edge = archive.horizon()
+
+    for offset in range(0, len(pairs), chunk_size):
+        chunk = pairs[offset:offset + chunk_size]
+
+        sessions_filter = Q()
+        rows_filter = Q()
+        for user_id, date in chunk:
+            sessions_filter |= _day_filter(user_id, date)
+            rows_filter |= Q(user_id=user_id, date=date)
+
+        # Only days before the archive horizon can have archived sessions
+        archived = edge is not None and min(date for user_id, date in chunk) <= local_date(edge)
+
+        with transaction.atomic():
+            totals = _aggregate(sessions_filter, archived)
+            DailyTimerStats.objects.filter(rows_filter).delete()
+            DailyTimerStats.objects.bulk_create([
+                DailyTimerStats(user_id=user_id, date=date, **counters)
+                for (user_id, date), counters in totals.items()
+            ])
+
+    if pairs and stats_cache.is_enabled():
+        stats_cache.invalidate(*[user_id for user_id, date in pairs])
+
+
+def refresh_for_sessions(queryset):
+    """
+    Return a callable that recomputes the days touched by queryset's sessions
+
+    Call this before changing the sessions and invoke the result
+    afterwards, so days the sessions move away from are refreshed too.
+    """
+    pairs = list(
+        queryset.order_by()
+        .annotate(day=TruncDate('start_time', tzinfo=timezone.get_default_timezone()))
+        .values_list('created_by_id', 'day')
+        .distinct()
+    )
+    return lambda: refresh_days(pairs)
+
+
+def _user_chunks(user_ids, chunk_size):
+    if user_ids is None:
+        # Include users who only have rollup rows left, so stale rows are found
+        user_ids = set(
+            TimerSession.objects.order_by().values_list('created_by_id', flat=True).distinct()
+        ) | set(
+            ArchivedTimerSession.objects.order_by().values_list('created_by_id', flat=True).distinct()
+        ) | set(
+            DailyTimerStats.objects.order_by().values_list('user_id', flat=True).distinct()
+        )
+    user_ids = sorted(user_ids)
+    for offset in range(0, len(user_ids), chunk_size):
+        yield user_ids[offset:offset + chunk_size]
+
+
+def rebuild_daily_stats(user_ids=None, chunk_size=100):
+    """
+    Rebuild rollup rows from the full session history
+
+    Args:
+        user_ids: Users to rebuild (defaults to everyone with sessions)
+        chunk_size: Users rebuilt per transaction
+
+    Returns:
+        Number of rollup rows written
+    """
+    written = 0
+
+    for chunk in _user_chunks(user_ids, chunk_size):
+        with transaction.atomic():
+            totals = _aggregate(Q(created_by_id__in=chunk))
+            DailyTimerStats.objects.filter(user_id__in=chunk).delete()
+            DailyTimerStats.objects.bulk_create(
+                [
+                    DailyTimerStats(user_id=user_id, date=date, **counters)
+                    for (user_id, date), counters in totals.items()
+                ],
+                batch_size=1000
+            )
+            if stats_cache.is_enabled():
+                stats_cache.invalidate(*chunk)
+        written += len(totals)
+
+    return written
+
+
+def check_daily_stats(user_ids=None, chunk_size=100):
+    """
+    Compare rollup rows with totals computed from the sessions table
+
+    Args:
+        user_ids: Users to check (defaults to everyone with sessions)
+        chunk_size: Users checked per query
+
+    Returns:
+        List of (user_id, date, expected, actual) tuples for rows that
+        differ; expected/actual are counter dicts (all zero if missing)
+    """
+    empty = {name: 0 for name in COUNTERS}
+    mismatches = []
+
+    for chunk in _user_chunks(user_ids, chunk_size):
+        expected = _aggregate(Q(created_by_id__in=chunk))
+        actual = {
+            (row['user_id'], row['date']): {name: row[name] for name in COUNTERS}
+            for row in DailyTimerStats.objects.filter(user_id__in=chunk).values('user_id', 'date', *COUNTERS)
+        }
+
+        for key in sorted(set(expected) | set(actual)):
+            want = expected.get(key, empty)
+            have = actual.get(key, empty)
+            if want != have:
+                mismatches.append((key[0], key[1], want, have))
+
+    return mismatches
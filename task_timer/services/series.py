@@ -0,0 +1,119 @@
+"""
+Time buckets for statistics series
+
+Maps each bucket size to its database truncation function and generates
+the full, gap-free list of bucket starts for a date range in Python, so
+empty buckets cost no queries.
+
+Day, week and month buckets follow the requested timezone. Hour buckets
+are UTC hours, labelled in that timezone: local wall-clock hours repeat
+or go missing across DST changes, so keying by them would merge the two
+01:00s of a fall-back night. A day therefore has 23 or 25 hour buckets
+at DST changes. In zones whose offset is not a whole number of hours,
+hour buckets start at that fraction past the local hour.
+"""
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.db.models.functions import TruncDay, TruncHour, TruncMonth, TruncWeek
+from django.utils import timezone
+
+TRUNCATE = {
+    'hour': TruncHour,
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+BUCKETS = list(TRUNCATE)
+
+# Upper bound on buckets per request (a leap year of hours fits)
+MAX_BUCKETS = 8784
+
+
+def truncate(field_name, bucket, tzinfo):
+    """Return the database expression truncating a datetime column to its bucket"""
+    if bucket == 'hour':
+        tzinfo = dt_timezone.utc
+    return TRUNCATE[bucket](field_name, tzinfo=tzinfo)
+
+
+def bucket_key(moment, bucket, tzinfo):
+    """
+    Return the start of the bucket containing an aware datetime
+
+    Dates are used for day/week/month buckets and aware UTC datetimes for
+    hours, so keys compare the same whether they come from the database
+    or from bucket_starts().
+    """
+    if bucket == 'hour':
+        return moment.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+    day = moment.astimezone(tzinfo).date()
+    if bucket == 'week':
+        return day - timedelta(days=day.weekday())
+    if bucket == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def bucket_label(key, bucket, tzinfo):
+    """Return the ISO 8601 label of a bucket key, hours in local time"""
+    if bucket == 'hour':
+        key = key.astimezone(tzinfo)
+    return key.isoformat()
+
+
+def bucket_starts(first_day, last_day, bucket, tzinfo=None):
+    """
+    List every bucket start from first_day through last_day
+
+    Args:
+        first_day: First date of the range
+        last_day: Last date of the range (inclusive)
+        bucket: One of BUCKETS
+        tzinfo: Timezone the dates are in (defaults to the current one);
+            only hour buckets depend on it
+
+    Returns:
+        List of bucket keys as produced by bucket_key()
+
+    Raises:
+        ValueError: If the range is empty or has more than MAX_BUCKETS buckets
+    """
+    if bucket not in TRUNCATE:
+        raise ValueError(f"Bucket must be one of: {', '.join(BUCKETS)}")
+
+    if last_day < first_day:
+        raise ValueError("The end date must not be before the start date")
+
+    days = (last_day - first_day).days + 1
+    estimate = {'hour': days * 24, 'day': days, 'week': days // 7 + 1, 'month': days // 28 + 1}[bucket]
+    if estimate > MAX_BUCKETS:
+        raise ValueError(f"Too many {bucket} buckets requested (limit {MAX_BUCKETS})")
+
+    if bucket == 'hour':
+        if tzinfo is None:
+            tzinfo = timezone.get_current_timezone()
+        start = timezone.make_aware(datetime.combine(first_day, time.min), tzinfo)
+        end = timezone.make_aware(datetime.combine(last_day + timedelta(days=1), time.min), tzinfo)
+
+        keys = []
+        key = bucket_key(start, bucket, tzinfo)
+        while key < end:
+            keys.append(key)
+            key += timedelta(hours=1)
+        return keys
+
+    keys = []
+    day = first_day
+    while day <= last_day:
+        key = {
+            'day': day,
+            'week': day - timedelta(days=day.weekday()),
+            'month': day.replace(day=1),
+        }[bucket]
+        if not keys or keys[-1] != key:
+            keys.append(key)
+        day += timedelta(days=1)
+
+    return keys
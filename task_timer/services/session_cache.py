@@ -0,0 +1,134 @@
+"""
+Per-user cache of the active timer session
+
+When TASK_TIMER_CACHE_ACTIVE_SESSION (or
+TASK_TIMER_HEARTBEAT_WRITE_BEHIND) is enabled, TimerEngine reads the
+user's running or paused session from the Django cache and writes the
+fresh row back after every state change. Other writes to TimerSession
+invalidate the entry through signals. Use a shared backend (Redis,
+Memcached, database cache) when several web nodes serve the same users;
+a per-process cache such as LocMemCache cannot see other nodes' changes.
+"""
+from django.core.cache import caches
+from django.db import router, transaction
+from task_timer.conf import get_setting
+from task_timer.models import TimerSession
+
+KEY_PREFIX = 'task_timer:active:'
+
+# Stored for users with no active session, so idle polling is cached too
+NO_SESSION = {}
+
+_MISS = object()
+
+
+def _cache():
+    return caches[get_setting('CACHE_ALIAS')]
+
+
+def active_session_key(user_id):
+    """Return the cache key holding a user's active session"""
+    return f'{KEY_PREFIX}{user_id}'
+
+
+def is_enabled():
+    """
+    Return True if active session lookups are cached
+
+    Write-behind heartbeats turn the cache on as well, so buffering a
+    heartbeat does not cost an active session query.
+    """
+    return get_setting('CACHE_ACTIVE_SESSION') or get_setting('HEARTBEAT_WRITE_BEHIND')
+
+
+def _dump(session):
+    if session is None:
+        return NO_SESSION
+    return {field.attname: getattr(session, field.attname) for field in TimerSession._meta.concrete_fields}
+
+
+def _load(data):
+    if data == NO_SESSION:
+        return None
+    attnames = list(data)
+    return TimerSession.from_db(
+        router.db_for_read(TimerSession),
+        attnames,
+        [data[attname] for attname in attnames]
+    )
+
+
+def get_active_session(user_id):
+    """
+    Look up a user's cached active session
+
+    Args:
+        user_id: Primary key of the session owner
+
+    Returns:
+        (hit, session) tuple; session is None when the user has no
+        active session or on a miss
+    """
+    data = _cache().get(active_session_key(user_id), _MISS)
+    if data is _MISS:
+        return False, None
+    return True, _load(data)
+
+
+def set_active_session(user_id, session):
+    """
+    Cache a user's active session once the current transaction commits
+
+    For writers that just changed the session; lookups that missed use
+    fill_active_session() instead.
+
+    Args:
+        user_id: Primary key of the session owner
+        session: Active TimerSession instance, or None if there is none
+    """
+    data = _dump(session)
+    transaction.on_commit(
+        lambda: _cache().set(active_session_key(user_id), data, get_setting('CACHE_TIMEOUT'))
+    )
+
+
+async def aget_active_session(user_id):
+    """Async counterpart of get_active_session()"""
+    data = await _cache().aget(active_session_key(user_id), _MISS)
+    if data is _MISS:
+        return False, None
+    return True, _load(data)
+
+
+def fill_active_session(user_id, session):
+    """
+    Cache an active session read from the database after a miss
+
+    Uses cache.add(), so a fill never replaces an entry a state change
+    wrote while the row was being read; that entry is newer.
+
+    Args:
+        user_id: Primary key of the session owner
+        session: Active TimerSession instance, or None if there is none
+    """
+    data = _dump(session)
+    transaction.on_commit(
+        lambda: _cache().add(active_session_key(user_id), data, get_setting('CACHE_TIMEOUT'))
+    )
+
+
+async def afill_active_session(user_id, session):
+    """
+    Async counterpart of fill_active_session()
+
+    The async ORM runs in autocommit mode, so there is no transaction to
+    wait for and the entry is added straight away.
+    """
+    await _cache().aadd(active_session_key(user_id), _dump(session), get_setting('CACHE_TIMEOUT'))
+
+
+def invalidate(*user_ids):
+    """Drop cached active sessions once the current transaction commits"""
+    keys = [active_session_key(user_id) for user_id in user_ids]
+    if keys:
+        transaction.on_commit(lambda: _cache().delete_many(keys))
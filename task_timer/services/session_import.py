@@ -0,0 +1,232 @@
+"""
+Bulk import of historical timer sessions
+
+Records are read from NDJSON or CSV one line at a time, validated, and
+inserted with bulk_create in chunks, each chunk in its own transaction.
+Invalid rows are reported by line number and skipped without aborting
+the rest. bulk_create sends no signals, so the DailyTimerStats rollup
+(and with it the stats cache) is refreshed once at the end for the days
+that received sessions.
+
+The accepted fields match the export (task, notes, start_time, end_time,
+duration, pause_duration, status); other fields such as id or
+duration_minutes are ignored, so an export can be imported again.
+"""
+import csv
+import json
+
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from task_timer.models import TimerSession, seconds_between
+from task_timer.services import rollup
+
+FORMATS = ['ndjson', 'csv']
+
+# Imported sessions are history; active ones would clash with the
+# one-active-session constraint and the rollup.
+IMPORT_STATUSES = rollup.FINISHED_STATUSES
+
+
+class ImportResult:
+    """Outcome of an import: counts plus the first max_errors row errors"""
+
+    def __init__(self, max_errors=1000):
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+        self.max_errors = max_errors
+
+    def add_error(self, line, message):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'line': line, 'error': message})
+
+    def as_dict(self):
+        return {'created': self.created, 'failed': self.failed, 'errors': self.errors}
+
+
+def read_records(lines, import_format='ndjson'):
+    """
+    Parse text lines into records
+
+    Args:
+        lines: Iterable of str lines
+        import_format: 'ndjson' or 'csv' (with a header row)
+
+    Yields:
+        (line_number, record) tuples; record is a dict, or a ValueError
+        for lines that could not be parsed
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if import_format not in FORMATS:
+        raise ValueError(f"Format must be one of: {', '.join(FORMATS)}")
+
+    if import_format == 'csv':
+        return _read_csv(lines)
+    return _read_ndjson(lines)
+
+
+def _read_ndjson(lines):
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError as e:
+            yield number, ValueError(f'Invalid JSON: {e}')
+
+
+def _read_csv(lines):
+    reader = csv.DictReader(lines)
+    for record in reader:
+        # Blank CSV cells mean "not given"
+        yield reader.line_num, {key: value for key, value in record.items() if value not in ('', None)}
+
+
+def decode_lines(byte_lines):
+    """Decode an iterable of UTF-8 byte lines, dropping a leading BOM"""
+    for number, line in enumerate(byte_lines):
+        yield line.decode('utf-8-sig' if number == 0 else 'utf-8', errors='replace')
+
+
+def _parse_time(record, name, required=False):
+    value = record.get(name)
+    if value in (None, ''):
+        if required:
+            raise ValueError(f'{name} is required')
+        return None
+
+    parsed = parse_datetime(str(value))
+    if parsed is None:
+        raise ValueError(f'{name} is not a valid datetime')
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _parse_seconds(record, name, default=None):
+    value = record.get(name)
+    if value in (None, ''):
+        return default
+
+    try:
+        seconds = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{name} must be a whole number of seconds')
+    if seconds < 0:
+        raise ValueError(f'{name} must not be negative')
+    return seconds
+
+
+def clean_record(record):
+    """
+    Validate one record and return TimerSession field values
+
+    Raises:
+        ValueError: With a message describing the first problem found
+    """
+    if not isinstance(record, dict):
+        raise ValueError('Expected an object')
+
+    task = record.get('task')
+    if not isinstance(task, str) or not task.strip():
+        raise ValueError('task is required')
+
+    notes = record.get('notes') or ''
+    if not isinstance(notes, str):
+        raise ValueError('notes must be text')
+
+    status = record.get('status') or 'completed'
+    if status not in IMPORT_STATUSES:
+        raise ValueError(f"status must be one of: {', '.join(IMPORT_STATUSES)}")
+
+    start_time = _parse_time(record, 'start_time', required=True)
+    end_time = _parse_time(record, 'end_time')
+    if end_time is not None and end_time < start_time:
+        raise ValueError('end_time is before start_time')
+
+    duration = _parse_seconds(record, 'duration')
+    if duration is None:
+        if end_time is None:
+            raise ValueError('duration or end_time is required')
+        duration = seconds_between(start_time, end_time)
+
+    return {
+        'task': task,
+        'notes': notes,
+        'status': status,
+        'start_time': start_time,
+        'end_time': end_time,
+        'duration': duration,
+        'pause_duration': _parse_seconds(record, 'pause_duration', default=0),
+    }
+
+
+def _insert(pending, result):
+    """Insert one chunk; on a database error, retry row by row to isolate it"""
+    sessions = [session for line, session in pending]
+    try:
+        with transaction.atomic():
+            TimerSession.objects.bulk_create(sessions)
+        result.created += len(sessions)
+        return sessions
+    except DatabaseError:
+        pass
+
+    inserted = []
+    for line, session in pending:
+        try:
+            with transaction.atomic():
+                TimerSession.objects.bulk_create([session])
+        except DatabaseError as e:
+            result.add_error(line, f'Could not be saved: {e}')
+        else:
+            result.created += 1
+            inserted.append(session)
+    return inserted
+
+
+def import_sessions(user, records, batch_size=500, max_errors=1000):
+    """
+    Validate and insert historical sessions for a user
+
+    Args:
+        user: Owner of the imported sessions
+        records: Iterable of (line_number, record) as from read_records()
+        batch_size: Sessions inserted per transaction
+        max_errors: Row errors kept in the result (all are counted)
+
+    Returns:
+        ImportResult
+    """
+    result = ImportResult(max_errors=max_errors)
+    days = set()
+    pending = []
+
+    def flush():
+        for session in _insert(pending, result):
+            days.add((user.pk, rollup.session_date(session)))
+        pending.clear()
+
+    for line, record in records:
+        try:
+            if isinstance(record, Exception):
+                raise record
+            pending.append((line, TimerSession(created_by=user, **clean_record(record))))
+        except ValueError as e:
+            result.add_error(line, str(e))
+            continue
+
+        if len(pending) >= batch_size:
+            flush()
+
+    if pending:
+        flush()
+
+    # One rollup pass for everything imported; this also bumps the stats cache
+    rollup.refresh_days(days)
+
+    return result
@@ -0,0 +1,58 @@
+"""
+Lookups that narrow TimerSessions the way the admin changelist does
+
+Shared by TimerSessionAdmin and the bulk jobs it queues, so a job
+rebuilt from the changelist's filter parameters selects exactly the
+sessions the changelist showed.
+"""
+from django.contrib.auth.models import User
+from django.db.models import Q
+
+
+def _users_named(value):
+    """Subquery of the ids of users whose username, or id if value is numeric, is value"""
+    users = Q(username=value)
+    if value.isdigit():
+        users |= Q(pk=int(value))
+    return User.objects.filter(users).values('pk')
+
+
+def filter_by_user(queryset, value):
+    """
+    Narrow sessions to the owner typed into the admin's user filter
+
+    Args:
+        queryset: TimerSession QuerySet
+        value: User id or exact username; digits match either, since
+            usernames can be numeric. Blank leaves queryset unchanged
+    """
+    value = (value or '').strip()
+    if not value:
+        return queryset
+
+    return queryset.filter(created_by__in=_users_named(value))
+
+
+def search(queryset, term):
+    """
+    Match a session id, an exact username or the start of the task
+
+    Usernames are resolved to ids in a subquery, so sessions are not
+    joined to auth_user, and notes are not scanned for substrings. On
+    PostgreSQL the task prefix is served by the UPPER(task) index from
+    migration 0013; other backends scan the table for it.
+
+    Args:
+        queryset: TimerSession QuerySet
+        term: Search input; blank leaves queryset unchanged
+    """
+    term = (term or '').strip()
+    if not term:
+        return queryset
+
+    query = Q(task__istartswith=term) | Q(created_by__in=User.objects.filter(username=term).values('pk'))
+    if term.isdigit():
+        # A session id; the username match above still covers numeric names
+        query |= Q(pk=int(term))
+
+    return queryset.filter(query)
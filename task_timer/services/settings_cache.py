@@ -0,0 +1,128 @@
+"""
+Per-user cache of timer settings
+
+When TASK_TIMER_CACHE_SETTINGS is enabled, TimerEngine reads a user's
+TimerSettings from the Django cache, including the fact that the user has
+no row and runs on the defaults. TimerEngine.update_settings() writes the
+saved row back, and other writes to TimerSettings invalidate the entry
+through signals. Lookups that miss only add an entry, so a row read
+before a concurrent update never replaces the updated one.
+"""
+from django.core.cache import caches
+from django.db import router, transaction
+from task_timer.conf import get_setting
+from task_timer.models import TimerSettings
+
+KEY_PREFIX = 'task_timer:settings:'
+
+# Stored for users without a row, who use the defaults
+NO_SETTINGS = {}
+
+_MISS = object()
+
+
+def _cache():
+    return caches[get_setting('CACHE_ALIAS')]
+
+
+def settings_key(user_id):
+    """Return the cache key holding a user's settings"""
+    return f'{KEY_PREFIX}{user_id}'
+
+
+def is_enabled():
+    """Return True if settings lookups are cached"""
+    return get_setting('CACHE_SETTINGS')
+
+
+def _dump(settings):
+    if settings is None:
+        return NO_SETTINGS
+    return {field.attname: getattr(settings, field.attname) for field in TimerSettings._meta.concrete_fields}
+
+
+def _load(data):
+    if data == NO_SETTINGS:
+        return None
+    attnames = list(data)
+    return TimerSettings.from_db(
+        router.db_for_read(TimerSettings),
+        attnames,
+        [data[attname] for attname in attnames]
+    )
+
+
+def get_settings(user_id):
+    """
+    Look up a user's cached settings
+
+    Args:
+        user_id: Primary key of the user
+
+    Returns:
+        (hit, settings) tuple; settings is None when the user has no
+        saved settings or on a miss
+    """
+    data = _cache().get(settings_key(user_id), _MISS)
+    if data is _MISS:
+        return False, None
+    return True, _load(data)
+
+
+def set_settings(user_id, settings):
+    """
+    Cache a user's settings once the current transaction commits
+
+    For writers that just saved the settings; lookups that missed use
+    fill_settings() instead.
+
+    Args:
+        user_id: Primary key of the user
+        settings: Saved TimerSettings instance, or None if there is none
+    """
+    data = _dump(settings)
+    transaction.on_commit(
+        lambda: _cache().set(settings_key(user_id), data, get_setting('CACHE_TIMEOUT'))
+    )
+
+
+def fill_settings(user_id, settings):
+    """
+    Cache settings read from the database after a miss
+
+    Uses cache.add(), so a fill never replaces an entry update_settings()
+    wrote while the row was being read; that entry is newer.
+
+    Args:
+        user_id: Primary key of the user
+        settings: TimerSettings instance, or None if there is none
+    """
+    data = _dump(settings)
+    transaction.on_commit(
+        lambda: _cache().add(settings_key(user_id), data, get_setting('CACHE_TIMEOUT'))
+    )
+
+
+async def aget_settings(user_id):
+    """Async counterpart of get_settings()"""
+    data = await _cache().aget(settings_key(user_id), _MISS)
+    if data is _MISS:
+        return False, None
+    return True, _load(data)
+
+
+async def afill_settings(user_id, settings):
+    """
+    Async counterpart of fill_settings()
+
+    The async ORM runs in autocommit mode, so the entry is added straight
+    away.
+    """
+    await _cache().aadd(settings_key(user_id), _dump(settings), get_setting('CACHE_TIMEOUT'))
+
+
+def invalidate(*user_ids):
+    """Drop cached settings once the current transaction commits"""
+    keys = [settings_key(user_id) for user_id in user_ids]
+    if keys:
+        transaction.on_commit(lambda: _cache().delete_many(keys))
@@ -0,0 +1,169 @@
+"""
+Versioned per-user cache of timer statistics
+
+When TASK_TIMER_CACHE_STATS is enabled, TimerEngine stores the output of
+get_daily_stats(), get_weekly_stats() and get_dashboard_stats() under a
+key that embeds a per-user version number. Any write that can change a
+user's numbers bumps the version once the transaction commits, so
+invalidation is a single cache operation and the old entries are never
+read again; they simply expire after TASK_TIMER_CACHE_TIMEOUT.
+
+Hits and misses are counted per process; see get_counters().
+"""
+import threading
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+from task_timer.conf import get_setting
+
+KEY_PREFIX = 'task_timer:stats:'
+VERSION_PREFIX = 'task_timer:stats_version:'
+
+_counters = {'hits': 0, 'misses': 0}
+_counters_lock = threading.Lock()
+
+
+def _cache():
+    return caches[get_setting('CACHE_ALIAS')]
+
+
+def is_enabled():
+    """Return True if statistics are cached"""
+    return get_setting('CACHE_STATS')
+
+
+def version_key(user_id):
+    """Return the cache key holding a user's stats version"""
+    return f'{VERSION_PREFIX}{user_id}'
+
+
+def _new_version():
+    # Start from the clock rather than 1, so a version key that was
+    # evicted never comes back with a number older entries still use.
+    return time.time_ns()
+
+
+def get_version(user_id):
+    """Return a user's current stats version, creating it if needed"""
+    cache = _cache()
+    key = version_key(user_id)
+
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_version(user_id):
+    """Async counterpart of get_version()"""
+    cache = _cache()
+    key = version_key(user_id)
+
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, _new_version(), None)
+        version = await cache.aget(key)
+    return version
+
+
+def stats_key(user_id, version, windows):
+    """
+    Return the cache key for a set of stats windows
+
+    Args:
+        user_id: Primary key of the user
+        version: User's stats version
+        windows: dict mapping a name to a (first_day, end_day) pair of dates
+    """
+    parts = ','.join(
+        f'{name}={first.isoformat()}/{end.isoformat()}'
+        for name, (first, end) in sorted(windows.items())
+    )
+    return f'{KEY_PREFIX}{user_id}:{version}:{parts}'
+
+
+def _count(name):
+    with _counters_lock:
+        _counters[name] += 1
+
+
+def get_counters():
+    """Return this process's cache hit and miss counts"""
+    with _counters_lock:
+        return dict(_counters)
+
+
+def reset_counters():
+    """Zero the hit and miss counts"""
+    with _counters_lock:
+        for name in _counters:
+            _counters[name] = 0
+
+
+def get_or_compute(user_id, windows, compute):
+    """
+    Return cached stats for windows, computing and storing them on a miss
+
+    Args:
+        user_id: Primary key of the user
+        windows: dict mapping a name to a (first_day, end_day) pair of dates
+        compute: Callable returning the stats when they are not cached
+
+    Returns:
+        Stats as returned by compute
+    """
+    cache = _cache()
+    key = stats_key(user_id, get_version(user_id), windows)
+
+    stats = cache.get(key)
+    if stats is not None:
+        _count('hits')
+        return stats
+
+    _count('misses')
+    stats = compute()
+    cache.set(key, stats, get_setting('CACHE_TIMEOUT'))
+    return stats
+
+
+async def aget_or_compute(user_id, windows, compute):
+    """
+    Async counterpart of get_or_compute()
+
+    Args:
+        user_id: Primary key of the user
+        windows: dict mapping a name to a (first_day, end_day) pair of dates
+        compute: Coroutine function returning the stats when they are not
+            cached
+    """
+    cache = _cache()
+    key = stats_key(user_id, await aget_version(user_id), windows)
+
+    stats = await cache.aget(key)
+    if stats is not None:
+        _count('hits')
+        return stats
+
+    _count('misses')
+    stats = await compute()
+    await cache.aset(key, stats, get_setting('CACHE_TIMEOUT'))
+    return stats
+
+
+def _bump(user_ids):
+    cache = _cache()
+    for user_id in user_ids:
+        try:
+            cache.incr(version_key(user_id))
+        except ValueError:
+            # No version yet; nothing cached under an older one can be read
+            cache.add(version_key(user_id), _new_version(), None)
+
+
+def invalidate(*user_ids):
+    """Bump users' stats versions once the current transaction commits"""
+    user_ids = set(user_ids)
+    if user_ids:
+        transaction.on_commit(lambda: _bump(user_ids))
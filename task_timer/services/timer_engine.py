@@ -5,10 +5,177 @@ Handles all timer-related operations:
 - Starting/stopping/pausing/resuming sessions
 - Session history and statistics
 - User settings management
+
+Every public method has an async counterpart prefixed with "a" (e.g.
+astart_session(), aget_active_session()) for use from async views.
 """
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, DateTimeField, F, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest
 from django.utils import timezone
-from datetime import timedelta
-from task_timer.models import TimerSession, TimerSettings
+from datetime import datetime, time, timedelta
+from task_timer.conf import get_setting
+from task_timer.db import SecondsBetween, update_returning
+from task_timer.models import ArchivedTimerSession, DailyTimerStats, TimerSession, TimerSettings, seconds_between
+from task_timer.services import (
+    archive, events, heartbeats, rollup, series, session_cache, settings_cache, stats_cache
+)
+
+
+def _seconds_since(field_name, now):
+    """Expression for whole seconds from a timestamp column to now (0 if unset)"""
+    if not hasattr(now, 'resolve_expression'):
+        now = Value(now, output_field=DateTimeField())
+    seconds = SecondsBetween(F(field_name), now)
+    return Greatest(Coalesce(seconds, 0), 0)
+
+
+ACTIVE_STATUSES = ['running', 'paused']
+
+
+def _clean_duration(duration):
+    """
+    Return a reported duration as a non-negative whole number of seconds
+
+    Raises:
+        ValueError: If the duration is not a whole number or is negative
+    """
+    try:
+        duration = int(duration)
+    except (TypeError, ValueError):
+        raise ValueError('Duration must be a whole number of seconds')
+
+    if duration < 0:
+        raise ValueError('Duration must not be negative')
+
+    return duration
+
+
+def _finish_changes(status, now, worked_duration):
+    """
+    UPDATE values that finish running or paused sessions
+
+    Args:
+        status: Final status ('stopped' or 'completed')
+        now: When the sessions end (a datetime or an expression)
+        worked_duration: Expression for a running session's duration with
+            its open stretch folded in
+    """
+    # Durations are listed before the timestamps they read from
+    return {
+        'duration': Case(
+            When(status='running', then=worked_duration),
+            default=F('duration')
+        ),
+        'pause_duration': Case(
+            When(status='paused', then=F('pause_duration') + _seconds_since('paused_at', now)),
+            default=F('pause_duration')
+        ),
+        'status': status,
+        'end_time': now,
+        'last_resumed_at': None,
+        'paused_at': None,
+    }
+
+
+def finish_sessions(queryset, status, now=None):
+    """
+    Give many sessions a final status, finishing active ones like the engine
+
+    Running and paused sessions get the same UPDATE as
+    TimerEngine.stop_session()/complete_session(): the open stretch is
+    folded into duration or pause_duration and end_time is set. Sessions
+    that already finished only change status. Buffered write-behind
+    heartbeats are not read; flush them first for exact durations.
+
+    The caller refreshes the rollup and caches (see
+    task_timer.services.bulk_jobs).
+
+    Args:
+        queryset: TimerSession QuerySet to change
+        status: Final status ('stopped' or 'completed')
+        now: When active sessions end (defaults to now)
+
+    Returns:
+        Number of sessions updated
+    """
+    if now is None:
+        now = timezone.now()
+
+    worked = F('duration') + _seconds_since('last_resumed_at', now)
+    active = queryset.filter(status__in=ACTIVE_STATUSES).update(
+        updated_at=now,
+        **_finish_changes(status, now, worked)
+    )
+    finished = queryset.exclude(status__in=ACTIVE_STATUSES).exclude(status=status).update(
+        status=status,
+        end_time=Coalesce(F('end_time'), Value(now, output_field=DateTimeField())),
+        updated_at=now
+    )
+    return active + finished
+
+
+def liveness_enabled():
+    """Return True if pings keep last_seen current (TASK_TIMER_ABANDONED_SESSION_TIMEOUT is set)"""
+    return get_setting('ABANDONED_SESSION_TIMEOUT') is not None
+
+
+def abandoned_before(now=None):
+    """
+    Return the last_seen time before which active sessions count as abandoned
+
+    Returns:
+        Aware datetime, or None if TASK_TIMER_ABANDONED_SESSION_TIMEOUT is unset
+    """
+    timeout = get_setting('ABANDONED_SESSION_TIMEOUT')
+    if timeout is None:
+        return None
+
+    if now is None:
+        now = timezone.now()
+
+    return now - timedelta(seconds=timeout)
+
+
+def stop_abandoned_sessions(queryset, now=None):
+    """
+    Stop running and paused sessions as of their last sign of life
+
+    One UPDATE for the whole queryset: a running session is credited with
+    the work up to last_seen, a paused one with the pause up to it, and
+    end_time is last_seen, so time after the client went away is not
+    counted. Flush write-behind heartbeats first, since they move
+    last_seen.
+
+    The caller picks the sessions (see abandoned_before()) and refreshes
+    the rollup and caches (see task_timer.services.reaper).
+
+    Args:
+        queryset: TimerSession QuerySet to stop
+        now: Written to updated_at (defaults to now)
+
+    Returns:
+        Number of sessions stopped
+    """
+    if now is None:
+        now = timezone.now()
+
+    last_seen = F('last_seen')
+    worked = F('duration') + _seconds_since('last_resumed_at', last_seen)
+    return queryset.filter(status__in=ACTIVE_STATUSES, last_seen__isnull=False).update(
+        updated_at=now,
+        **_finish_changes('stopped', last_seen, worked)
+    )
+
+
+class BatchError(ValueError):
+    """An operation in TimerEngine.run_batch() failed; nothing was applied"""
+
+    def __init__(self, index, operation, message):
+        super().__init__(message)
+        self.index = index
+        self.operation = operation
 
 
 class TimerEngine:
@@ -16,6 +183,24 @@ class TimerEngine:
     Service layer for timer operations
     """
 
+    # Operation names accepted by run_batch(), mapped to engine methods
+    BATCH_OPERATIONS = {
+        'start': 'start_session',
+        'pause': 'pause_session',
+        'resume': 'resume_session',
+        'stop': 'stop_session',
+        'complete': 'complete_session',
+        'update-duration': 'update_session_duration',
+    }
+
+    # Settings of users who have never changed them (no TimerSettings row)
+    SETTINGS_DEFAULTS = {
+        'work_duration': 25,
+        'short_break_duration': 5,
+        'long_break_duration': 15,
+        'auto_start_breaks': False
+    }
+
     def __init__(self, user):
         """
         Initialize timer engine for a specific user
@@ -39,21 +224,73 @@ class TimerEngine:
         Raises:
             ValueError: If user already has an active session
         """
-        # Check if user has an active session
-        active_session = self.get_active_session()
-        if active_session:
+        # The one-active-session constraint rejects the insert if the user
+        # already has a running or paused session; an abandoned one is
+        # stopped to make room.
+        now = timezone.now()
+        session = self._insert_session(task, notes, now)
+        if session is None and self._stop_abandoned(now):
+            session = self._insert_session(task, notes, now)
+
+        if session is None:
             raise ValueError(f"User {self.user.username} already has an active session")
 
-        # Create new session
-        session = TimerSession.objects.create(
-            task=task,
-            notes=notes,
-            created_by=self.user,
-            status='running'
-        )
+        self._remember(session)
 
         return session
 
+    def _insert_session(self, task, notes, now):
+        """Insert a running session, or return None if the user has an active one"""
+        try:
+            with transaction.atomic():
+                return TimerSession.objects.create(
+                    task=task,
+                    notes=notes,
+                    created_by=self.user,
+                    status='running',
+                    start_time=now,
+                    last_resumed_at=now,
+                    last_seen=now
+                )
+        except IntegrityError:
+            return None
+
+    def _stop_abandoned(self, now):
+        """
+        Stop the user's active session if it was abandoned
+
+        Returns:
+            True if a session was stopped
+        """
+        cutoff = abandoned_before(now)
+        if cutoff is None:
+            return False
+
+        if heartbeats.is_enabled():
+            heartbeats.flush_heartbeats(user_ids=[self.user.pk])
+
+        with transaction.atomic():
+            session = update_returning(
+                TimerSession.objects.filter(
+                    created_by=self.user,
+                    status__in=ACTIVE_STATUSES,
+                    last_seen__lt=cutoff
+                ),
+                updated_at=now,
+                **_finish_changes(
+                    'stopped',
+                    F('last_seen'),
+                    F('duration') + _seconds_since('last_resumed_at', F('last_seen'))
+                )
+            )
+            if session:
+                rollup.add_session(session)
+
+        if session and session_cache.is_enabled():
+            session_cache.invalidate(self.user.pk)
+
+        return session is not None
+
     def get_active_session(self):
         """
         Get user's currently active session (running or paused)
@@ -61,11 +298,21 @@ class TimerEngine:
         Returns:
             TimerSession instance or None
         """
-        return TimerSession.objects.filter(
+        if session_cache.is_enabled():
+            hit, session = session_cache.get_active_session(self.user.pk)
+            if hit:
+                return session
+
+        session = TimerSession.objects.filter(
             created_by=self.user,
-            status__in=['running', 'paused']
+            status__in=ACTIVE_STATUSES
         ).first()
 
+        if session_cache.is_enabled():
+            session_cache.fill_active_session(self.user.pk, session)
+
+        return session
+
     def pause_session(self):
         """
         Pause the active session
@@ -76,16 +323,20 @@ class TimerEngine:
         Raises:
             ValueError: If no active session
         """
-        session = self.get_active_session()
+        now = timezone.now()
+        session = self._transition(
+            ['running'],
+            duration=self._worked_duration(now),
+            status='paused',
+            paused_at=now,
+            last_resumed_at=None
+        )
+
         if not session:
+            if self.get_active_session():
+                raise ValueError("Can only pause running sessions")
             raise ValueError("No active session to pause")
 
-        if session.status != 'running':
-            raise ValueError("Can only pause running sessions")
-
-        session.status = 'paused'
-        session.save()
-
         return session
 
     def resume_session(self):
@@ -98,17 +349,18 @@ class TimerEngine:
         Raises:
             ValueError: If no paused session
         """
-        session = TimerSession.objects.filter(
-            created_by=self.user,
-            status='paused'
-        ).first()
+        now = timezone.now()
+        session = self._transition(
+            ['paused'],
+            pause_duration=F('pause_duration') + _seconds_since('paused_at', now),
+            status='running',
+            paused_at=None,
+            last_resumed_at=now
+        )
 
         if not session:
             raise ValueError("No paused session to resume")
 
-        session.status = 'running'
-        session.save()
-
         return session
 
     def stop_session(self):
@@ -121,14 +373,10 @@ class TimerEngine:
         Raises:
             ValueError: If no active session
         """
-        session = self.get_active_session()
+        session = self._finish_session('stopped')
         if not session:
             raise ValueError("No active session to stop")
 
-        session.status = 'stopped'
-        session.end_time = timezone.now()
-        session.save()
-
         return session
 
     def complete_session(self):
@@ -141,20 +389,22 @@ class TimerEngine:
         Raises:
             ValueError: If no active session
         """
-        session = self.get_active_session()
+        session = self._finish_session('completed')
         if not session:
             raise ValueError("No active session to complete")
 
-        session.status = 'completed'
-        session.end_time = timezone.now()
-        session.save()
-
         return session
 
     def update_session_duration(self, duration):
         """
         Update the duration of the active session
 
+        Durations are derived from the transition timestamps, so clients no
+        longer need to report progress; this remains for older clients.
+        With TASK_TIMER_HEARTBEAT_WRITE_BEHIND enabled the value is only
+        buffered in the cache and written by flush_heartbeats() or the next
+        state change.
+
         Args:
             duration: Duration in seconds
 
@@ -162,17 +412,203 @@ class TimerEngine:
             TimerSession instance
 
         Raises:
-            ValueError: If no active session
+            ValueError: If the duration is not a non-negative whole number
+                of seconds, or no active session
         """
-        session = self.get_active_session()
+        duration = _clean_duration(duration)
+        now = timezone.now()
+
+        if heartbeats.is_enabled():
+            session = self.get_active_session()
+            if not session:
+                raise ValueError("No active session to update")
+
+            heartbeats.record_heartbeat(session, duration, at=now)
+            return self._apply_heartbeat(session, duration, now)
+
+        # The reported duration is current as of now, so restart the
+        # running stretch from here to avoid counting it twice.
+        session = self._transition(
+            ACTIVE_STATUSES,
+            duration=duration,
+            last_resumed_at=Case(
+                When(status='running', then=Value(now)),
+                default=F('last_resumed_at')
+            )
+        )
+
         if not session:
             raise ValueError("No active session to update")
 
+        return session
+
+    def touch_session(self):
+        """
+        Record that a client still has the active session open
+
+        Keeps the session from being stopped as abandoned. last_seen is
+        written at most once per TASK_TIMER_LAST_SEEN_INTERVAL seconds, so
+        frequent pings cost a read rather than a row update. Without
+        TASK_TIMER_ABANDONED_SESSION_TIMEOUT nothing reads last_seen, so
+        pings are ignored without touching the database.
+
+        Raises:
+            ValueError: If no active session
+        """
+        if not liveness_enabled():
+            return
+
+        now = timezone.now()
+        if self._touch_queryset(now).update(last_seen=now):
+            return
+
+        if not self.get_active_session():
+            raise ValueError("No active session")
+
+    def _touch_queryset(self, now):
+        """Active session of the user, if its last_seen is due for a write"""
+        return TimerSession.objects.filter(
+            Q(last_seen__isnull=True)
+            | Q(last_seen__lt=now - timedelta(seconds=get_setting('LAST_SEEN_INTERVAL'))),
+            created_by=self.user,
+            status__in=ACTIVE_STATUSES
+        )
+
+    def _apply_heartbeat(self, session, duration, now):
+        """Show a buffered heartbeat on the session instance returned to the caller"""
         session.duration = duration
-        session.save()
+        session.last_seen = now
+        if session.status == 'running':
+            session.last_resumed_at = now
+        return session
+
+    def run_batch(self, operations):
+        """
+        Run several operations in order in one transaction
+
+        Either every operation is applied or, if one fails, none are; cache
+        updates wait for the commit, so a failed batch leaves no trace.
+
+        Args:
+            operations: List of (name, kwargs) pairs, name being a key of
+                BATCH_OPERATIONS and kwargs the method's arguments
+
+        Returns:
+            List with the TimerSession returned by each operation
+
+        Raises:
+            BatchError: If an operation fails
+        """
+        results = []
+
+        with transaction.atomic():
+            for index, (name, kwargs) in enumerate(operations):
+                method = getattr(self, self.BATCH_OPERATIONS[name])
+                try:
+                    results.append(method(**kwargs))
+                except ValueError as e:
+                    raise BatchError(index, name, str(e)) from e
+
+        return results
+
+    def _transition(self, from_statuses, **changes):
+        """
+        Apply changes to the user's session if it is in one of from_statuses
+
+        Runs as a single conditional UPDATE ... RETURNING, so two requests
+        racing on the same session cannot both succeed and only the listed
+        columns (plus updated_at) are written.
+
+        Args:
+            from_statuses: Statuses the session may currently be in
+            **changes: Field values or expressions to set
+
+        Returns:
+            Updated TimerSession instance, or None if nothing matched
+        """
+        now = timezone.now()
+        changes.setdefault('updated_at', now)
+        changes.setdefault('last_seen', now)
+
+        session = update_returning(
+            TimerSession.objects.filter(
+                created_by=self.user,
+                status__in=from_statuses
+            ),
+            **changes
+        )
+
+        if session:
+            self._remember(session)
+
+        return session
+
+    def _remember(self, session):
+        """Write a session's new state through to the caches and push subscribers"""
+        if session_cache.is_enabled():
+            active = session if session.status in ACTIVE_STATUSES else None
+            session_cache.set_active_session(self.user.pk, active)
+
+        if stats_cache.is_enabled():
+            stats_cache.invalidate(self.user.pk)
+
+        if events.is_enabled():
+            events.publish_state(self.user.pk, session, self.get_dashboard_stats)
+
+    def _worked_duration(self, now):
+        """
+        Expression for duration with the current running stretch folded in
+
+        A buffered heartbeat newer than the last resume replaces the stored
+        duration, so write-behind values are not lost on pause or finish.
+        """
+        accrued = F('duration') + _seconds_since('last_resumed_at', now)
+
+        entry = None
+        if heartbeats.is_enabled():
+            entry = heartbeats.pending_heartbeat(self.user.pk)
+
+        if entry is None:
+            return accrued
+
+        # Only drop the buffered value once the update holding it commits
+        heartbeats.discard_heartbeat(self.user.pk, entry)
+
+        return Case(
+            When(
+                Q(pk=entry['session_id'])
+                & (Q(last_resumed_at__isnull=True) | Q(last_resumed_at__lt=entry['at'])),
+                then=Value(entry['duration'] + seconds_between(entry['at'], now))
+            ),
+            default=accrued
+        )
+
+    def _finish_session(self, status):
+        """
+        Close out the active session, folding the open stretch into its totals
+
+        Args:
+            status: Final status ('stopped' or 'completed')
+
+        Returns:
+            Updated TimerSession instance, or None if no active session
+        """
+        now = timezone.now()
+
+        with transaction.atomic():
+            session = self._finish_update(status, now)
+            if session:
+                rollup.add_session(session)
 
         return session
 
+    def _finish_update(self, status, now):
+        """Run the UPDATE that finishes the active session"""
+        return self._transition(
+            ACTIVE_STATUSES,
+            **_finish_changes(status, now, self._worked_duration(now))
+        )
+
     def get_session_history(self, start_date=None, end_date=None, status=None):
         """
         Get user's session history with optional filtering
@@ -185,7 +621,31 @@ class TimerEngine:
         Returns:
             QuerySet of TimerSession instances
         """
-        queryset = TimerSession.objects.filter(created_by=self.user)
+        return self._filter_history(TimerSession, start_date, end_date, status)
+
+    def get_history_sources(self, start_date=None, end_date=None, status=None):
+        """
+        Get the user's session history from the live and archive tables
+
+        Takes the same filters as get_session_history(). The archive is only
+        included when start_date reaches back past the archive horizon.
+
+        Returns:
+            List of QuerySets: TimerSession, then ArchivedTimerSession if needed
+        """
+        sources = [self._filter_history(TimerSession, start_date, end_date, status)]
+        if archive.reaches(start_date):
+            sources.append(self._filter_history(ArchivedTimerSession, start_date, end_date, status))
+        return sources
+
+    def _session_models(self, start):
+        """Return the session models holding history from start (None: all time) on"""
+        if archive.reaches(start):
+            return [TimerSession, ArchivedTimerSession]
+        return [TimerSession]
+
+    def _filter_history(self, model, start_date, end_date, status):
+        queryset = model.objects.filter(created_by=self.user)
 
         if start_date:
             queryset = queryset.filter(start_time__gte=start_date)
@@ -198,42 +658,141 @@ class TimerEngine:
 
         return queryset
 
-    def get_daily_stats(self, date=None):
+    def get_stats(self, windows):
         """
-        Get statistics for a specific day
+        Get statistics for any number of time windows in one query
+
+        Each window is aggregated with conditional COUNT/SUM over the rows
+        between the earliest start and the latest end, so the database is
+        visited once however many windows are requested (twice if the
+        earliest start reaches into the archive).
 
         Args:
-            date: Date to get stats for (defaults to today)
+            windows: dict mapping a name to a (start, end) pair of
+                datetimes; start is inclusive, end is exclusive
 
         Returns:
-            dict with keys: total_sessions, completed_sessions, total_minutes
+            dict mapping each name to a dict with keys: total_sessions,
+            completed_sessions, total_minutes
         """
-        if date is None:
-            date = timezone.now().date()
+        if not windows:
+            return {}
+
+        # Only columns of the (created_by, start_time) covering index are
+        # read, so PostgreSQL can answer from the index alone
+        aggregates = {}
+        for index, (start, end) in enumerate(windows.values()):
+            in_window = Q(start_time__gte=start, start_time__lt=end)
+            aggregates[f'total_{index}'] = Count('start_time', filter=in_window)
+            aggregates[f'completed_{index}'] = Count('start_time', filter=in_window & Q(status='completed'))
+            aggregates[f'seconds_{index}'] = Sum('duration', filter=in_window)
+
+        first = min(start for start, end in windows.values())
+        totals = dict.fromkeys(aggregates, 0)
+        for model in self._session_models(first):
+            values = model.objects.filter(
+                created_by=self.user,
+                start_time__gte=first,
+                start_time__lt=max(end for start, end in windows.values())
+            ).aggregate(**aggregates)
+            for key, value in values.items():
+                totals[key] += value or 0
 
-        # Get start and end of day
-        start = timezone.make_aware(
-            timezone.datetime.combine(date, timezone.datetime.min.time())
-        )
-        end = start + timedelta(days=1)
+        return {
+            name: {
+                'total_sessions': totals[f'total_{index}'],
+                'completed_sessions': totals[f'completed_{index}'],
+                'total_minutes': totals[f'seconds_{index}'] // 60
+            }
+            for index, name in enumerate(windows)
+        }
 
-        sessions = TimerSession.objects.filter(
-            created_by=self.user,
-            start_time__gte=start,
-            start_time__lt=end
-        )
+    def get_stats_series(self, first_day, last_day, bucket='day', tzinfo=None):
+        """
+        Get statistics grouped into hour, day, week or month buckets
+
+        Sessions are grouped by the database in one query (plus one on the
+        archive table if the range reaches into it); buckets without
+        sessions are filled in afterwards, so a year-long daily heatmap is
+        still a single query.
+
+        Args:
+            first_day: First date of the range
+            last_day: Last date of the range (inclusive)
+            bucket: 'hour', 'day', 'week' or 'month'
+            tzinfo: Timezone of the dates, day/week/month buckets and hour
+                labels (defaults to the current one); hour buckets are
+                UTC hours, see task_timer.services.series
+
+        Returns:
+            dict with keys: bucket, from, to, timezone, fields, and data (a
+            list of [start, total_sessions, completed_sessions,
+            total_minutes] rows, one per bucket in order)
+
+        Raises:
+            ValueError: If the bucket or range is invalid
+        """
+        if tzinfo is None:
+            tzinfo = timezone.get_current_timezone()
+
+        keys = series.bucket_starts(first_day, last_day, bucket, tzinfo)
+
+        start = timezone.make_aware(datetime.combine(first_day, time.min), tzinfo)
+        end = timezone.make_aware(datetime.combine(last_day + timedelta(days=1), time.min), tzinfo)
+
+        totals = {}
+        for model in self._session_models(start):
+            rows = (
+                model.objects.filter(
+                    created_by=self.user,
+                    start_time__gte=start,
+                    start_time__lt=end
+                )
+                .order_by()
+                .annotate(bucket=series.truncate('start_time', bucket, tzinfo))
+                .values('bucket')
+                .annotate(
+                    total_sessions=Count('start_time'),
+                    completed_sessions=Count('start_time', filter=Q(status='completed')),
+                    total_seconds=Sum('duration')
+                )
+            )
+
+            for row in rows:
+                key = series.bucket_key(row['bucket'], bucket, tzinfo)
+                counts = totals.setdefault(key, [0, 0, 0])
+                counts[0] += row['total_sessions']
+                counts[1] += row['completed_sessions']
+                counts[2] += row['total_seconds'] or 0
 
-        total_sessions = sessions.count()
-        completed_sessions = sessions.filter(status='completed').count()
-        total_seconds = sum(s.duration for s in sessions)
-        total_minutes = total_seconds // 60
+        data = []
+        for key in keys:
+            total_sessions, completed_sessions, total_seconds = totals.get(key, (0, 0, 0))
+            data.append([
+                series.bucket_label(key, bucket, tzinfo), total_sessions, completed_sessions, total_seconds // 60
+            ])
 
         return {
-            'total_sessions': total_sessions,
-            'completed_sessions': completed_sessions,
-            'total_minutes': total_minutes
+            'bucket': bucket,
+            'from': first_day.isoformat(),
+            'to': last_day.isoformat(),
+            'timezone': str(tzinfo),
+            'fields': ['start', 'total_sessions', 'completed_sessions', 'total_minutes'],
+            'data': data
         }
 
+    def get_daily_stats(self, date=None):
+        """
+        Get statistics for a specific day
+
+        Args:
+            date: Date to get stats for (defaults to today)
+
+        Returns:
+            dict with keys: total_sessions, completed_sessions, total_minutes
+        """
+        return self._get_rollup_stats({'day': self._day_range(date)})['day']
+
     def get_weekly_stats(self, date=None):
         """
         Get statistics for a specific week
@@ -244,50 +803,273 @@ class TimerEngine:
         Returns:
             dict with keys: total_sessions, completed_sessions, total_minutes
         """
-        if date is None:
-            date = timezone.now().date()
+        return self._get_rollup_stats({'week': self._week_range(date)})['week']
+
+    def get_dashboard_stats(self, date=None):
+        """
+        Get daily and weekly statistics together
+
+        Args:
+            date: Date to get stats for (defaults to today)
+
+        Returns:
+            dict with keys: today, week (each as returned by get_daily_stats)
+        """
+        return self._get_rollup_stats({
+            'today': self._day_range(date),
+            'week': self._week_range(date)
+        })
 
-        # Get start of week (Monday)
-        start = timezone.make_aware(
-            timezone.datetime.combine(
-                date - timedelta(days=date.weekday()),
-                timezone.datetime.min.time()
+    def _get_rollup_stats(self, windows):
+        """
+        Sum DailyTimerStats rows for whole-day windows
+
+        Reads at most one small row per day, plus the active session, which
+        the rollup leaves out until it finishes. With TASK_TIMER_CACHE_STATS
+        enabled the result is served from the versioned stats cache.
+
+        Args:
+            windows: dict mapping a name to a (first_day, end_day) pair of
+                dates; end_day is exclusive
+
+        Returns:
+            dict mapping each name to a dict with keys: total_sessions,
+            completed_sessions, total_minutes
+        """
+        if stats_cache.is_enabled():
+            return stats_cache.get_or_compute(
+                self.user.pk,
+                windows,
+                lambda: self._sum_rollup_stats(windows)
             )
-        )
-        end = start + timedelta(days=7)
 
-        sessions = TimerSession.objects.filter(
-            created_by=self.user,
-            start_time__gte=start,
-            start_time__lt=end
-        )
+        return self._sum_rollup_stats(windows)
 
-        total_sessions = sessions.count()
-        completed_sessions = sessions.filter(status='completed').count()
-        total_seconds = sum(s.duration for s in sessions)
-        total_minutes = total_seconds // 60
+    def _sum_rollup_stats(self, windows):
+        """Read rollup rows and the active session and total them per window"""
+        rows = list(self._rollup_rows(windows))
 
-        return {
-            'total_sessions': total_sessions,
-            'completed_sessions': completed_sessions,
-            'total_minutes': total_minutes
-        }
+        active = self.get_active_session()
+        if active:
+            rows.append((rollup.session_date(active), 1, 0, active.duration))
+
+        return self._total_windows(rows, windows)
+
+    def _rollup_rows(self, windows):
+        """QuerySet of (date, total_sessions, completed_sessions, total_seconds) covering windows"""
+        return DailyTimerStats.objects.filter(
+            user=self.user,
+            date__gte=min(first for first, end in windows.values()),
+            date__lt=max(end for first, end in windows.values())
+        ).values_list('date', 'total_sessions', 'completed_sessions', 'total_seconds')
+
+    def _total_windows(self, rows, windows):
+        """Total rollup rows (plus the active session's row) per window"""
+        stats = {}
+        for name, (first, end) in windows.items():
+            in_window = [row for row in rows if first <= row[0] < end]
+            stats[name] = {
+                'total_sessions': sum(row[1] for row in in_window),
+                'completed_sessions': sum(row[2] for row in in_window),
+                'total_minutes': sum(row[3] for row in in_window) // 60
+            }
+
+        return stats
+
+    def _day_range(self, date=None):
+        """Return the (first_day, end_day) dates covering one day"""
+        if date is None:
+            date = rollup.local_date(timezone.now())
+
+        return date, date + timedelta(days=1)
+
+    def _week_range(self, date=None):
+        """Return the (first_day, end_day) dates of the week (from Monday) containing date"""
+        if date is None:
+            date = rollup.local_date(timezone.now())
+
+        monday = date - timedelta(days=date.weekday())
+        return monday, monday + timedelta(days=7)
 
     def get_or_create_settings(self):
         """
-        Get or create user settings with defaults
+        Get user settings, falling back to the defaults
+
+        Users get a TimerSettings row only when they first change something
+        (see update_settings()); until then an unsaved instance holding
+        SETTINGS_DEFAULTS is returned. With TASK_TIMER_CACHE_SETTINGS
+        enabled, either answer is served from the cache.
 
         Returns:
-            TimerSettings instance
+            TimerSettings instance; unsaved (pk None) if the user has none
         """
-        settings, created = TimerSettings.objects.get_or_create(
+        if settings_cache.is_enabled():
+            hit, settings = settings_cache.get_settings(self.user.pk)
+            if hit:
+                return settings or self._default_settings()
+
+        settings = TimerSettings.objects.filter(user=self.user).first()
+
+        if settings_cache.is_enabled():
+            settings_cache.fill_settings(self.user.pk, settings)
+
+        return settings or self._default_settings()
+
+    def update_settings(self, **values):
+        """
+        Save changes to user settings, creating the row on the first change
+
+        Args:
+            **values: TimerSettings field values to change
+
+        Returns:
+            Saved TimerSettings instance
+        """
+        settings, created = TimerSettings.objects.update_or_create(
             user=self.user,
-            defaults={
-                'work_duration': 25,
-                'short_break_duration': 5,
-                'long_break_duration': 15,
-                'auto_start_breaks': False
-            }
+            defaults=values
         )
 
+        if settings_cache.is_enabled():
+            settings_cache.set_settings(self.user.pk, settings)
+
         return settings
+
+    def _default_settings(self):
+        """Return an unsaved TimerSettings instance holding the defaults"""
+        return TimerSettings(user=self.user, **self.SETTINGS_DEFAULTS)
+
+    # Async API
+    #
+    # Reads use the async ORM and async cache methods directly. State
+    # changes rely on transaction.atomic() and on_commit hooks, which the
+    # async ORM does not support, so they run the sync method in the thread
+    # that owns the database connection.
+
+    async def astart_session(self, task, notes=''):
+        """Async counterpart of start_session()"""
+        return await sync_to_async(self.start_session)(task=task, notes=notes)
+
+    async def aget_active_session(self):
+        """Async counterpart of get_active_session()"""
+        if session_cache.is_enabled():
+            hit, session = await session_cache.aget_active_session(self.user.pk)
+            if hit:
+                return session
+
+        session = await TimerSession.objects.filter(
+            created_by=self.user,
+            status__in=ACTIVE_STATUSES
+        ).afirst()
+
+        if session_cache.is_enabled():
+            await session_cache.afill_active_session(self.user.pk, session)
+
+        return session
+
+    async def apause_session(self):
+        """Async counterpart of pause_session()"""
+        return await sync_to_async(self.pause_session)()
+
+    async def aresume_session(self):
+        """Async counterpart of resume_session()"""
+        return await sync_to_async(self.resume_session)()
+
+    async def astop_session(self):
+        """Async counterpart of stop_session()"""
+        return await sync_to_async(self.stop_session)()
+
+    async def acomplete_session(self):
+        """Async counterpart of complete_session()"""
+        return await sync_to_async(self.complete_session)()
+
+    async def aupdate_session_duration(self, duration):
+        """
+        Async counterpart of update_session_duration()
+
+        With TASK_TIMER_HEARTBEAT_WRITE_BEHIND enabled only the cache is
+        touched, so heartbeats are handled without a database thread.
+        """
+        if not heartbeats.is_enabled():
+            return await sync_to_async(self.update_session_duration)(duration)
+
+        duration = _clean_duration(duration)
+        now = timezone.now()
+        session = await self.aget_active_session()
+        if not session:
+            raise ValueError("No active session to update")
+
+        await heartbeats.arecord_heartbeat(session, duration, at=now)
+        return self._apply_heartbeat(session, duration, now)
+
+    async def atouch_session(self):
+        """Async counterpart of touch_session()"""
+        if not liveness_enabled():
+            return
+
+        now = timezone.now()
+        if await self._touch_queryset(now).aupdate(last_seen=now):
+            return
+
+        if not await self.aget_active_session():
+            raise ValueError("No active session")
+
+    async def arun_batch(self, operations):
+        """Async counterpart of run_batch()"""
+        return await sync_to_async(self.run_batch)(operations)
+
+    async def aget_daily_stats(self, date=None):
+        """Async counterpart of get_daily_stats()"""
+        stats = await self._aget_rollup_stats({'day': self._day_range(date)})
+        return stats['day']
+
+    async def aget_weekly_stats(self, date=None):
+        """Async counterpart of get_weekly_stats()"""
+        stats = await self._aget_rollup_stats({'week': self._week_range(date)})
+        return stats['week']
+
+    async def aget_dashboard_stats(self, date=None):
+        """Async counterpart of get_dashboard_stats()"""
+        return await self._aget_rollup_stats({
+            'today': self._day_range(date),
+            'week': self._week_range(date)
+        })
+
+    async def _aget_rollup_stats(self, windows):
+        """Async counterpart of _get_rollup_stats()"""
+        if stats_cache.is_enabled():
+            return await stats_cache.aget_or_compute(
+                self.user.pk,
+                windows,
+                lambda: self._asum_rollup_stats(windows)
+            )
+
+        return await self._asum_rollup_stats(windows)
+
+    async def _asum_rollup_stats(self, windows):
+        """Async counterpart of _sum_rollup_stats()"""
+        rows = [row async for row in self._rollup_rows(windows)]
+
+        active = await self.aget_active_session()
+        if active:
+            rows.append((rollup.session_date(active), 1, 0, active.duration))
+
+        return self._total_windows(rows, windows)
+
+    async def aget_or_create_settings(self):
+        """Async counterpart of get_or_create_settings()"""
+        if settings_cache.is_enabled():
+            hit, settings = await settings_cache.aget_settings(self.user.pk)
+            if hit:
+                return settings or self._default_settings()
+
+        settings = await TimerSettings.objects.filter(user=self.user).afirst()
+
+        if settings_cache.is_enabled():
+            await settings_cache.afill_settings(self.user.pk, settings)
+
+        return settings or self._default_settings()
+
+    async def aupdate_settings(self, **values):
+        """Async counterpart of update_settings()"""
+        return await sync_to_async(self.update_settings)(**values)
@@ -1,30 +1,121 @@
 """
 Django signals for task_timer
 
-Automatically creates TimerSettings when a new User is created
+Keeps cached settings in step with TimerSettings writes
+Keeps cached timer state and the daily rollup in step with TimerSession writes
 """
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
-from django.contrib.auth.models import User
-from task_timer.models import TimerSettings
+from task_timer.models import TimerSession, TimerSettings
+from task_timer.services import rollup, session_cache, settings_cache, stats_cache
 
 
-@receiver(post_save, sender=User)
-def create_timer_settings(sender, instance, created, **kwargs):
+@receiver(post_save, sender=TimerSettings)
+@receiver(post_delete, sender=TimerSettings)
+def invalidate_cached_settings(sender, instance, **kwargs):
     """
-    Automatically create TimerSettings with defaults when a new User is created
+    Drop the user's cached settings when their TimerSettings row changes
+
+    TimerEngine.update_settings() updates the cache itself; this covers
+    admin edits, user deletion and other direct ORM writes.
+
+    Args:
+        sender: The model class (TimerSettings)
+        instance: The TimerSettings instance
+        **kwargs: Additional keyword arguments
+    """
+    if settings_cache.is_enabled():
+        settings_cache.invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=TimerSession)
+@receiver(post_delete, sender=TimerSession)
+def invalidate_cached_timer_state(sender, instance, **kwargs):
+    """
+    Drop the owner's cached active session and stats when a session is saved or deleted
+
+    TimerEngine updates the cache itself; this covers admin edits and other
+    direct ORM writes.
 
     Args:
-        sender: The model class (User)
-        instance: The actual User instance
+        sender: The model class (TimerSession)
+        instance: The TimerSession instance
+        **kwargs: Additional keyword arguments
+    """
+    if session_cache.is_enabled():
+        session_cache.invalidate(instance.created_by_id)
+
+    if stats_cache.is_enabled():
+        stats_cache.invalidate(instance.created_by_id)
+
+
+# Fields a session's rollup contribution or day depends on, by name and attname
+ROLLUP_FIELDS = {'created_by', 'created_by_id', 'start_time', 'status', 'duration', 'pause_duration'}
+
+
+def _changes_rollup(update_fields):
+    """Return True if a save with these update_fields can change the rollup"""
+    return update_fields is None or not ROLLUP_FIELDS.isdisjoint(update_fields)
+
+
+@receiver(pre_save, sender=TimerSession)
+def remember_previous_session_state(sender, instance, update_fields=None, **kwargs):
+    """
+    Record the stored owner, start time and status before a session is re-saved
+
+    post_save needs them to refresh the rollup day a session moves away from.
+    TimerEngine writes with UPDATE statements, so this only runs for direct
+    ORM saves, and saves limited to update_fields outside ROLLUP_FIELDS
+    skip the lookup.
+    """
+    instance._rollup_previous = None
+    if not instance._state.adding and instance.pk and _changes_rollup(update_fields):
+        instance._rollup_previous = TimerSession.objects.filter(pk=instance.pk).values_list(
+            'created_by_id', 'start_time', 'status'
+        ).first()
+
+
+@receiver(post_save, sender=TimerSession)
+def update_daily_stats_on_save(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Keep DailyTimerStats in step with sessions saved through the ORM
+
+    Args:
+        sender: The model class (TimerSession)
+        instance: The TimerSession instance
         created: Boolean; True if a new record was created
+        update_fields: Fields the save was limited to, or None
         **kwargs: Additional keyword arguments
     """
     if created:
-        TimerSettings.objects.create(
-            user=instance,
-            work_duration=25,
-            short_break_duration=5,
-            long_break_duration=15,
-            auto_start_breaks=False
-        )
+        rollup.add_session(instance)
+        return
+
+    if not _changes_rollup(update_fields):
+        return
+
+    previous = getattr(instance, '_rollup_previous', None)
+    pairs = {(instance.created_by_id, rollup.session_date(instance))}
+
+    if previous:
+        user_id, start_time, status = previous
+        if status not in rollup.FINISHED_STATUSES and instance.status not in rollup.FINISHED_STATUSES:
+            # Active before and after: the rollup does not count it yet
+            return
+        pairs.add((user_id, rollup.local_date(start_time)))
+
+    rollup.refresh_days(pairs)
+
+
+@receiver(post_delete, sender=TimerSession)
+def update_daily_stats_on_delete(sender, instance, **kwargs):
+    """
+    Drop a deleted session from DailyTimerStats
+
+    Args:
+        sender: The model class (TimerSession)
+        instance: The deleted TimerSession instance
+        **kwargs: Additional keyword arguments
+    """
+    if rollup.contribution(instance):
+        rollup.refresh_days([(instance.created_by_id, rollup.session_date(instance))])
@@ -24,6 +24,8 @@ document.addEventListener('DOMContentLoaded', function() {
     loadStats();
     checkActiveSession();
     loadSettings();
+    subscribeToEvents();
+    keepSessionAlive();
 });
 
 // Get CSRF token from cookie
@@ -92,7 +94,7 @@ async function checkActiveSession() {
 function resumeFromActiveSession() {
     if (!currentSession) return;
 
-    timeRemaining = workDuration - currentSession.duration;
+    timeRemaining = workDuration - currentSession.elapsed_seconds;
     updateDisplay();
 
     if (currentSession.status === 'running') {
@@ -179,6 +181,8 @@ startSessionBtn.addEventListener('click', async function() {
 });
 
 // Start timer countdown
+// The server derives the duration from start/pause/resume timestamps,
+// so the countdown is display-only and never reports progress.
 function startTimer() {
     if (timerInterval) clearInterval(timerInterval);
 
@@ -186,11 +190,6 @@ function startTimer() {
         timeRemaining--;
         updateDisplay();
 
-        // Update server every 5 seconds
-        if (timeRemaining % 5 === 0 && currentSession) {
-            await updateServerDuration();
-        }
-
         // Timer complete
         if (timeRemaining <= 0) {
             clearInterval(timerInterval);
@@ -199,24 +198,6 @@ function startTimer() {
     }, 1000);
 }
 
-// Update duration on server
-async function updateServerDuration() {
-    const duration = workDuration - timeRemaining;
-    try {
-        await fetch(`${API_BASE}/timer/update-duration/`, {
-            method: 'PATCH',
-            headers: {
-                'Content-Type': 'application/json',
-                'X-CSRFToken': csrftoken
-            },
-            credentials: 'same-origin',
-            body: JSON.stringify({ duration })
-        });
-    } catch (error) {
-        console.error('Error updating duration:', error);
-    }
-}
-
 // Pause session
 pauseBtn.addEventListener('click', async function() {
     if (timerInterval) clearInterval(timerInterval);
@@ -252,6 +233,8 @@ resumeBtn.addEventListener('click', async function() {
 
         if (response.ok) {
             currentSession = await response.json();
+            timeRemaining = workDuration - currentSession.elapsed_seconds;
+            updateDisplay();
             timerStatus.textContent = `Working on: ${currentSession.task}`;
             startTimer();
             showControls('running');
@@ -302,6 +285,29 @@ async function completeSession() {
     }
 }
 
+// Tell the server that the open session still has a page showing it, so
+// it is not stopped as abandoned once the tab is closed for good. The
+// interval (TASK_TIMER_LAST_SEEN_INTERVAL) is rendered into the page only
+// while abandoned sessions are detected; each ping then writes at most once.
+function keepSessionAlive() {
+    const interval = Number(document.querySelector('.dashboard').dataset.keepaliveInterval);
+    if (!interval) return;
+
+    setInterval(function() {
+        if (!currentSession) return;
+
+        fetch(`${API_BASE}/timer/heartbeat/`, {
+            method: 'POST',
+            headers: {
+                'X-CSRFToken': csrftoken
+            },
+            credentials: 'same-origin'
+        }).catch(function(error) {
+            console.error('Error sending keep-alive:', error);
+        });
+    }, interval * 1000);
+}
+
 // Reset timer to initial state
 function resetTimer() {
     if (timerInterval) clearInterval(timerInterval);
@@ -319,19 +325,46 @@ async function loadStats() {
             credentials: 'same-origin'
         });
         if (response.ok) {
-            const stats = await response.json();
-
-            // Today's stats
-            document.getElementById('today-sessions').textContent = stats.today.total_sessions;
-            document.getElementById('today-completed').textContent = stats.today.completed_sessions;
-            document.getElementById('today-minutes').textContent = stats.today.total_minutes + 'm';
-
-            // Week's stats
-            document.getElementById('week-sessions').textContent = stats.week.total_sessions;
-            document.getElementById('week-completed').textContent = stats.week.completed_sessions;
-            document.getElementById('week-minutes').textContent = stats.week.total_minutes + 'm';
+            renderStats(await response.json());
         }
     } catch (error) {
         console.error('Error loading stats:', error);
     }
 }
+
+// Show statistics
+function renderStats(stats) {
+    // Today's stats
+    document.getElementById('today-sessions').textContent = stats.today.total_sessions;
+    document.getElementById('today-completed').textContent = stats.today.completed_sessions;
+    document.getElementById('today-minutes').textContent = stats.today.total_minutes + 'm';
+
+    // Week's stats
+    document.getElementById('week-sessions').textContent = stats.week.total_sessions;
+    document.getElementById('week-completed').textContent = stats.week.completed_sessions;
+    document.getElementById('week-minutes').textContent = stats.week.total_minutes + 'm';
+}
+
+// Follow changes made in other tabs and devices, when the server publishes
+// them (TASK_TIMER_PUSH_EVENTS, rendered into the page as data-push-events).
+function subscribeToEvents() {
+    if (!window.EventSource) return;
+    if (document.querySelector('.dashboard').dataset.pushEvents !== 'true') return;
+
+    const source = new EventSource(`${API_BASE}/timer/events/`);
+
+    source.addEventListener('session', function(event) {
+        const session = JSON.parse(event.data);
+        if (session && (session.status === 'running' || session.status === 'paused')) {
+            if (timerInterval) clearInterval(timerInterval);
+            currentSession = session;
+            resumeFromActiveSession();
+        } else if (currentSession) {
+            resetTimer();
+        }
+    });
+
+    source.addEventListener('stats', function(event) {
+        renderStats(JSON.parse(event.data));
+    });
+}
@@ -0,0 +1,83 @@
+"""
+Shared pytest fixtures for task_timer tests
+"""
+import asyncio
+import warnings
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Keep cached timer state from leaking between tests"""
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def asgi_get(client):
+    """
+    Return a function sending a GET through Django's ASGI handler
+
+    Requests carry the cookies of the `client` fixture, so log in with
+    client.force_login() first. The function takes the path, optional
+    headers and an on_body callback run as each body message is sent, and
+    returns (status, headers, body messages, warnings raised).
+    """
+    def get(path, headers=(), on_body=None):
+        path, _, query = path.partition('?')
+        cookies = '; '.join(f'{name}={morsel.value}' for name, morsel in client.cookies.items())
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': query.encode(),
+            'root_path': '',
+            'headers': [(b'host', b'testserver'), (b'cookie', cookies.encode())] + [
+                (name.lower().encode(), value.encode()) for name, value in headers
+            ],
+            'client': ('127.0.0.1', 1),
+            'server': ('testserver', 80),
+        }
+        messages = []
+        received = []
+
+        async def receive():
+            if not received:
+                received.append(True)
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            # Nothing else arrives until the response is done
+            return await asyncio.Future()
+
+        async def send(message):
+            messages.append(message)
+            if on_body and message.get('body'):
+                on_body(message['body'])
+
+        # As django.test.Client does, so the test database stays open
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        try:
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always')
+                async_to_sync(ASGIHandler())(scope, receive, send)
+        finally:
+            request_started.connect(close_old_connections)
+            request_finished.connect(close_old_connections)
+
+        start = messages[0]
+        bodies = [message['body'] for message in messages[1:] if message.get('body')]
+        headers = {name.decode().lower(): value.decode() for name, value in start['headers']}
+        return start['status'], headers, bodies, [str(warning.message) for warning in caught]
+
+    return get
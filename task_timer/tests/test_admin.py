@@ -0,0 +1,139 @@
+"""
+Tests for the TimerSession admin on large tables
+"""
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from task_timer import admin as timer_admin
+from task_timer.models import TimerSession
+
+
+def create_sessions(user, count, task='Write report'):
+    TimerSession.objects.bulk_create([
+        TimerSession(task=f'{task} {index}', notes='quarterly numbers', created_by=user, status='completed')
+        for index in range(count)
+    ])
+
+
+@pytest.mark.django_db
+class TestTimerSessionAdmin:
+    """Tests for TimerSessionAdmin"""
+
+    def setup_method(self):
+        self.url = reverse('admin:task_timer_timersession_changelist')
+        self.alice = User.objects.create_user(username='alice', password='testpass')
+        self.bob = User.objects.create_user(username='bob', password='testpass')
+
+    def changelist_queries(self, client, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(self.url, params or {})
+        assert response.status_code == 200
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_rows_or_users(self, admin_client):
+        create_sessions(self.alice, 3)
+        few = self.changelist_queries(admin_client)
+
+        for index in range(20):
+            create_sessions(User.objects.create_user(username=f'user{index}'), 5)
+
+        assert self.changelist_queries(admin_client) == few
+
+    def test_no_full_result_count(self, admin_client):
+        create_sessions(self.alice, 3)
+
+        response = admin_client.get(self.url, {'status': 'completed'})
+
+        assert response.context['cl'].full_result_count is None
+
+    def test_user_filter_is_an_input(self, admin_client):
+        create_sessions(self.alice, 2)
+        create_sessions(self.bob, 3)
+
+        response = admin_client.get(self.url)
+        content = response.content.decode()
+
+        assert 'name="user"' in content
+        assert 'created_by__id__exact' not in content
+
+    def test_user_filter_by_username_or_id(self, admin_client):
+        create_sessions(self.alice, 2)
+        create_sessions(self.bob, 3)
+
+        by_name = admin_client.get(self.url, {'user': 'bob'}).context['cl']
+        by_id = admin_client.get(self.url, {'user': str(self.alice.pk)}).context['cl']
+
+        assert by_name.result_count == 3
+        assert by_id.result_count == 2
+
+    def test_numeric_username(self, admin_client):
+        numeric = User.objects.create_user(username=str(self.alice.pk), password='testpass')
+        create_sessions(self.alice, 2)
+        create_sessions(numeric, 3)
+
+        by_filter = admin_client.get(self.url, {'user': numeric.username}).context['cl']
+        by_search = admin_client.get(self.url, {'q': numeric.username}).context['cl']
+
+        # Both the user with that id and the user with that name match
+        assert by_filter.result_count == 5
+        # The search matches the named user's sessions and the session with that id
+        assert set(TimerSession.objects.filter(created_by=numeric)) < set(by_search.result_list)
+        assert TimerSession.objects.get(pk=int(numeric.username)) in by_search.result_list
+
+    def test_user_filter_keeps_other_filters(self, admin_client):
+        response = admin_client.get(self.url, {'status': 'completed', 'user': 'bob'})
+
+        assert '<input type="hidden" name="status" value="completed">' in response.content.decode()
+
+    def test_search(self, admin_client):
+        create_sessions(self.alice, 2, task='Write report')
+        create_sessions(self.bob, 3, task='Review code')
+        session = TimerSession.objects.filter(created_by=self.bob).first()
+
+        def search(term):
+            return set(admin_client.get(self.url, {'q': term}).context['cl'].result_list)
+
+        assert len(search('write')) == 2
+        assert len(search('bob')) == 3
+        assert search(str(session.pk)) == {session}
+        # Only the start of the task is matched, and notes are not searched
+        assert search('report') == set()
+        assert search('quarterly') == set()
+
+    def test_list_select_related(self, admin_client):
+        create_sessions(self.alice, 3)
+
+        cl = admin_client.get(self.url).context['cl']
+
+        assert cl.list_select_related == ['created_by']
+
+
+class TestEstimatedCountPaginator:
+    """Tests for EstimatedCountPaginator"""
+
+    @pytest.mark.django_db
+    def test_exact_count_without_estimate(self):
+        create_sessions(User.objects.create_user(username='alice'), 3)
+
+        paginator = timer_admin.EstimatedCountPaginator(TimerSession.objects.all(), 2)
+
+        assert paginator.count == 3
+
+    def test_large_estimate_replaces_count(self, monkeypatch):
+        monkeypatch.setattr(timer_admin, 'estimate_count', lambda queryset: 10_000_000)
+
+        paginator = timer_admin.EstimatedCountPaginator(TimerSession.objects.all(), 100)
+
+        assert paginator.count == 10_000_000
+        assert paginator.num_pages == 100_000
+
+    @pytest.mark.django_db
+    def test_small_estimate_is_counted_exactly(self, monkeypatch):
+        monkeypatch.setattr(timer_admin, 'estimate_count', lambda queryset: 40)
+        create_sessions(User.objects.create_user(username='alice'), 3)
+
+        paginator = timer_admin.EstimatedCountPaginator(TimerSession.objects.all(), 2)
+
+        assert paginator.count == 3
@@ -79,6 +79,7 @@ class TestTimerAPI:
         assert response.status_code == status.HTTP_200_OK
         assert response.data['id'] == session.id
         assert response.data['status'] == 'running'
+        assert response.data['elapsed_seconds'] == 0
 
     def test_get_active_session_when_none(self):
         """Test getting active session when none exists"""
@@ -275,6 +276,11 @@ class TestTimerAPI:
 
         assert response.status_code == status.HTTP_200_OK
         assert 'results' in response.data
-        assert 'count' in response.data
-        assert response.data['count'] == 25
+        assert 'count' not in response.data  # Cursor pagination skips COUNT(*)
+        assert response.data['previous'] is None
         assert len(response.data['results']) == 20  # Default page size
+
+        response = self.client.get(response.data['next'])
+
+        assert len(response.data['results']) == 5
+        assert response.data['next'] is None
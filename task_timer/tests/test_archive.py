@@ -0,0 +1,278 @@
+"""
+Tests for archiving old sessions
+"""
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from task_timer.models import ArchivedTimerSession, DailyTimerStats, TimerSession
+from task_timer.pagination import paginate_keyset
+from task_timer.services import TimerEngine, archive, rollup
+
+
+def make_session(user, days_ago, task='Task', status='completed', duration=600):
+    start = timezone.now() - timedelta(days=days_ago)
+    return TimerSession.objects.create(
+        task=task,
+        notes=f'Notes for {task}',
+        created_by=user,
+        status=status,
+        start_time=start,
+        end_time=start + timedelta(seconds=duration),
+        duration=duration
+    )
+
+
+@pytest.fixture
+def archiving(settings):
+    settings.TASK_TIMER_ARCHIVE_AFTER_DAYS = 30
+
+
+@pytest.mark.django_db
+class TestCompressedTextField:
+    """Tests for CompressedTextField on ArchivedTimerSession"""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+
+    def raw_task(self, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT task FROM {ArchivedTimerSession._meta.db_table} WHERE id = %s', [pk])
+            return bytes(cursor.fetchone()[0])
+
+    def archive_one(self, pk, task):
+        now = timezone.now()
+        ArchivedTimerSession.objects.create(
+            id=pk, task=task, created_by=self.user, status='completed',
+            start_time=now, updated_at=now
+        )
+        return ArchivedTimerSession.objects.get(pk=pk)
+
+    def test_stored_plain_by_default(self):
+        session = self.archive_one(1, 'Write report ' * 20)
+
+        assert self.raw_task(1).startswith(b'p')
+        assert session.task == 'Write report ' * 20
+
+    def test_compressed_when_enabled(self, settings):
+        settings.TASK_TIMER_ARCHIVE_COMPRESS = True
+        task = 'Write report ' * 20
+
+        session = self.archive_one(1, task)
+
+        raw = self.raw_task(1)
+        assert raw.startswith(b'z')
+        assert len(raw) < len(task)
+        assert session.task == task
+
+    def test_short_text_is_not_compressed(self, settings):
+        settings.TASK_TIMER_ARCHIVE_COMPRESS = True
+
+        session = self.archive_one(1, 'Tea')
+
+        assert self.raw_task(1) == b'pTea'
+        assert session.task == 'Tea'
+
+    def test_values_are_decoded(self, settings):
+        settings.TASK_TIMER_ARCHIVE_COMPRESS = True
+        self.archive_one(1, 'Ünïcode task ' * 10)
+
+        assert ArchivedTimerSession.objects.values_list('task', flat=True).get() == 'Ünïcode task ' * 10
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('archiving')
+class TestArchiveSessions:
+    """Tests for archive.archive_sessions()"""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+
+    def test_moves_old_finished_sessions_only(self):
+        old = make_session(self.user, 40, task='Old')
+        old_stopped = make_session(self.user, 35, task='Old stopped', status='stopped')
+        recent = make_session(self.user, 5, task='Recent')
+        old_running = make_session(self.user, 40, task='Old running', status='running')
+
+        assert archive.archive_sessions() == 2
+
+        assert set(TimerSession.objects.values_list('pk', flat=True)) == {recent.pk, old_running.pk}
+        archived = ArchivedTimerSession.objects.get(pk=old.pk)
+        assert archived.task == 'Old'
+        assert archived.notes == 'Notes for Old'
+        assert archived.start_time == old.start_time
+        assert archived.updated_at == old.updated_at
+        assert ArchivedTimerSession.objects.get(pk=old_stopped.pk).status == 'stopped'
+
+    def test_batches(self):
+        for index in range(5):
+            make_session(self.user, 40 + index)
+        totals = []
+
+        assert archive.archive_sessions(batch_size=2, progress=totals.append) == 5
+        assert totals == [2, 4, 5]
+
+    def test_rollup_is_unchanged(self):
+        make_session(self.user, 40)
+        make_session(self.user, 40, status='stopped', duration=300)
+        before = list(DailyTimerStats.objects.values('date', *rollup.COUNTERS))
+
+        archive.archive_sessions()
+
+        assert list(DailyTimerStats.objects.values('date', *rollup.COUNTERS)) == before
+        assert rollup.check_daily_stats() == []
+
+        rollup.rebuild_daily_stats()
+        assert list(DailyTimerStats.objects.values('date', *rollup.COUNTERS)) == before
+
+    def test_off_without_setting(self, settings):
+        settings.TASK_TIMER_ARCHIVE_AFTER_DAYS = None
+
+        with pytest.raises(ValueError):
+            archive.archive_sessions()
+
+
+@pytest.mark.django_db
+class TestArchiveCommand:
+    """Tests for the archive_timer_sessions management command"""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+
+    def test_requires_setting(self):
+        with pytest.raises(CommandError):
+            call_command('archive_timer_sessions')
+
+    def test_dry_run(self, archiving):
+        make_session(self.user, 40)
+        out = StringIO()
+
+        call_command('archive_timer_sessions', '--dry-run', stdout=out)
+
+        assert out.getvalue().startswith('1 sessions')
+        assert TimerSession.objects.count() == 1
+
+    def test_archives(self, archiving):
+        make_session(self.user, 40)
+        make_session(self.user, 1)
+        out = StringIO()
+
+        call_command('archive_timer_sessions', '--batch-size', '1', stdout=out)
+
+        assert 'Archived 1 sessions' in out.getvalue()
+        assert TimerSession.objects.count() == 1
+        assert ArchivedTimerSession.objects.count() == 1
+
+
+@pytest.mark.django_db
+class TestReadsIncludeArchive:
+    """Stats and history reads merge archived sessions in"""
+
+    @pytest.fixture(autouse=True)
+    def sessions(self, archiving):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.engine = TimerEngine(user=self.user)
+        self.old = make_session(self.user, 40, task='Old', duration=1200)
+        self.recent = make_session(self.user, 2, task='Recent', duration=600)
+        archive.archive_sessions()
+
+    def test_stats_reaching_into_archive(self):
+        now = timezone.now()
+
+        stats = self.engine.get_stats({'all': (now - timedelta(days=60), now)})
+
+        assert stats['all'] == {'total_sessions': 2, 'completed_sessions': 2, 'total_minutes': 30}
+
+    def test_recent_stats_skip_archive(self, django_assert_num_queries):
+        now = timezone.now()
+
+        with django_assert_num_queries(1):
+            stats = self.engine.get_stats({'week': (now - timedelta(days=7), now)})
+
+        assert stats['week']['total_sessions'] == 1
+
+    def test_stats_series(self):
+        today = timezone.localdate()
+
+        data = self.engine.get_stats_series(today - timedelta(days=45), today)['data']
+
+        assert sum(row[1] for row in data) == 2
+        assert sum(row[3] for row in data) == 30
+
+    def test_history_sources(self):
+        assert len(self.engine.get_history_sources()) == 2
+        assert len(self.engine.get_history_sources(start_date=timezone.now() - timedelta(days=7))) == 1
+
+    def test_paginate_keyset_merges_archive(self):
+        make_session(self.user, 3, task='Recent 2')
+        sessions = TimerSession.objects.filter(created_by=self.user)
+        archived = ArchivedTimerSession.objects.filter(created_by=self.user)
+
+        first = paginate_keyset(sessions, None, 2, archive=archived)
+        second = paginate_keyset(sessions, first.next_cursor, 2, archive=archived)
+        back = paginate_keyset(sessions, second.previous_cursor, 2, archive=archived)
+
+        assert [s.task for s in first] == ['Recent', 'Recent 2']
+        assert [s.task for s in second] == ['Old']
+        assert not second.has_next()
+        assert [s.task for s in back] == ['Recent', 'Recent 2']
+
+    def test_full_recent_page_skips_archive(self, django_assert_num_queries):
+        make_session(self.user, 3, task='Recent 2')
+        sessions = TimerSession.objects.filter(created_by=self.user)
+        archived = ArchivedTimerSession.objects.filter(created_by=self.user)
+
+        with django_assert_num_queries(1):
+            page = paginate_keyset(sessions, None, 1, archive=archived)
+
+        assert page.has_next()
+
+    def test_session_list(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        response = client.get(reverse('task_timer:session-list'))
+
+        assert [row['task'] for row in response.data['results']] == ['Recent', 'Old']
+
+    def test_retrieve_archived_session(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        response = client.get(reverse('task_timer:session-detail', args=[self.old.pk]))
+
+        assert response.status_code == 200
+        assert response.data['task'] == 'Old'
+        assert response.data['duration_formatted'] == '20m'
+
+    def test_retrieve_other_users_archived_session(self):
+        other = User.objects.create_user(username='other', password='testpass')
+        client = APIClient()
+        client.force_authenticate(user=other)
+
+        response = client.get(reverse('task_timer:session-detail', args=[self.old.pk]))
+
+        assert response.status_code == 404
+
+    def test_export(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        response = client.get(reverse('task_timer:session-export'), {'fields': 'task'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+
+        assert lines == ['{"task":"Recent"}', '{"task":"Old"}']
+
+    def test_history_view(self, client):
+        client.force_login(self.user)
+
+        response = client.get(reverse('task_timer:history'))
+
+        assert [s.task for s in response.context['sessions']] == ['Recent', 'Old']
@@ -0,0 +1,194 @@
+"""
+Tests for the async TimerEngine API and async views
+"""
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.urls import resolve
+from task_timer import async_views
+from task_timer.services import TimerEngine, heartbeats, stats_cache
+
+
+@pytest.mark.django_db
+class TestAsyncEngine:
+    """Tests for TimerEngine's async counterparts"""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.engine = TimerEngine(user=self.user)
+
+    def test_session_lifecycle(self):
+        session = async_to_sync(self.engine.astart_session)(task='Test task', notes='Notes')
+
+        assert async_to_sync(self.engine.aget_active_session)() == session
+
+        paused = async_to_sync(self.engine.apause_session)()
+        assert paused.status == 'paused'
+        assert async_to_sync(self.engine.aresume_session)().status == 'running'
+        assert async_to_sync(self.engine.acomplete_session)().status == 'completed'
+        assert async_to_sync(self.engine.aget_active_session)() is None
+
+    def test_errors_match_sync_api(self):
+        with pytest.raises(ValueError, match='No active session to stop'):
+            async_to_sync(self.engine.astop_session)()
+
+    def test_stats_match_sync_api(self):
+        self.engine.start_session(task='Finished')
+        self.engine.complete_session()
+        self.engine.start_session(task='Running')
+
+        assert async_to_sync(self.engine.aget_dashboard_stats)() == self.engine.get_dashboard_stats()
+        assert async_to_sync(self.engine.aget_daily_stats)() == self.engine.get_daily_stats()
+        assert async_to_sync(self.engine.aget_weekly_stats)()['total_sessions'] == 2
+
+    def test_stats_use_stats_cache(self, settings, django_assert_num_queries):
+        settings.TASK_TIMER_CACHE_STATS = True
+        stats_cache.reset_counters()
+
+        first = async_to_sync(self.engine.aget_dashboard_stats)()
+        with django_assert_num_queries(0):
+            assert async_to_sync(self.engine.aget_dashboard_stats)() == first
+
+        # The sync and async APIs share cache entries
+        assert self.engine.get_dashboard_stats() == first
+        assert stats_cache.get_counters() == {'hits': 2, 'misses': 1}
+
+    def test_active_session_uses_session_cache(self, settings, django_assert_num_queries):
+        settings.TASK_TIMER_CACHE_ACTIVE_SESSION = True
+        session = self.engine.start_session(task='Test task')
+
+        async_to_sync(self.engine.aget_active_session)()
+        with django_assert_num_queries(0):
+            assert async_to_sync(self.engine.aget_active_session)().pk == session.pk
+
+    def test_write_behind_heartbeat_skips_database(
+        self, settings, django_assert_num_queries, django_capture_on_commit_callbacks
+    ):
+        settings.TASK_TIMER_CACHE_ACTIVE_SESSION = True
+        settings.TASK_TIMER_HEARTBEAT_WRITE_BEHIND = True
+        with django_capture_on_commit_callbacks(execute=True):
+            self.engine.start_session(task='Test task')
+
+        with django_assert_num_queries(0):
+            session = async_to_sync(self.engine.aupdate_session_duration)(120)
+
+        assert session.duration == 120
+        assert heartbeats.pending_heartbeat(self.user.pk)['duration'] == 120
+
+    def test_update_duration_without_write_behind(self):
+        self.engine.start_session(task='Test task')
+
+        async_to_sync(self.engine.aupdate_session_duration)(90)
+
+        assert self.engine.get_active_session().duration == 90
+
+    def test_run_batch(self):
+        sessions = async_to_sync(self.engine.arun_batch)([('start', {'task': 'Task'}), ('pause', {})])
+
+        assert [session.status for session in sessions] == ['running', 'paused']
+
+    def test_get_or_create_settings(self):
+        settings = async_to_sync(self.engine.aget_or_create_settings)()
+
+        assert settings.user == self.user
+        assert settings.work_duration == 25
+
+
+@pytest.mark.django_db
+class TestAsyncViews:
+    """Tests for the views in task_timer.async_urls"""
+
+    @pytest.fixture(autouse=True)
+    def async_urls(self, settings):
+        settings.ROOT_URLCONF = 'task_timer.async_urls'
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.engine = TimerEngine(user=self.user)
+
+    def test_hot_endpoints_are_async(self):
+        assert resolve('/api/timer/active/').func is async_views.active_session_view
+        assert resolve('/api/timer/stats/').func is async_views.stats_view
+        assert resolve('/api/timer/heartbeat/').func is async_views.heartbeat_view
+        assert resolve('/api/timer/events/').func is async_views.timer_events_view
+        # Everything else is still served by the sync API
+        assert resolve('/api/timer/start/').url_name == 'timer-start'
+
+    def test_active(self, client):
+        client.force_login(self.user)
+
+        assert client.get('/api/timer/active/').status_code == 404
+
+        self.engine.start_session(task='Test task')
+        response = client.get('/api/timer/active/')
+
+        assert response.status_code == 200
+        assert response.json()['task'] == 'Test task'
+        assert 'ETag' not in response
+
+    def test_active_conditional_get(self, client):
+        client.force_login(self.user)
+        self.engine.start_session(task='Test task')
+        self.engine.pause_session()
+
+        etag = client.get('/api/timer/active/')['ETag']
+
+        assert client.get('/api/timer/active/', HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    def test_stats(self, client):
+        client.force_login(self.user)
+        self.engine.start_session(task='Test task')
+        self.engine.complete_session()
+
+        response = client.get('/api/timer/stats/')
+
+        assert response.status_code == 200
+        assert response.json() == self.engine.get_dashboard_stats()
+        assert client.get('/api/timer/stats/', HTTP_IF_NONE_MATCH=response['ETag']).status_code == 304
+
+    def test_heartbeat(self, client):
+        client.force_login(self.user)
+        self.engine.start_session(task='Test task')
+
+        response = client.post('/api/timer/heartbeat/', {'duration': 300}, content_type='application/json')
+
+        assert response.status_code == 204
+        assert self.engine.get_active_session().duration == 300
+
+    def test_heartbeat_form_encoded_patch(self, client):
+        client.force_login(self.user)
+        self.engine.start_session(task='Test task')
+
+        response = client.patch(
+            '/api/timer/heartbeat/',
+            'duration=60',
+            content_type='application/x-www-form-urlencoded'
+        )
+
+        assert response.status_code == 204
+        assert self.engine.get_active_session().duration == 60
+
+    def test_heartbeat_errors(self, client, settings):
+        settings.TASK_TIMER_ABANDONED_SESSION_TIMEOUT = 3600
+        client.force_login(self.user)
+
+        response = client.post('/api/timer/heartbeat/', {'duration': 'abc'}, content_type='application/json')
+        assert response.status_code == 400
+        assert response.json()['error'] == 'Duration must be a whole number of seconds'
+
+        # Without a duration it is a liveness ping
+        response = client.post('/api/timer/heartbeat/', {}, content_type='application/json')
+        assert response.json()['error'] == 'No active session'
+
+        response = client.post('/api/timer/heartbeat/', {'duration': 10}, content_type='application/json')
+        assert response.json()['error'] == 'No active session to update'
+
+    def test_requires_login(self, client):
+        assert client.get('/api/timer/active/').status_code == 403
+        assert client.get('/api/timer/stats/').status_code == 403
+
+    def test_method_not_allowed(self, client):
+        client.force_login(self.user)
+
+        assert client.post('/api/timer/active/').status_code == 405
+        assert client.get('/api/timer/heartbeat/').status_code == 405
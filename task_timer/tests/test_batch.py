@@ -0,0 +1,106 @@
+"""
+Tests for batched timer operations
+"""
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from task_timer.models import TimerSession
+from task_timer.services import TimerEngine
+from task_timer.services.timer_engine import BatchError
+
+
+@pytest.mark.django_db
+class TestRunBatch:
+    """Tests for TimerEngine.run_batch"""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.engine = TimerEngine(user=self.user)
+
+    def test_operations_run_in_order(self):
+        self.engine.start_session(task='First')
+
+        stopped, started = self.engine.run_batch([
+            ('stop', {}),
+            ('start', {'task': 'Second', 'notes': ''}),
+        ])
+
+        assert stopped.status == 'stopped'
+        assert started.task == 'Second'
+        assert started.status == 'running'
+
+    def test_failure_rolls_back_everything(self):
+        self.engine.start_session(task='First')
+
+        with pytest.raises(BatchError) as excinfo:
+            self.engine.run_batch([
+                ('update-duration', {'duration': 600}),
+                ('stop', {}),
+                ('resume', {}),
+            ])
+
+        assert excinfo.value.index == 2
+        assert excinfo.value.operation == 'resume'
+        session = TimerSession.objects.get()
+        assert session.status == 'running'
+        assert session.duration == 0
+
+
+@pytest.mark.django_db
+class TestBatchAPI:
+    """Tests for POST /api/timer/batch/"""
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('task_timer:timer-batch')
+
+    def post(self, *operations):
+        return self.client.post(self.url, {'operations': list(operations)}, format='json')
+
+    def test_stop_then_start(self):
+        TimerEngine(user=self.user).start_session(task='First')
+
+        response = self.post({'op': 'stop'}, {'op': 'start', 'task': 'Second'})
+
+        assert response.status_code == status.HTTP_200_OK
+        results = response.data['results']
+        assert [result['op'] for result in results] == ['stop', 'start']
+        assert results[0]['session']['status'] == 'stopped'
+        assert results[1]['session']['task'] == 'Second'
+
+    def test_update_then_pause(self):
+        self.post({'op': 'start', 'task': 'Task'})
+
+        response = self.post({'op': 'update-duration', 'duration': 300}, {'op': 'pause'})
+
+        assert response.data['results'][1]['session']['status'] == 'paused'
+        assert response.data['results'][1]['session']['duration'] >= 300
+
+    def test_engine_error_applies_nothing(self):
+        response = self.post({'op': 'start', 'task': 'Task'}, {'op': 'resume'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['index'] == 1
+        assert response.data['op'] == 'resume'
+        assert not TimerSession.objects.exists()
+
+    @pytest.mark.parametrize('operations, index', [
+        ([{'op': 'start'}], 0),
+        ([{'op': 'pause'}, {'op': 'launch'}], 1),
+        ([{'op': 'update-duration', 'duration': 'soon'}], 0),
+        ([{'op': 'update-duration'}], 0),
+        (['pause'], 0),
+    ])
+    def test_invalid_operations(self, operations, index):
+        response = self.post(*operations)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['index'] == index
+
+    def test_empty_and_oversized_batches(self):
+        assert self.client.post(self.url, {'operations': []}, format='json').status_code == 400
+        assert self.post(*[{'op': 'pause'}] * 21).status_code == status.HTTP_400_BAD_REQUEST
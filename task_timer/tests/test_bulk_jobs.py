@@ -0,0 +1,260 @@
+"""
+Tests for chunked background bulk actions
+"""
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from task_timer.models import BulkSessionJob, DailyTimerStats, TimerSession
+from task_timer.services import TimerEngine, bulk_jobs, rollup
+
+
+def create_finished(user, count, status='stopped'):
+    now = timezone.now()
+    return TimerSession.objects.bulk_create([
+        TimerSession(task=f'Task {index}', created_by=user, status=status,
+                     start_time=now, end_time=now, duration=60)
+        for index in range(count)
+    ])
+
+
+@pytest.mark.django_db
+class TestRunJob:
+    """Tests for bulk_jobs.run_job()"""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+
+    def run(self, queryset, action='complete', batch_size=1000, progress=None):
+        bulk_jobs.create_job({'pks': list(queryset.values_list('pk', flat=True))}, action)
+        return bulk_jobs.run_job(bulk_jobs.claim_job(), batch_size=batch_size, progress=progress)
+
+    def test_finishes_active_sessions_like_the_engine(self):
+        session = TimerEngine(user=self.user).start_session(task='Running')
+        TimerSession.objects.filter(pk=session.pk).update(
+            duration=60,
+            last_resumed_at=timezone.now() - timedelta(minutes=10)
+        )
+
+        self.run(TimerSession.objects.all())
+
+        session.refresh_from_db()
+        assert session.status == 'completed'
+        assert session.end_time is not None
+        assert session.last_resumed_at is None
+        assert 660 <= session.duration <= 661
+
+    def test_folds_open_pause(self):
+        engine = TimerEngine(user=self.user)
+        session = engine.start_session(task='Paused')
+        engine.pause_session()
+        TimerSession.objects.filter(pk=session.pk).update(paused_at=timezone.now() - timedelta(minutes=5))
+
+        self.run(TimerSession.objects.all(), action='stop')
+
+        session.refresh_from_db()
+        assert session.status == 'stopped'
+        assert session.paused_at is None
+        assert 300 <= session.pause_duration <= 301
+
+    def test_finished_sessions_only_change_status(self):
+        session, = create_finished(self.user, 1)
+        end_time = session.end_time
+
+        job = self.run(TimerSession.objects.all())
+
+        session.refresh_from_db()
+        assert session.status == 'completed'
+        assert session.end_time == end_time
+        assert session.duration == 60
+        assert job.updated == 1
+
+    def test_processes_primary_key_ranges(self):
+        sessions = create_finished(self.user, 5)
+        reports = []
+
+        job = self.run(
+            TimerSession.objects.filter(task__in=['Task 0', 'Task 1', 'Task 3', 'Task 4']),
+            batch_size=2,
+            progress=lambda job: reports.append((job.processed, job.get_progress()))
+        )
+
+        assert reports == [(2, 50), (4, 100)]
+        assert job.status == 'done'
+        assert job.total == 4
+        assert job.updated == 4
+        assert job.last_pk == max(session.pk for session in sessions)
+        assert TimerSession.objects.get(task='Task 2').status == 'stopped'
+        assert TimerSession.objects.filter(status='completed').count() == 4
+
+    def test_refreshes_rollup(self):
+        create_finished(self.user, 3)
+        rollup.rebuild_daily_stats()
+        assert DailyTimerStats.objects.get(user=self.user).completed_sessions == 0
+
+        self.run(TimerSession.objects.all())
+
+        assert DailyTimerStats.objects.get(user=self.user).completed_sessions == 3
+
+    def test_resumes_after_last_pk(self):
+        sessions = create_finished(self.user, 4)
+        job = bulk_jobs.create_job({'filters': {}}, 'complete')
+        BulkSessionJob.objects.filter(pk=job.pk).update(status='failed', last_pk=sessions[1].pk, total=4, processed=2)
+
+        job = bulk_jobs.run_job(bulk_jobs.claim_job(job.pk))
+
+        assert job.processed == 4
+        assert job.updated == 2
+        assert TimerSession.objects.filter(status='stopped').count() == 2
+
+    def test_failure_is_recorded(self, monkeypatch):
+        create_finished(self.user, 2)
+        job = bulk_jobs.create_job({'filters': {}}, 'complete')
+
+        def fail(queryset, status):
+            raise RuntimeError('disk full')
+
+        monkeypatch.setattr(bulk_jobs, 'finish_sessions', fail)
+
+        with pytest.raises(RuntimeError):
+            bulk_jobs.run_job(bulk_jobs.claim_job())
+
+        job.refresh_from_db()
+        assert job.status == 'failed'
+        assert job.error == 'disk full'
+        assert bulk_jobs.claim_job() is None
+        assert bulk_jobs.claim_job(job.pk) == job
+
+    def test_unknown_action(self):
+        with pytest.raises(ValueError):
+            bulk_jobs.create_job({'filters': {}}, 'delete')
+
+    @pytest.mark.parametrize('selection', [
+        {'filters': {'notes__contains': 'secret'}},
+        {'filters': {'start_time__gte': 'yesterday'}},
+        {'pks': '1,2'},
+        {'pks': [1], 'filters': {}},
+        {},
+    ])
+    def test_invalid_selection(self, selection):
+        with pytest.raises(ValueError):
+            bulk_jobs.create_job(selection, 'complete')
+
+    def test_unreadable_selection_fails_the_job(self):
+        create_finished(self.user, 1)
+        job = bulk_jobs.create_job({'filters': {}}, 'complete')
+        BulkSessionJob.objects.filter(pk=job.pk).update(selection={})
+
+        with pytest.raises(ValueError):
+            bulk_jobs.run_job(bulk_jobs.claim_job())
+
+        job.refresh_from_db()
+        assert job.status == 'failed'
+        assert TimerSession.objects.get().status == 'stopped'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_run_job_invalidates_stats_cache(settings):
+    settings.TASK_TIMER_CACHE_STATS = True
+    user = User.objects.create_user(username='testuser', password='testpass')
+    engine = TimerEngine(user=user)
+    create_finished(user, 2)
+    assert engine.get_dashboard_stats()['today']['completed_sessions'] == 0
+
+    bulk_jobs.create_job({'filters': {}}, 'complete')
+    bulk_jobs.run_job(bulk_jobs.claim_job())
+
+    assert engine.get_dashboard_stats()['today']['completed_sessions'] == 2
+
+
+@pytest.mark.django_db
+class TestAdminQueuesJobs:
+    """Tests for the TimerSession admin actions"""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.url = reverse('admin:task_timer_timersession_changelist')
+
+    def test_action_queues_job_without_updating(self, admin_client):
+        sessions = create_finished(self.user, 3)
+
+        response = admin_client.post(self.url, {
+            'action': 'mark_as_completed',
+            '_selected_action': [sessions[0].pk, sessions[2].pk],
+        }, follow=True)
+
+        job = BulkSessionJob.objects.get()
+        assert 'Queued job #' in response.content.decode()
+        assert job.action == 'complete'
+        assert job.status == 'pending'
+        assert job.requested_by.is_superuser
+        assert not TimerSession.objects.filter(status='completed').exists()
+        assert job.selection == {'pks': [sessions[0].pk, sessions[2].pk]}
+        assert set(bulk_jobs.job_queryset(job)) == {sessions[0], sessions[2]}
+
+    def test_select_across_keeps_filters(self, admin_client):
+        create_finished(self.user, 2, status='stopped')
+        create_finished(self.user, 1, status='completed')
+
+        admin_client.post(self.url + '?status__exact=stopped', {
+            'action': 'mark_as_completed',
+            'select_across': '1',
+            '_selected_action': [TimerSession.objects.filter(status='stopped').first().pk],
+        })
+
+        job = BulkSessionJob.objects.get()
+        assert job.selection == {'filters': {'status__exact': 'stopped'}}
+        assert bulk_jobs.job_queryset(job).count() == 2
+
+    def test_select_across_keeps_user_filter_and_search(self, admin_client):
+        other = User.objects.create_user(username='other', password='testpass')
+        create_finished(self.user, 2)
+        create_finished(other, 2)
+        first = TimerSession.objects.filter(created_by=self.user).first()
+
+        admin_client.post(self.url + '?user=testuser&q=Task+1&o=1&p=0&start_time__gte=2000-01-01+00%3A00%3A00%2B00%3A00', {
+            'action': 'mark_as_stopped',
+            'select_across': '1',
+            '_selected_action': [first.pk],
+        })
+
+        job = BulkSessionJob.objects.get()
+        assert job.selection == {
+            'filters': {'user': 'testuser', 'q': 'Task 1', 'start_time__gte': '2000-01-01 00:00:00+00:00'}
+        }
+        assert list(bulk_jobs.job_queryset(job).values_list('created_by__username', 'task')) == [
+            ('testuser', 'Task 1')
+        ]
+
+    def test_job_changelist(self, admin_client):
+        bulk_jobs.create_job({'filters': {}}, 'stop')
+
+        response = admin_client.get(reverse('admin:task_timer_bulksessionjob_changelist'))
+
+        assert response.status_code == 200
+        assert 'Mark as stopped' in response.content.decode()
+
+
+@pytest.mark.django_db
+class TestRunSessionJobsCommand:
+    """Tests for the run_session_jobs management command"""
+
+    def test_runs_pending_jobs(self):
+        user = User.objects.create_user(username='testuser', password='testpass')
+        create_finished(user, 3)
+        bulk_jobs.create_job({'filters': {}}, 'complete')
+        out = StringIO()
+
+        call_command('run_session_jobs', batch_size=2, stdout=out)
+
+        assert '2/3 (66%)' in out.getvalue()
+        assert 'done, 3 sessions updated' in out.getvalue()
+        assert BulkSessionJob.objects.get().status == 'done'
+
+    def test_unknown_job(self):
+        with pytest.raises(Exception, match='No unfinished job #99'):
+            call_command('run_session_jobs', job_id=99)
@@ -0,0 +1,152 @@
+"""
+Tests for ETag / conditional GET support
+"""
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils.http import parse_http_date
+from rest_framework import status
+from rest_framework.test import APIClient
+from task_timer.models import TimerSession
+from task_timer.services import TimerEngine
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    """Tests for ETag, Last-Modified and Cache-Control headers"""
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client.force_authenticate(user=self.user)
+        self.engine = TimerEngine(user=self.user)
+
+    def revalidate(self, url, response, **params):
+        return self.client.get(url, params, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_paused_active_session(self):
+        url = reverse('task_timer:timer-active')
+        self.engine.start_session(task='Test task')
+        self.engine.pause_session()
+
+        first = self.client.get(url)
+        assert 'ETag' in first
+        assert 'Last-Modified' in first
+
+        again = self.revalidate(url, first)
+        assert again.status_code == status.HTTP_304_NOT_MODIFIED
+        assert again.content == b''
+        assert again['ETag'] == first['ETag']
+
+        self.engine.resume_session()
+        self.engine.pause_session()
+        assert self.revalidate(url, first).status_code == status.HTTP_200_OK
+
+    def test_running_session_is_not_validated(self):
+        url = reverse('task_timer:timer-active')
+        self.engine.start_session(task='Test task')
+
+        response = self.client.get(url)
+
+        assert 'ETag' not in response
+        assert 'no-cache' in response['Cache-Control']
+
+    def test_stats(self):
+        url = reverse('task_timer:timer-stats')
+
+        first = self.client.get(url)
+        assert self.revalidate(url, first).status_code == status.HTTP_304_NOT_MODIFIED
+
+        self.engine.start_session(task='Test task')
+        self.engine.complete_session()
+
+        changed = self.revalidate(url, first)
+        assert changed.status_code == status.HTTP_200_OK
+        assert changed['ETag'] != first['ETag']
+
+    def test_settings(self):
+        url = reverse('task_timer:settings-detail')
+
+        first = self.client.get(url)
+        assert self.revalidate(url, first).status_code == status.HTTP_304_NOT_MODIFIED
+
+        self.client.put(url, {
+            'work_duration': 50,
+            'short_break_duration': 5,
+            'long_break_duration': 15,
+            'auto_start_breaks': False
+        }, format='json')
+
+        assert self.revalidate(url, first).data['work_duration'] == 50
+
+    def test_finished_session_is_cacheable(self):
+        self.engine.start_session(task='Test task')
+        session = self.engine.complete_session()
+        url = reverse('task_timer:session-detail', args=[session.pk])
+
+        first = self.client.get(url)
+
+        assert 'max-age=31536000' in first['Cache-Control']
+        assert 'private' in first['Cache-Control']
+        assert self.revalidate(url, first).status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_if_modified_since_is_not_trusted(self):
+        """A write in the same second as the client's copy must not be hidden"""
+        url = reverse('task_timer:timer-active')
+        self.engine.start_session(task='Test task')
+        self.engine.pause_session()
+        first = self.client.get(url)
+
+        self.engine.resume_session()
+        self.engine.pause_session()
+        # Same second as the copy the client holds
+        same_second = datetime.fromtimestamp(parse_http_date(first['Last-Modified']), tz=dt_timezone.utc)
+        TimerSession.objects.update(updated_at=same_second)
+        since = self.client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+
+        assert since['Last-Modified'] == first['Last-Modified']
+        assert since.status_code == status.HTTP_200_OK
+
+    def test_sparse_detail_has_own_etag(self):
+        self.engine.start_session(task='Test task')
+        session = self.engine.stop_session()
+        url = reverse('task_timer:session-detail', args=[session.pk])
+
+        full = self.client.get(url)
+        sparse = self.client.get(url, {'fields': 'id'}, HTTP_IF_NONE_MATCH=full['ETag'])
+
+        assert sparse.status_code == status.HTTP_200_OK
+        assert sparse.data == {'id': session.pk}
+
+    def test_list_not_modified_skips_serialization(self):
+        url = reverse('task_timer:session-list')
+        TimerSession.objects.create(task='Done', created_by=self.user, status='completed')
+
+        first = self.client.get(url)
+
+        with mock.patch('task_timer.views.serialize_session_values') as serialize:
+            again = self.revalidate(url, first)
+
+        assert again.status_code == status.HTTP_304_NOT_MODIFIED
+        serialize.assert_not_called()
+
+    def test_list_changes_with_sessions(self):
+        url = reverse('task_timer:session-list')
+        TimerSession.objects.create(task='Done', created_by=self.user, status='completed')
+        first = self.client.get(url)
+
+        TimerSession.objects.create(task='Another', created_by=self.user, status='stopped')
+
+        assert self.revalidate(url, first).status_code == status.HTTP_200_OK
+
+    def test_transitions_touch_updated_at(self):
+        session = self.engine.start_session(task='Test task')
+
+        paused = self.engine.pause_session()
+
+        assert paused.updated_at > session.updated_at
+        session.refresh_from_db()
+        assert session.updated_at == paused.updated_at
@@ -0,0 +1,237 @@
+"""
+Tests for pushed timer events (SSE and WebSocket)
+"""
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.urls import reverse
+from task_timer.services import TimerEngine, events
+from task_timer.services.timer_engine import BatchError
+
+
+def parse_sse(content):
+    """Split an SSE body into (event, data, id) tuples, skipping comments"""
+    messages = []
+    for block in content.decode().split('\n\n'):
+        fields = dict(
+            line.split(': ', 1) for line in block.splitlines() if line and not line.startswith(':')
+        )
+        if 'event' in fields:
+            messages.append((fields['event'], json.loads(fields['data']), fields.get('id')))
+    return messages
+
+
+@pytest.fixture
+def push_enabled(settings):
+    settings.TASK_TIMER_PUSH_EVENTS = True
+    settings.TASK_TIMER_PUSH_EVENTS_STREAM_TIMEOUT = 0
+    settings.TASK_TIMER_PUSH_EVENTS_POLL_INTERVAL = 0
+
+
+class TestEventLog:
+    """Tests for the cache-backed event log"""
+
+    def test_read_events_after_id(self):
+        first = events.send_event(1, 'session', {'status': 'running'})
+        second = events.send_event(1, 'stats', {'today': {}})
+        events.send_event(2, 'session', {'status': 'paused'})
+
+        assert [event['id'] for event in events.read_events(1, 0)] == [first, second]
+        assert events.read_events(1, first) == [{'id': second, 'event': 'stats', 'data': {'today': {}}}]
+        assert events.read_events(1, second) == []
+        assert events.last_event_id(1) == second
+
+    def test_ids_survive_counter_eviction(self):
+        old_id = events.send_event(1, 'session', {})
+
+        events._cache().delete(events._last_id_key(1))
+
+        assert events.send_event(1, 'session', {}) > old_id
+
+    def test_format_sse(self):
+        assert events.format_sse('stats', {'a': 1}, event_id=5) == 'id: 5\nevent: stats\ndata: {"a": 1}\n\n'
+
+
+# Events are published on commit, so these tests need real transactions
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures('push_enabled')
+class TestEnginePublishes:
+    """Tests for events published by TimerEngine"""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.engine = TimerEngine(user=self.user)
+
+    def test_transitions_publish_session_and_stats(self):
+        self.engine.start_session(task='Test task')
+        self.engine.complete_session()
+
+        published = [(event['event'], event['data']) for event in events.read_events(self.user.pk, 0)]
+
+        assert [name for name, data in published] == ['session', 'stats', 'session', 'stats']
+        assert published[0][1]['status'] == 'running'
+        assert published[2][1]['status'] == 'completed'
+        assert published[3][1]['today']['completed_sessions'] == 1
+
+    def test_failed_batch_publishes_nothing(self):
+        with pytest.raises(BatchError):
+            self.engine.run_batch([('start', {'task': 'Task'}), ('resume', {})])
+
+        assert events.read_events(self.user.pk, 0) == []
+
+    def test_disabled_by_default(self, settings):
+        settings.TASK_TIMER_PUSH_EVENTS = False
+
+        self.engine.start_session(task='Test task')
+
+        assert events.last_event_id(self.user.pk) == 0
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures('push_enabled')
+class TestEventStreamView:
+    """Tests for GET /api/timer/events/"""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.engine = TimerEngine(user=self.user)
+        self.url = reverse('task_timer:timer-events')
+
+    def test_new_connection_gets_snapshot(self, client):
+        self.engine.start_session(task='Test task')
+        client.force_login(self.user)
+
+        response = client.get(self.url)
+
+        assert response['Content-Type'] == 'text/event-stream'
+        assert response['Cache-Control'] == 'no-cache'
+        messages = parse_sse(b''.join(response.streaming_content))
+        assert [event for event, data, event_id in messages] == ['session', 'stats']
+        assert messages[0][1]['task'] == 'Test task'
+        assert messages[1][1]['today']['total_sessions'] == 1
+
+    def test_reconnect_replays_missed_events(self, client):
+        client.force_login(self.user)
+        self.engine.start_session(task='Test task')
+        seen = events.last_event_id(self.user.pk)
+        self.engine.pause_session()
+
+        response = client.get(self.url, HTTP_LAST_EVENT_ID=str(seen))
+
+        messages = parse_sse(b''.join(response.streaming_content))
+        assert [event for event, data, event_id in messages] == ['session', 'stats']
+        assert messages[0][1]['status'] == 'paused'
+        assert int(messages[-1][2]) == events.last_event_id(self.user.pk)
+
+    def test_requires_login(self, client):
+        assert client.get(self.url).status_code == 403
+
+    def test_disabled(self, client, settings):
+        settings.TASK_TIMER_PUSH_EVENTS = False
+        client.force_login(self.user)
+
+        assert client.get(self.url).status_code == 404
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures('push_enabled')
+class TestAsyncEventStreamView:
+    """Tests for the async GET /api/timer/events/ served through ASGI"""
+
+    @pytest.fixture(autouse=True)
+    def async_urls(self, settings):
+        settings.ROOT_URLCONF = 'task_timer.async_urls'
+        settings.TASK_TIMER_PUSH_EVENTS_STREAM_TIMEOUT = 1
+        settings.TASK_TIMER_PUSH_EVENTS_POLL_INTERVAL = 0.05
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.engine = TimerEngine(user=self.user)
+
+    def test_messages_are_sent_as_they_are_produced(self, client, asgi_get):
+        self.engine.start_session(task='Test task')
+        client.force_login(self.user)
+
+        def push_after_snapshot(body):
+            # Only reaches the client if the snapshot was sent before the
+            # stream ended, i.e. the response is not buffered
+            if b'event: stats' in body:
+                events.send_event(self.user.pk, 'session', {'task': 'Pushed'})
+
+        status_code, headers, bodies, warnings = asgi_get('/api/timer/events/', on_body=push_after_snapshot)
+
+        assert status_code == 200
+        assert headers['content-type'] == 'text/event-stream'
+        messages = parse_sse(b''.join(bodies))
+        assert [event for event, data, event_id in messages] == ['session', 'stats', 'session']
+        assert messages[0][1]['task'] == 'Test task'
+        assert messages[2][1] == {'task': 'Pushed'}
+        assert not [warning for warning in warnings if 'synchronous iterators' in warning]
+
+    def test_reconnect_replays_missed_events(self, client, asgi_get):
+        client.force_login(self.user)
+        self.engine.start_session(task='Test task')
+        seen = events.last_event_id(self.user.pk)
+        self.engine.pause_session()
+
+        status_code, headers, bodies, warnings = asgi_get(
+            '/api/timer/events/', headers=[('Last-Event-ID', str(seen))]
+        )
+
+        messages = parse_sse(b''.join(bodies))
+        assert [event for event, data, event_id in messages] == ['session', 'stats']
+        assert messages[0][1]['status'] == 'paused'
+
+    def test_requires_login(self, asgi_get):
+        assert asgi_get('/api/timer/events/')[0] == 403
+
+    def test_disabled(self, client, settings, asgi_get):
+        settings.TASK_TIMER_PUSH_EVENTS = False
+        client.force_login(self.user)
+
+        assert asgi_get('/api/timer/events/')[0] == 404
+
+
+@pytest.mark.django_db
+def test_dashboard_subscribes_only_when_enabled(client, settings):
+    user = User.objects.create_user(username='testuser', password='testpass')
+    client.force_login(user)
+
+    assert 'data-push-events="false"' in client.get(reverse('task_timer:dashboard')).content.decode()
+
+    settings.TASK_TIMER_PUSH_EVENTS = True
+    assert 'data-push-events="true"' in client.get(reverse('task_timer:dashboard')).content.decode()
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures('push_enabled')
+def test_websocket_consumer_receives_events(settings):
+    """Test the Channels consumer with an in-memory channel layer"""
+    pytest.importorskip('channels')
+    from channels.db import database_sync_to_async
+    from channels.testing import WebsocketCommunicator
+    from task_timer.consumers import TimerEventsConsumer
+
+    settings.CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+    user = User.objects.create_user(username='testuser', password='testpass')
+
+    async def run():
+        communicator = WebsocketCommunicator(TimerEventsConsumer.as_asgi(), '/ws/timer/events/')
+        communicator.scope['user'] = user
+        connected, _ = await communicator.connect()
+        assert connected
+
+        await database_sync_to_async(TimerEngine(user=user).start_session)(task='Test task')
+
+        session = await communicator.receive_json_from()
+        stats = await communicator.receive_json_from()
+        await communicator.disconnect()
+        return session, stats
+
+    session, stats = async_to_sync(run)()
+
+    assert session['event'] == 'session'
+    assert session['data']['status'] == 'running'
+    assert stats['event'] == 'stats'
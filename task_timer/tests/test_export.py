@@ -0,0 +1,184 @@
+"""
+Tests for streaming session export
+"""
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timezone as dt_timezone
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from task_timer.models import TimerSession
+from task_timer.serializers import TimerSessionSerializer
+from task_timer.services.export import encode_chunks, export_lines
+
+
+def make_session(user, day, status='completed', task='Task'):
+    return TimerSession.objects.create(
+        task=task,
+        created_by=user,
+        status=status,
+        duration=1500,
+        start_time=datetime(2024, 3, day, 9, tzinfo=dt_timezone.utc)
+    )
+
+
+@pytest.mark.django_db
+class TestExportLines:
+    """Tests for export_lines / encode_chunks"""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+
+    def test_ndjson_matches_serializer(self):
+        make_session(self.user, 1, task='Line "one", with comma')
+        sessions = TimerSession.objects.all()
+
+        lines = list(export_lines(sessions))
+
+        assert len(lines) == 1
+        assert json.loads(lines[0]) == dict(TimerSessionSerializer(sessions.get()).data)
+
+    def test_csv_has_header_and_rows(self):
+        make_session(self.user, 1, task='Comma, "quoted"')
+        make_session(self.user, 2)
+
+        data = ''.join(export_lines(TimerSession.objects.order_by('pk'), 'csv', fields=['id', 'task', 'end_time']))
+        rows = list(csv.reader(io.StringIO(data)))
+
+        assert rows[0] == ['id', 'task', 'end_time']
+        assert rows[1][1:] == ['Comma, "quoted"', '']
+        assert len(rows) == 3
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError):
+            export_lines(TimerSession.objects.all(), 'xml')
+
+    def test_rows_are_read_in_chunks(self, django_assert_max_num_queries):
+        for day in range(1, 8):
+            make_session(self.user, day)
+
+        # One query with iterator(); rows are fetched chunk_size at a time
+        with django_assert_max_num_queries(1):
+            chunks = list(encode_chunks(export_lines(TimerSession.objects.all(), chunk_size=2), chunk_size=2))
+
+        assert len(chunks) == 4
+        assert b''.join(chunks).count(b'\n') == 7
+
+    def test_gzip_stream(self):
+        make_session(self.user, 1)
+
+        data = b''.join(encode_chunks(export_lines(TimerSession.objects.all()), compress=True))
+
+        assert json.loads(gzip.decompress(data))['task'] == 'Task'
+
+
+@pytest.mark.django_db
+class TestExportAPI:
+    """Tests for GET /api/sessions/export/"""
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('task_timer:session-export')
+
+    def read(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_ndjson(self):
+        make_session(self.user, 1)
+        make_session(self.user, 2)
+        make_session(User.objects.create_user(username='other', password='pass'), 3)
+
+        response = self.client.get(self.url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        assert 'sessions.ndjson' in response['Content-Disposition']
+        assert len(self.read(response).splitlines()) == 2
+
+    def test_filters(self):
+        make_session(self.user, 1)
+        make_session(self.user, 2, status='stopped')
+        make_session(self.user, 3)
+
+        response = self.client.get(self.url, {'from': '2024-03-02', 'to': '2024-03-03', 'status': 'completed'})
+
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        assert [row['start_time'] for row in rows] == ['2024-03-03T09:00:00Z']
+
+    def test_csv_gzip_with_fields(self):
+        make_session(self.user, 1)
+
+        response = self.client.get(self.url, {'output': 'csv', 'gzip': '1', 'fields': 'task,duration'})
+
+        assert response['Content-Type'] == 'application/gzip'
+        assert 'sessions.csv.gz' in response['Content-Disposition']
+        assert gzip.decompress(self.read(response)).decode() == 'task,duration\r\nTask,1500\r\n'
+
+    def test_streams_under_asgi(self, client, asgi_get):
+        TimerSession.objects.bulk_create([
+            TimerSession(task=f'Task {index}', created_by=self.user, status='completed', duration=60)
+            for index in range(2500)
+        ])
+        client.force_login(self.user)
+
+        status_code, headers, bodies, warnings = asgi_get(self.url + '?fields=task')
+
+        assert status_code == status.HTTP_200_OK
+        assert headers['content-type'].startswith('application/x-ndjson')
+        # One body message per chunk of lines, not one buffered body
+        assert len(bodies) == 2
+        assert len(b''.join(bodies).splitlines()) == 2500
+        assert not [warning for warning in warnings if 'synchronous iterators' in warning]
+
+    @pytest.mark.parametrize('params', [
+        {'output': 'xml'},
+        {'from': 'March'},
+        {'status': 'done'},
+        {'fields': 'password'},
+    ])
+    def test_invalid_parameters(self, params):
+        response = self.client.get(self.url, params)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestExportCommand:
+    """Tests for the export_timer_sessions management command"""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        other = User.objects.create_user(username='other', password='pass')
+        make_session(self.user, 1)
+        make_session(other, 2)
+
+    def test_all_users_to_stdout(self):
+        out = io.StringIO()
+
+        call_command('export_timer_sessions', stdout=out)
+
+        assert len(out.getvalue().splitlines()) == 2
+
+    def test_single_user_csv_file(self, tmp_path):
+        path = tmp_path / 'sessions.csv.gz'
+
+        call_command('export_timer_sessions', '--user', 'testuser', '--format', 'csv', '--gzip',
+                     '--fields', 'task,status', '--output', str(path))
+
+        assert gzip.decompress(path.read_bytes()).decode() == 'task,status\r\nTask,completed\r\n'
+
+    def test_errors(self):
+        with pytest.raises(CommandError, match='Unknown username'):
+            call_command('export_timer_sessions', '--user', 'nobody')
+        with pytest.raises(CommandError, match='--gzip needs --output'):
+            call_command('export_timer_sessions', '--gzip')
+        with pytest.raises(CommandError, match='Unknown field'):
+            call_command('export_timer_sessions', '--fields', 'secret')
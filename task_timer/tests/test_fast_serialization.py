@@ -0,0 +1,71 @@
+"""
+Tests for the .values()-based session listing
+"""
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from task_timer.models import TimerSession
+from task_timer.serializers import TimerSessionSerializer, serialize_session_values
+
+
+@pytest.mark.django_db
+class TestSerializeSessionValues:
+    """Tests that serialize_session_values matches TimerSessionSerializer"""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        now = timezone.now()
+        TimerSession.objects.create(
+            task='Finished', notes='Some notes', created_by=self.user, status='completed',
+            duration=3725, pause_duration=60, end_time=now
+        )
+        TimerSession.objects.create(
+            task='Paused', created_by=self.user, status='paused', duration=90, paused_at=now
+        )
+        other = User.objects.create_user(username='other', password='pass')
+        TimerSession.objects.create(
+            task='Running', created_by=other, status='running', duration=30,
+            last_resumed_at=now - timedelta(minutes=10)
+        )
+        self.now = now
+
+    def assert_same_output(self, fields=None):
+        sessions = TimerSession.objects.order_by('id')
+        columns = TimerSessionSerializer.only_fields(fields or TimerSessionSerializer.Meta.fields)
+
+        with mock.patch('django.utils.timezone.now', return_value=self.now):
+            expected = TimerSessionSerializer(sessions, many=True, fields=fields).data
+            actual = serialize_session_values(sessions.values(*columns), fields)
+
+        assert actual == [dict(row) for row in expected]
+
+    def test_full_representation(self):
+        self.assert_same_output()
+
+    def test_sparse_representation(self):
+        self.assert_same_output(['id', 'end_time', 'elapsed_seconds', 'duration_formatted'])
+
+
+@pytest.mark.django_db
+class TestFastSessionList:
+    """Tests for GET /api/sessions/ through the values() path"""
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client.force_authenticate(user=self.user)
+
+    def test_list_matches_detail(self):
+        session = TimerSession.objects.create(
+            task='Task', created_by=self.user, status='completed', duration=1500
+        )
+
+        listed = self.client.get(reverse('task_timer:session-list')).data['results'][0]
+        detail = self.client.get(reverse('task_timer:session-detail', args=[session.pk])).data
+
+        assert listed == detail
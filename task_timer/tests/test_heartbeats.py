@@ -0,0 +1,177 @@
+"""
+Tests for the write-behind heartbeat buffer
+"""
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import transaction
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from task_timer.models import TimerSession
+from task_timer.services import TimerEngine
+from task_timer.services.heartbeats import flush_heartbeats, pending_heartbeat
+
+
+@pytest.mark.django_db
+class TestHeartbeatBuffer:
+    """Tests for buffered update-duration heartbeats"""
+
+    @pytest.fixture(autouse=True)
+    def write_behind(self, settings):
+        settings.TASK_TIMER_HEARTBEAT_WRITE_BEHIND = True
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.engine = TimerEngine(user=self.user)
+
+    def test_heartbeat_does_not_write(self):
+        """Test that a buffered heartbeat leaves the row untouched"""
+        session = self.engine.start_session(task='Test task')
+
+        updated = self.engine.update_session_duration(600)
+
+        assert updated.duration == 600
+        session.refresh_from_db()
+        assert session.duration == 0
+
+    def test_flush_writes_buffered_duration(self):
+        """Test that flushing bulk-writes the latest heartbeat"""
+        session = self.engine.start_session(task='Test task')
+        self.engine.update_session_duration(300)
+        self.engine.update_session_duration(600)
+
+        assert flush_heartbeats() == 1
+
+        session.refresh_from_db()
+        assert session.duration == 600
+
+        # Already applied entries are skipped on the next flush
+        assert flush_heartbeats() == 0
+
+    def test_stop_applies_pending_heartbeat(self):
+        """Test that stopping picks up the buffered duration"""
+        self.engine.start_session(task='Test task')
+        self.engine.update_session_duration(900)
+
+        stopped = self.engine.stop_session()
+
+        assert 900 <= stopped.duration <= 901
+        stopped.refresh_from_db()
+        assert 900 <= stopped.duration <= 901
+
+    def test_heartbeat_reads_session_from_cache(
+        self, django_assert_num_queries, django_capture_on_commit_callbacks
+    ):
+        """Test that buffered heartbeats do not look up the session"""
+        with django_capture_on_commit_callbacks(execute=True):
+            self.engine.start_session(task='Test task')
+
+        with django_assert_num_queries(0):
+            self.engine.update_session_duration(600)
+
+    def test_rolled_back_stop_keeps_pending_heartbeat(self):
+        """Test that the buffered duration survives a failed stop"""
+        self.engine.start_session(task='Test task')
+        self.engine.update_session_duration(900)
+
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                self.engine.stop_session()
+                raise RuntimeError
+
+        assert pending_heartbeat(self.user.pk)['duration'] == 900
+
+    def test_committed_stop_clears_pending_heartbeat(self, django_capture_on_commit_callbacks):
+        """Test that the buffered duration is dropped once the stop commits"""
+        self.engine.start_session(task='Test task')
+        self.engine.update_session_duration(900)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            self.engine.stop_session()
+
+        assert pending_heartbeat(self.user.pk) is None
+
+    @pytest.mark.parametrize('duration', ['soon', -5, None])
+    def test_invalid_duration_is_not_buffered(self, duration):
+        """Test that only whole, non-negative durations are buffered"""
+        self.engine.start_session(task='Test task')
+
+        with pytest.raises(ValueError):
+            self.engine.update_session_duration(duration)
+
+        assert pending_heartbeat(self.user.pk) is None
+
+    def test_stale_heartbeat_ignored_after_resume(self):
+        """Test that a heartbeat from before a pause is not replayed"""
+        session = self.engine.start_session(task='Test task')
+        self.engine.update_session_duration(600)
+        self.engine.pause_session()
+        self.engine.resume_session()
+
+        assert flush_heartbeats() == 0
+        session.refresh_from_db()
+        assert session.duration == 600
+
+    def test_flush_command(self):
+        """Test the flush_timer_heartbeats management command"""
+        session = self.engine.start_session(task='Test task')
+        self.engine.update_session_duration(120)
+
+        call_command('flush_timer_heartbeats')
+
+        session.refresh_from_db()
+        assert session.duration == 120
+
+
+@pytest.mark.django_db
+class TestHeartbeatAPI:
+    """Tests for the lean heartbeat endpoint"""
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client.force_authenticate(user=self.user)
+
+    def test_heartbeat_returns_no_content(self):
+        """Test POST /api/timer/heartbeat/"""
+        session = TimerSession.objects.create(
+            task='Test task',
+            created_by=self.user,
+            status='running'
+        )
+
+        url = reverse('task_timer:timer-heartbeat')
+        response = self.client.post(url, {'duration': 300}, format='json')
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert not response.content
+        session.refresh_from_db()
+        assert session.duration == 300
+
+    def test_heartbeat_without_active_session(self):
+        """Test heartbeat when no session is active"""
+        url = reverse('task_timer:timer-heartbeat')
+        response = self.client.post(url, {'duration': 300}, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.parametrize('write_behind', [False, True])
+    @pytest.mark.parametrize('duration', ['soon', -5])
+    def test_update_duration_rejects_invalid(self, settings, write_behind, duration):
+        """Test PATCH /api/timer/update-duration/ with an invalid duration"""
+        settings.TASK_TIMER_HEARTBEAT_WRITE_BEHIND = write_behind
+        TimerSession.objects.create(task='Test task', created_by=self.user, status='running')
+
+        url = reverse('task_timer:timer-update-duration')
+        response = self.client.patch(url, {'duration': duration}, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert TimerSession.objects.get().duration == 0
+
+    def test_heartbeat_rejects_non_integer(self):
+        """Test heartbeat with an invalid duration"""
+        url = reverse('task_timer:timer-heartbeat')
+        response = self.client.post(url, {'duration': 'soon'}, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,199 @@
+"""
+Tests for bulk session import
+"""
+import gzip
+import io
+import json
+from datetime import date
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from task_timer.models import DailyTimerStats, TimerSession
+from task_timer.services import rollup
+from task_timer.services.export import export_lines
+from task_timer.services.session_import import clean_record, import_sessions, read_records
+
+
+def ndjson(*records):
+    return [json.dumps(record) + '\n' for record in records]
+
+
+VALID = {'task': 'Write report', 'start_time': '2024-03-01T09:00:00Z', 'duration': 1500}
+
+
+class TestCleanRecord:
+    """Tests for per-row validation"""
+
+    def test_valid_record(self):
+        values = clean_record(dict(VALID, notes='Draft', status='stopped', pause_duration='60'))
+
+        assert values['task'] == 'Write report'
+        assert values['status'] == 'stopped'
+        assert values['duration'] == 1500
+        assert values['pause_duration'] == 60
+        assert values['start_time'].isoformat() == '2024-03-01T09:00:00+00:00'
+
+    def test_duration_from_end_time(self):
+        values = clean_record({'task': 'T', 'start_time': '2024-03-01T09:00:00Z', 'end_time': '2024-03-01T09:25:00Z'})
+
+        assert values['duration'] == 1500
+
+    @pytest.mark.parametrize('record, message', [
+        ({'start_time': '2024-03-01T09:00:00Z', 'duration': 1}, 'task is required'),
+        ({'task': 'T', 'duration': 1}, 'start_time is required'),
+        ({'task': 'T', 'start_time': 'yesterday', 'duration': 1}, 'start_time is not a valid datetime'),
+        ({'task': 'T', 'start_time': '2024-03-01T09:00:00Z'}, 'duration or end_time is required'),
+        (dict(VALID, duration='-5'), 'duration must not be negative'),
+        (dict(VALID, duration='ten'), 'duration must be a whole number'),
+        (dict(VALID, status='running'), 'status must be one of'),
+        (dict(VALID, end_time='2024-03-01T08:00:00Z'), 'end_time is before start_time'),
+        (['not', 'an', 'object'], 'Expected an object'),
+    ])
+    def test_invalid_records(self, record, message):
+        with pytest.raises(ValueError, match=message):
+            clean_record(record)
+
+
+@pytest.mark.django_db
+class TestImportSessions:
+    """Tests for import_sessions"""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+
+    def test_bad_rows_are_reported_and_skipped(self):
+        lines = ndjson(VALID, {'task': ''}) + ['{oops\n'] + ndjson(dict(VALID, task='Second'))
+
+        result = import_sessions(self.user, read_records(lines))
+
+        assert result.created == 2
+        assert result.failed == 2
+        assert [error['line'] for error in result.errors] == [2, 3]
+        assert 'Invalid JSON' in result.errors[1]['error']
+        assert set(TimerSession.objects.values_list('task', flat=True)) == {'Write report', 'Second'}
+
+    def test_chunked_inserts_and_single_rollup_refresh(self, django_assert_max_num_queries):
+        lines = ndjson(*[dict(VALID, task=f'Task {i}') for i in range(10)])
+
+        # 3 chunks (savepoint + INSERT + release each), then one rollup
+        # refresh (savepoint, aggregate, delete, insert, release)
+        with django_assert_max_num_queries(14):
+            result = import_sessions(self.user, read_records(lines), batch_size=4)
+
+        assert result.created == 10
+        stats = DailyTimerStats.objects.get(user=self.user, date=date(2024, 3, 1))
+        assert stats.total_sessions == 10
+        assert stats.total_seconds == 15000
+        assert rollup.check_daily_stats() == []
+
+    def test_csv(self):
+        lines = [
+            'task,notes,start_time,duration,status\n',
+            'Write report,"Line one, two",2024-03-01T09:00:00Z,1500,completed\n',
+            'Bad,,2024-03-01T10:00:00Z,,\n',
+        ]
+
+        result = import_sessions(self.user, read_records(lines, 'csv'))
+
+        assert result.created == 1
+        assert result.errors == [{'line': 3, 'error': 'duration or end_time is required'}]
+        assert TimerSession.objects.get().notes == 'Line one, two'
+
+    def test_export_round_trip(self):
+        other = User.objects.create_user(username='other', password='pass')
+        import_sessions(other, read_records(ndjson(VALID, dict(VALID, status='stopped'))))
+
+        lines = list(export_lines(TimerSession.objects.filter(created_by=other)))
+        result = import_sessions(self.user, read_records(lines))
+
+        assert result.created == 2
+        assert result.failed == 0
+
+    def test_error_list_is_capped(self):
+        lines = ndjson(*[{'task': ''}] * 5)
+
+        result = import_sessions(self.user, read_records(lines), max_errors=2)
+
+        assert result.failed == 5
+        assert len(result.errors) == 2
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError):
+            read_records([], 'xml')
+
+
+@pytest.mark.django_db
+class TestImportAPI:
+    """Tests for POST /api/sessions/import/"""
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('task_timer:session-import')
+
+    def test_ndjson_body(self):
+        body = ''.join(ndjson(VALID, {'task': 'No start'}))
+
+        response = self.client.post(self.url, body, content_type='application/x-ndjson')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['created'] == 1
+        assert response.data['errors'] == [{'line': 2, 'error': 'start_time is required'}]
+        assert TimerSession.objects.get().created_by == self.user
+
+    def test_csv_body(self):
+        body = 'task,start_time,duration\nWrite report,2024-03-01T09:00:00Z,1500\n'
+
+        response = self.client.post(self.url, body, content_type='text/csv')
+
+        assert response.data['created'] == 1
+
+    def test_multipart_upload(self):
+        upload = SimpleUploadedFile('sessions.ndjson', ''.join(ndjson(VALID)).encode())
+
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+
+        assert response.data['created'] == 1
+
+    def test_unknown_format(self):
+        response = self.client.post(self.url + '?input=xml', '', content_type='text/plain')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestImportCommand:
+    """Tests for the import_timer_sessions management command"""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+
+    def test_import_gzip_file(self, tmp_path):
+        path = tmp_path / 'sessions.ndjson.gz'
+        path.write_bytes(gzip.compress(''.join(ndjson(VALID, {'task': ''})).encode()))
+        out, err = io.StringIO(), io.StringIO()
+
+        call_command('import_timer_sessions', str(path), '--user', 'testuser', stdout=out, stderr=err)
+
+        assert 'Imported 1 sessions' in out.getvalue()
+        assert 'line 2: task is required' in err.getvalue()
+
+    def test_csv_from_extension(self, tmp_path):
+        path = tmp_path / 'sessions.csv'
+        path.write_text('task,start_time,duration\nT,2024-03-01T09:00:00Z,60\n')
+
+        call_command('import_timer_sessions', str(path), '--user', 'testuser', stdout=io.StringIO())
+
+        assert TimerSession.objects.count() == 1
+
+    def test_errors(self, tmp_path):
+        with pytest.raises(CommandError, match='Unknown username'):
+            call_command('import_timer_sessions', 'x.ndjson', '--user', 'nobody')
+        with pytest.raises(CommandError, match='Could not read'):
+            call_command('import_timer_sessions', str(tmp_path / 'missing.ndjson'), '--user', 'testuser')
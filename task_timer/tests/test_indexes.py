@@ -0,0 +1,109 @@
+"""
+Tests for the TimerSession index set
+"""
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from task_timer.models import TimerSession
+from task_timer.services import TimerEngine
+from task_timer.services.timer_engine import ACTIVE_STATUSES
+
+sqlite_only = pytest.mark.skipif(
+    connection.vendor != 'sqlite',
+    reason='Checks SQLite query plans'
+)
+postgresql_only = pytest.mark.skipif(
+    connection.vendor != 'postgresql',
+    reason='Checks PostgreSQL query plans'
+)
+
+
+def session_indexes():
+    """Return {name: columns} for the indexes on the TimerSession table"""
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, TimerSession._meta.db_table)
+    return {
+        name: tuple(info['columns'])
+        for name, info in constraints.items()
+        if info['index'] and not info['primary_key']
+    }
+
+
+@pytest.mark.django_db
+class TestIndexSet:
+    """Tests for the indexes created by the migrations"""
+
+    def test_no_redundant_single_column_indexes(self):
+        indexes = session_indexes()
+
+        # Expression indexes are introspected as a single None column
+        single_column = [name for name, columns in indexes.items() if columns[0] and len(columns) == 1]
+        assert single_column == ['task_timer_one_active_session']
+        assert ('created_by_id', 'status') not in indexes.values()
+
+    def test_expected_indexes(self):
+        indexes = session_indexes()
+
+        assert indexes['task_timer_user_start_covering'][:2] == ('created_by_id', 'start_time')
+        assert indexes['task_timer_one_active_session'] == ('created_by_id',)
+        assert ('start_time', 'id') in indexes.values()
+        assert indexes['task_timer_status_id'] == ('status', 'id')
+
+
+@pytest.mark.django_db
+class TestQueries:
+    """Hot queries only need indexed columns"""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.engine = TimerEngine(user=self.user)
+        self.engine.start_session(task='Test task')
+        self.engine.complete_session()
+
+    def test_stats_read_only_covered_columns(self):
+        now = timezone.now()
+        table = TimerSession._meta.db_table
+
+        with CaptureQueriesContext(connection) as queries:
+            self.engine.get_stats({'week': (now - timedelta(days=7), now + timedelta(seconds=1))})
+            self.engine.get_stats_series(timezone.localdate() - timedelta(days=6), timezone.localdate())
+
+        for query in queries:
+            assert f'"{table}"."id"' not in query['sql']
+            assert 'pause_duration' not in query['sql']
+
+    @sqlite_only
+    def test_plans(self):
+        now = timezone.now()
+        sessions = TimerSession.objects.filter(created_by=self.user)
+
+        history = sessions.filter(start_time__gte=now - timedelta(days=30)).order_by('-start_time', '-id')
+        active = sessions.filter(status__in=ACTIVE_STATUSES)
+        changelist = TimerSession.objects.order_by('-start_time', '-id')[:100]
+        flush = TimerSession.objects.filter(status='running', pk__gt=0).order_by('pk')
+        # As reap_sessions() narrows its batches, one status at a time
+        reap = (
+            TimerSession.objects.filter(status__in=ACTIVE_STATUSES, last_seen__lt=now)
+            .filter(status='paused', pk__gt=0).order_by('pk')
+        )
+
+        assert 'task_timer_user_start_covering' in history.explain()
+        assert 'SEARCH' in active.explain()
+        assert 'task_timer__start_t_8104c8_idx' in changelist.explain()
+        assert 'task_timer_status_id' in flush.explain()
+        assert 'task_timer_status_id' in reap.explain()
+
+    @postgresql_only
+    def test_task_prefix_search_plan(self):
+        search = TimerSession.objects.filter(task__istartswith='test')
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            # The table is tiny; make the planner show what it could use
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = search.explain()
+
+        assert 'task_timer_task_upper_prefix' in plan
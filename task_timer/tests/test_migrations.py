@@ -0,0 +1,32 @@
+"""
+Tests for the data steps of the task_timer migrations
+"""
+from importlib import import_module
+
+import pytest
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.utils import timezone
+from task_timer.models import TimerSession
+
+
+@pytest.mark.django_db
+def test_0002_backfills_transition_timestamps():
+    migration = import_module('task_timer.migrations.0002_timersession_transition_timestamps')
+    user = User.objects.create_user(username='testuser', password='testpass')
+    other = User.objects.create_user(username='other', password='testpass')
+    running = TimerSession.objects.create(task='Running', created_by=user, status='running', duration=300)
+    paused = TimerSession.objects.create(task='Paused', created_by=other, status='paused', duration=300)
+    done = TimerSession.objects.create(task='Done', created_by=user, status='completed', duration=300)
+    TimerSession.objects.update(last_resumed_at=None, paused_at=None)
+
+    before = timezone.now()
+    migration.backfill_transition_timestamps(apps, None)
+
+    running.refresh_from_db()
+    paused.refresh_from_db()
+    done.refresh_from_db()
+    assert running.last_resumed_at >= before and running.paused_at is None
+    assert paused.paused_at >= before and paused.last_resumed_at is None
+    assert done.last_resumed_at is None and done.paused_at is None
+    assert 300 <= running.get_elapsed_seconds() <= 301
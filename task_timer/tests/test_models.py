@@ -4,6 +4,7 @@ Following TDD: Write tests first, then implement models
 """
 import pytest
 from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from datetime import timedelta
 from task_timer.models import TimerSession, TimerSettings
@@ -34,10 +35,10 @@ class TestTimerSession:
 
     def test_timer_session_status_choices(self):
         """Test that status field accepts valid choices"""
-        user = User.objects.create_user(username='testuser', password='testpass')
-
         valid_statuses = ['running', 'paused', 'completed', 'stopped']
         for status in valid_statuses:
+            # Separate users, since only one session per user may be active
+            user = User.objects.create_user(username=f'user-{status}', password='testpass')
             session = TimerSession.objects.create(
                 task='Test task',
                 created_by=user,
@@ -45,6 +46,24 @@ class TestTimerSession:
             )
             assert session.status == status
 
+    def test_one_active_session_per_user(self):
+        """Test that the database rejects a second active session"""
+        user = User.objects.create_user(username='testuser', password='testpass')
+        TimerSession.objects.create(task='First task', created_by=user, status='running')
+
+        with pytest.raises(IntegrityError):
+            with transaction.atomic():
+                TimerSession.objects.create(task='Second task', created_by=user, status='paused')
+
+    def test_finished_sessions_not_limited(self):
+        """Test that any number of finished sessions may sit beside an active one"""
+        user = User.objects.create_user(username='testuser', password='testpass')
+        TimerSession.objects.create(task='Running', created_by=user, status='running')
+        TimerSession.objects.create(task='Done', created_by=user, status='completed')
+        TimerSession.objects.create(task='Also done', created_by=user, status='stopped')
+
+        assert TimerSession.objects.filter(created_by=user).count() == 3
+
     def test_complete_session(self):
         """Test completing a timer session"""
         user = User.objects.create_user(username='testuser', password='testpass')
@@ -138,17 +157,43 @@ class TestTimerSession:
 
         assert session.get_duration_formatted() == "1h 1m"
 
+    def test_get_elapsed_seconds_running(self):
+        """Test that a running session counts time since last resume"""
+        user = User.objects.create_user(username='testuser', password='testpass')
+        now = timezone.now()
+        session = TimerSession.objects.create(
+            task='Test task',
+            created_by=user,
+            status='running',
+            duration=300,
+            last_resumed_at=now - timedelta(minutes=2)
+        )
+
+        assert session.get_elapsed_seconds(now=now) == 420
+
+    def test_get_elapsed_seconds_paused(self):
+        """Test that a paused session reports its stored duration"""
+        user = User.objects.create_user(username='testuser', password='testpass')
+        session = TimerSession.objects.create(
+            task='Test task',
+            created_by=user,
+            status='paused',
+            duration=300,
+            paused_at=timezone.now()
+        )
+
+        assert session.get_elapsed_seconds() == 300
+
 
 @pytest.mark.django_db
 class TestTimerSettings:
     """Tests for TimerSettings model"""
 
     def test_create_timer_settings(self):
-        """Test creating timer settings (auto-created by signal)"""
+        """Test creating timer settings"""
         user = User.objects.create_user(username='testuser', password='testpass')
 
-        # Settings should be auto-created by signal
-        settings = TimerSettings.objects.get(user=user)
+        settings = TimerSettings.objects.create(user=user)
 
         assert settings.user == user
         assert settings.work_duration == 25
@@ -160,8 +205,7 @@ class TestTimerSettings:
         """Test that default settings are applied"""
         user = User.objects.create_user(username='testuser', password='testpass')
 
-        # Settings auto-created by signal
-        settings = TimerSettings.objects.get(user=user)
+        settings = TimerSettings.objects.create(user=user)
 
         assert settings.work_duration == 25
         assert settings.short_break_duration == 5
@@ -172,8 +216,7 @@ class TestTimerSettings:
         """Test that each user has only one settings object"""
         user = User.objects.create_user(username='testuser', password='testpass')
 
-        # Settings auto-created by signal
-        settings1 = TimerSettings.objects.get(user=user)
+        settings1 = TimerSettings.objects.create(user=user)
 
         # Trying to create another should fail with unique constraint
         with pytest.raises(Exception):  # IntegrityError
@@ -183,8 +226,7 @@ class TestTimerSettings:
         """Test string representation of settings"""
         user = User.objects.create_user(username='testuser', password='testpass')
 
-        # Settings auto-created by signal
-        settings = TimerSettings.objects.get(user=user)
+        settings = TimerSettings.objects.create(user=user)
 
         expected = f"Settings for testuser"
         assert str(settings) == expected
@@ -193,8 +235,7 @@ class TestTimerSettings:
         """Test getting work duration in seconds"""
         user = User.objects.create_user(username='testuser', password='testpass')
 
-        # Settings auto-created by signal, modify them
-        settings = TimerSettings.objects.get(user=user)
+        settings = TimerSettings.objects.create(user=user)
         settings.work_duration = 25
         settings.save()
 
@@ -0,0 +1,169 @@
+"""
+Tests for keyset pagination of sessions
+"""
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from task_timer.models import TimerSession
+from task_timer.pagination import decode_cursor, encode_cursor, paginate_keyset
+
+
+def make_sessions(user, count, same_start=False):
+    now = timezone.now()
+    return [
+        TimerSession.objects.create(
+            task=f'Task {i}',
+            created_by=user,
+            status='completed',
+            start_time=now if same_start else now - timedelta(minutes=i)
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.mark.django_db
+class TestPaginateKeyset:
+    """Tests for paginate_keyset"""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.queryset = TimerSession.objects.filter(created_by=self.user)
+
+    def walk_forward(self, page_size):
+        seen = []
+        page = paginate_keyset(self.queryset, None, page_size)
+        seen.extend(page)
+        while page.has_next():
+            page = paginate_keyset(self.queryset, page.next_cursor, page_size)
+            seen.extend(page)
+        return seen, page
+
+    def test_pages_cover_sessions_newest_first(self):
+        sessions = make_sessions(self.user, 25)
+
+        seen, last_page = self.walk_forward(10)
+
+        assert [s.pk for s in seen] == [s.pk for s in sessions]
+        assert len(last_page) == 5
+        assert not last_page.has_next()
+
+    def test_ties_on_start_time_are_broken_by_id(self):
+        sessions = make_sessions(self.user, 7, same_start=True)
+
+        seen, last_page = self.walk_forward(3)
+
+        assert sorted(s.pk for s in seen) == sorted(s.pk for s in sessions)
+        assert len(seen) == 7
+
+    def test_previous_cursor_returns_to_earlier_page(self):
+        make_sessions(self.user, 25)
+        first = paginate_keyset(self.queryset, None, 10)
+        second = paginate_keyset(self.queryset, first.next_cursor, 10)
+
+        assert not first.has_previous()
+        back = paginate_keyset(self.queryset, second.previous_cursor, 10)
+
+        assert [s.pk for s in back] == [s.pk for s in first]
+        assert not back.has_previous()
+        assert back.has_next()
+
+    def test_deep_pages_are_one_query(self, django_assert_num_queries):
+        sessions = make_sessions(self.user, 30)
+
+        with django_assert_num_queries(1):
+            page = paginate_keyset(self.queryset, encode_cursor(sessions[24]), 10)
+
+        assert [s.pk for s in page] == [s.pk for s in sessions[25:]]
+
+    def test_cursor_round_trip(self):
+        session = make_sessions(self.user, 1)[0]
+
+        previous, start_time, pk = decode_cursor(encode_cursor(session, previous=True))
+
+        assert previous is True
+        assert start_time == session.start_time
+        assert pk == session.pk
+
+    @pytest.mark.parametrize('cursor', ['garbage', 'eHx5fHo=', '!!!'])
+    def test_invalid_cursor(self, cursor):
+        with pytest.raises(ValueError):
+            paginate_keyset(self.queryset, cursor)
+
+
+@pytest.mark.django_db
+class TestSessionListCursor:
+    """Tests for cursor pagination on GET /api/sessions/"""
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('task_timer:session-list')
+
+    def test_follow_links(self):
+        make_sessions(self.user, 45)
+
+        response = self.client.get(self.url, {'page_size': 20})
+        tasks = [row['task'] for row in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            tasks.extend(row['task'] for row in response.data['results'])
+
+        assert tasks == [f'Task {i}' for i in range(45)]
+        assert response.data['previous'] is not None
+
+    def test_page_size_is_capped(self):
+        make_sessions(self.user, 120)
+
+        response = self.client.get(self.url, {'page_size': 500})
+
+        assert len(response.data['results']) == 100
+
+    def test_invalid_cursor_is_404(self):
+        response = self.client.get(self.url, {'cursor': 'garbage'})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_no_count_query(self, django_assert_max_num_queries):
+        make_sessions(self.user, 25)
+
+        # Auth is forced, so only the page query remains
+        with django_assert_max_num_queries(1):
+            self.client.get(self.url)
+
+
+@pytest.mark.django_db
+class TestHistoryViewCursor:
+    """Tests for keyset pagination on the history page"""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+
+    def test_history_pages(self, client):
+        make_sessions(self.user, 25)
+        client.force_login(self.user)
+
+        response = client.get(reverse('task_timer:history'))
+        page = response.context['sessions']
+
+        assert response.status_code == 200
+        assert len(page) == 20
+        assert page.has_next()
+
+        response = client.get(reverse('task_timer:history'), {'cursor': page.next_cursor})
+
+        assert len(response.context['sessions']) == 5
+
+    def test_history_ignores_bad_cursor(self, client):
+        make_sessions(self.user, 3)
+        client.force_login(self.user)
+
+        response = client.get(reverse('task_timer:history'), {'cursor': 'garbage'})
+
+        assert response.status_code == 200
+        assert len(response.context['sessions']) == 3
@@ -0,0 +1,148 @@
+"""
+Tests for monthly partitioning of TimerSession
+"""
+from datetime import date, timedelta
+from importlib import import_module
+from types import SimpleNamespace
+
+import pytest
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+from django.utils import timezone
+from task_timer.models import TimerSession
+from task_timer.services import TimerEngine, partitions
+
+postgresql_only = pytest.mark.skipif(
+    connection.vendor != 'postgresql',
+    reason='Partitioning needs PostgreSQL'
+)
+
+
+class TestMonths:
+    """Tests for the month helpers"""
+
+    def test_add_months_crosses_years(self):
+        assert partitions.add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+        assert partitions.add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+    def test_partition_names_round_trip(self):
+        name = partitions.partition_name(date(2026, 3, 1))
+
+        assert name == 'task_timer_timersession_p2026_03'
+        assert partitions.partition_month(name) == date(2026, 3, 1)
+        assert partitions.partition_month(partitions.DEFAULT_PARTITION) is None
+
+    def test_bounds_follow_site_timezone(self, settings):
+        settings.TIME_ZONE = 'Europe/Berlin'
+
+        start, end = partitions.partition_bounds(date(2026, 7, 1))
+
+        assert start.isoformat() == '2026-07-01T00:00:00+02:00'
+        assert end.isoformat() == '2026-08-01T00:00:00+02:00'
+
+
+@pytest.mark.django_db
+class TestPlainTable:
+    """Other backends keep the plain table"""
+
+    @pytest.fixture(autouse=True)
+    def not_postgresql(self):
+        if connection.vendor == 'postgresql':
+            pytest.skip('Checks the non-PostgreSQL behaviour')
+
+    def test_not_partitioned(self):
+        assert not partitions.is_supported()
+        assert not partitions.is_partitioned()
+
+    def test_migration_leaves_table_alone(self, settings):
+        settings.TASK_TIMER_PARTITION_SESSIONS = True
+        migration = import_module('task_timer.migrations.0009_partition_timersession')
+
+        # Only the editor's connection is read
+        migration.partition_sessions(apps, SimpleNamespace(connection=connection))
+
+        assert not partitions.is_partitioned()
+
+    def test_commands_refuse(self):
+        with pytest.raises(CommandError):
+            call_command('create_session_partitions')
+        with pytest.raises(CommandError):
+            call_command('detach_session_partitions', '--keep-months', '12')
+
+
+def test_frozen_migration_module_is_not_a_migration():
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+
+    names = {name for app_label, name in loader.disk_migrations if app_label == 'task_timer'}
+    assert '0009_partition_timersession' in names
+    assert '_0009_partitioning' not in names
+
+
+@postgresql_only
+@pytest.mark.django_db
+def test_frozen_conversion(settings):
+    """Migration 0009's own copy converts the table, once"""
+    frozen = import_module('task_timer.migrations._0009_partitioning')
+    user = User.objects.create_user(username='testuser', password='testpass')
+    old = TimerSession.objects.create(
+        task='Old', created_by=user, status='completed', start_time=timezone.now() - timedelta(days=40)
+    )
+    was_partitioned = partitions.is_partitioned()
+
+    assert frozen.convert_table(connection) is not was_partitioned
+    assert frozen.convert_table(connection) is False
+    assert partitions.is_partitioned()
+    assert TimerSession.objects.get(pk=old.pk).task == 'Old'
+
+
+@postgresql_only
+@pytest.mark.django_db
+class TestPartitionedTable:
+    """Tests against a converted table, rolled back after each test"""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.old = TimerSession.objects.create(
+            task='Old', created_by=self.user, status='completed',
+            start_time=timezone.now() - timedelta(days=400)
+        )
+        partitions.convert_table(months_ahead=2)
+
+    def test_rows_and_ids_survive(self):
+        session = TimerEngine(user=self.user).start_session(task='New')
+
+        assert partitions.is_partitioned()
+        assert TimerSession.objects.get(pk=self.old.pk).task == 'Old'
+        assert session.pk > self.old.pk
+
+    def test_one_active_session_still_enforced(self):
+        engine = TimerEngine(user=self.user)
+        engine.start_session(task='First')
+
+        with pytest.raises(ValueError):
+            engine.start_session(task='Second')
+
+    def test_create_moves_rows_out_of_default(self):
+        far = partitions.add_months(partitions.current_month(), 6)
+        TimerSession.objects.create(
+            task='Future', created_by=self.user, status='completed',
+            start_time=partitions.partition_bounds(far)[0] + timedelta(days=1)
+        )
+
+        created = partitions.create_partitions(months_ahead=6)
+
+        assert partitions.partition_name(far) in created
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {partitions.DEFAULT_PARTITION}')
+            assert cursor.fetchone()[0] == 0
+        assert TimerSession.objects.filter(task='Future').exists()
+
+    def test_detach_old_months(self):
+        detached = partitions.detach_partitions(partitions.add_months(partitions.current_month(), -6), drop=True)
+
+        assert partitions.partition_name(partitions.month_start(self.old.start_time)) in detached
+        assert not TimerSession.objects.filter(pk=self.old.pk).exists()
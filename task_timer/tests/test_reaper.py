@@ -0,0 +1,272 @@
+"""
+Tests for liveness tracking and stopping abandoned sessions
+"""
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from task_timer.models import DailyTimerStats, TimerSession
+from task_timer.services import TimerEngine, reaper
+from task_timer.services.timer_engine import stop_abandoned_sessions
+
+
+def go_quiet(session, seen_ago, resumed_ago=None, paused_ago=None, duration=0):
+    """Backdate a session as if its client went away seen_ago seconds ago"""
+    now = timezone.now()
+    changes = {'last_seen': now - timedelta(seconds=seen_ago), 'duration': duration}
+    if resumed_ago is not None:
+        changes['last_resumed_at'] = now - timedelta(seconds=resumed_ago)
+    if paused_ago is not None:
+        changes['paused_at'] = now - timedelta(seconds=paused_ago)
+    TimerSession.objects.filter(pk=session.pk).update(**changes)
+
+
+@pytest.fixture
+def detecting(settings):
+    settings.TASK_TIMER_ABANDONED_SESSION_TIMEOUT = 3600
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('detecting')
+class TestLastSeen:
+    """Tests for recording last_seen"""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.engine = TimerEngine(user=self.user)
+
+    def test_start_and_transitions_record_it(self):
+        session = self.engine.start_session(task='Test task')
+        assert session.last_seen == session.start_time
+
+        go_quiet(session, 600)
+        paused = self.engine.pause_session()
+
+        assert timezone.now() - paused.last_seen < timedelta(seconds=5)
+
+    def test_touch_writes_at_most_once_per_interval(self, django_assert_num_queries):
+        session = self.engine.start_session(task='Test task')
+        go_quiet(session, 600)
+
+        self.engine.touch_session()
+        session.refresh_from_db()
+        first = session.last_seen
+        assert timezone.now() - first < timedelta(seconds=5)
+
+        # Within the interval: no row update, only the active session lookup
+        with django_assert_num_queries(2):
+            self.engine.touch_session()
+        session.refresh_from_db()
+        assert session.last_seen == first
+
+    def test_touch_without_session(self):
+        with pytest.raises(ValueError):
+            self.engine.touch_session()
+
+    def test_touch_is_free_when_detection_is_off(self, settings, django_assert_num_queries):
+        settings.TASK_TIMER_ABANDONED_SESSION_TIMEOUT = None
+        session = self.engine.start_session(task='Test task')
+        go_quiet(session, 600)
+
+        with django_assert_num_queries(0):
+            self.engine.touch_session()
+            async_to_sync(self.engine.atouch_session)()
+
+    def test_dashboard_renders_ping_interval(self, client, settings):
+        settings.TASK_TIMER_LAST_SEEN_INTERVAL = 120
+        client.force_login(self.user)
+
+        assert 'data-keepalive-interval="120"' in client.get(reverse('task_timer:dashboard')).content.decode()
+
+        settings.TASK_TIMER_ABANDONED_SESSION_TIMEOUT = None
+        assert 'data-keepalive-interval=""' in client.get(reverse('task_timer:dashboard')).content.decode()
+
+    def test_heartbeat_without_duration_is_a_ping(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        session = self.engine.start_session(task='Test task')
+        go_quiet(session, 600, resumed_ago=600, duration=0)
+
+        response = client.post(reverse('task_timer:timer-heartbeat'))
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        session.refresh_from_db()
+        assert timezone.now() - session.last_seen < timedelta(seconds=5)
+        assert session.duration == 0
+
+    def test_flushed_heartbeat_moves_last_seen(self, settings):
+        settings.TASK_TIMER_HEARTBEAT_WRITE_BEHIND = True
+        session = self.engine.start_session(task='Test task')
+        go_quiet(session, 600)
+
+        self.engine.update_session_duration(300)
+        reaper.heartbeats.flush_heartbeats()
+
+        session.refresh_from_db()
+        assert timezone.now() - session.last_seen < timedelta(seconds=5)
+
+
+@pytest.mark.django_db
+class TestStopAbandonedSessions:
+    """Tests for the single-UPDATE stop of abandoned sessions"""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.engine = TimerEngine(user=self.user)
+
+    def test_running_session_ends_at_last_seen(self):
+        session = self.engine.start_session(task='Test task')
+        go_quiet(session, 3600, resumed_ago=7200, duration=100)
+
+        assert stop_abandoned_sessions(TimerSession.objects.all()) == 1
+
+        session.refresh_from_db()
+        assert session.status == 'stopped'
+        assert session.end_time == session.last_seen
+        assert session.last_resumed_at is None
+        assert 3700 <= session.duration <= 3701
+
+    def test_paused_session_counts_pause_until_last_seen(self):
+        session = self.engine.start_session(task='Test task')
+        self.engine.pause_session()
+        go_quiet(session, 3600, paused_ago=5400, duration=100)
+
+        stop_abandoned_sessions(TimerSession.objects.all())
+
+        session.refresh_from_db()
+        assert session.duration == 100
+        assert 1800 <= session.pause_duration <= 1801
+        assert session.paused_at is None
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('detecting')
+class TestReapSessions:
+    """Tests for reaper.reap_sessions()"""
+
+    def setup_method(self):
+        self.users = [User.objects.create_user(username=f'user{i}', password='testpass') for i in range(3)]
+
+    def start(self, user, seen_ago):
+        session = TimerEngine(user=user).start_session(task='Test task')
+        go_quiet(session, seen_ago, resumed_ago=seen_ago + 600)
+        return session
+
+    def test_stops_only_expired_sessions(self):
+        old = self.start(self.users[0], 7200)
+        fresh = self.start(self.users[1], 60)
+
+        assert reaper.reap_sessions(timeout=3600) == 1
+
+        assert TimerSession.objects.get(pk=old.pk).status == 'stopped'
+        assert TimerSession.objects.get(pk=fresh.pk).status == 'running'
+
+    def test_batches_and_rollup(self):
+        for user in self.users:
+            self.start(user, 7200)
+        totals = []
+
+        assert reaper.reap_sessions(timeout=3600, batch_size=2, progress=totals.append) == 3
+
+        assert totals == [2, 3]
+        assert DailyTimerStats.objects.filter(total_sessions=1, total_seconds__gte=600).count() == 3
+
+    def test_uses_setting(self, settings):
+        self.start(self.users[0], 5400)
+
+        settings.TASK_TIMER_ABANDONED_SESSION_TIMEOUT = 7200
+        assert reaper.reap_sessions() == 0
+
+        settings.TASK_TIMER_ABANDONED_SESSION_TIMEOUT = 3600
+        assert reaper.reap_sessions() == 1
+
+    def test_off_without_setting(self, settings):
+        settings.TASK_TIMER_ABANDONED_SESSION_TIMEOUT = None
+        self.start(self.users[0], 7200)
+
+        # last_seen is not kept current then, so a timeout is not enough
+        with pytest.raises(ValueError):
+            reaper.reap_sessions(timeout=3600)
+
+    def test_buffered_heartbeat_keeps_session_alive(self, settings):
+        settings.TASK_TIMER_HEARTBEAT_WRITE_BEHIND = True
+        engine = TimerEngine(user=self.users[0])
+        session = self.start(self.users[0], 7200)
+        engine.update_session_duration(900)
+
+        assert reaper.reap_sessions(timeout=3600) == 0
+        assert TimerSession.objects.get(pk=session.pk).status == 'running'
+
+
+@pytest.mark.django_db
+class TestStartReplacesAbandoned:
+    """start_session() stops the user's own abandoned session"""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.engine = TimerEngine(user=self.user)
+
+    def test_abandoned_session_is_stopped(self, settings):
+        settings.TASK_TIMER_ABANDONED_SESSION_TIMEOUT = 3600
+        old = self.engine.start_session(task='Forgotten')
+        go_quiet(old, 7200, resumed_ago=9000)
+
+        new = self.engine.start_session(task='Fresh')
+
+        old.refresh_from_db()
+        assert old.status == 'stopped'
+        assert 1800 <= old.duration <= 1801
+        assert new.status == 'running'
+        assert DailyTimerStats.objects.get().total_sessions == 1
+
+    def test_live_session_still_blocks(self, settings):
+        settings.TASK_TIMER_ABANDONED_SESSION_TIMEOUT = 3600
+        self.engine.start_session(task='Open')
+
+        with pytest.raises(ValueError):
+            self.engine.start_session(task='Second')
+
+    def test_off_without_timeout(self):
+        old = self.engine.start_session(task='Forgotten')
+        go_quiet(old, 86400)
+
+        with pytest.raises(ValueError):
+            self.engine.start_session(task='Second')
+
+
+@pytest.mark.django_db
+class TestReapCommand:
+    """Tests for the reap_abandoned_sessions management command"""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        session = TimerEngine(user=self.user).start_session(task='Forgotten')
+        go_quiet(session, 7200)
+
+    def test_requires_timeout(self):
+        with pytest.raises(CommandError):
+            call_command('reap_abandoned_sessions')
+
+    def test_dry_run(self, detecting):
+        out = StringIO()
+
+        call_command('reap_abandoned_sessions', '--timeout', '3600', '--dry-run', stdout=out)
+
+        assert '1 abandoned sessions' in out.getvalue()
+        assert TimerSession.objects.get().status == 'running'
+
+    def test_reaps(self, detecting):
+        out = StringIO()
+
+        call_command('reap_abandoned_sessions', '--timeout', '3600', stdout=out)
+
+        assert 'Stopped 1 abandoned sessions' in out.getvalue()
+        assert TimerSession.objects.get().status == 'stopped'
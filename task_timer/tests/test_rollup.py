@@ -0,0 +1,162 @@
+"""
+Tests for the DailyTimerStats rollup
+"""
+import pytest
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+from task_timer.models import DailyTimerStats, TimerSession
+from task_timer.services import TimerEngine
+from task_timer.services.rollup import check_daily_stats, rebuild_daily_stats
+
+
+@pytest.mark.django_db
+class TestDailyRollup:
+    """Tests for incremental rollup maintenance"""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.engine = TimerEngine(user=self.user)
+
+    def row(self, date=None):
+        return DailyTimerStats.objects.get(user=self.user, date=date or timezone.localdate())
+
+    def test_active_session_not_rolled_up(self):
+        """Test that running sessions only show up once finished"""
+        self.engine.start_session(task='Test task')
+        self.engine.pause_session()
+
+        assert not DailyTimerStats.objects.filter(user=self.user).exists()
+        assert self.engine.get_daily_stats()['total_sessions'] == 1
+
+    def test_finishing_updates_rollup(self):
+        """Test that completing and stopping add to today's row"""
+        session = self.engine.start_session(task='First')
+        TimerSession.objects.filter(pk=session.pk).update(
+            last_resumed_at=timezone.now() - timedelta(minutes=25)
+        )
+        self.engine.complete_session()
+        self.engine.start_session(task='Second')
+        self.engine.stop_session()
+
+        row = self.row()
+        assert row.total_sessions == 2
+        assert row.completed_sessions == 1
+        assert 1500 <= row.total_seconds <= 1502
+        assert self.engine.get_daily_stats() == {
+            'total_sessions': 2,
+            'completed_sessions': 1,
+            'total_minutes': 25
+        }
+
+    def test_orm_create_and_delete(self):
+        """Test that sessions written directly through the ORM are tracked"""
+        session = TimerSession.objects.create(
+            task='Imported', created_by=self.user, status='completed', duration=600
+        )
+        assert self.row().total_seconds == 600
+
+        session.delete()
+        assert not DailyTimerStats.objects.filter(user=self.user).exists()
+
+    def test_orm_save_moves_between_days(self):
+        """Test that editing start_time refreshes both days"""
+        session = TimerSession.objects.create(
+            task='Moved', created_by=self.user, status='completed', duration=600
+        )
+        yesterday = timezone.localdate() - timedelta(days=1)
+
+        session.start_time = session.start_time - timedelta(days=1)
+        session.save()
+
+        assert not DailyTimerStats.objects.filter(user=self.user, date=timezone.localdate()).exists()
+        assert self.row(yesterday).total_sessions == 1
+
+    def test_save_outside_rollup_fields_skips_lookup(self, django_assert_num_queries):
+        """Test that saves limited to other fields neither read nor refresh the rollup"""
+        session = TimerSession.objects.create(
+            task='Notes only', created_by=self.user, status='completed', duration=600
+        )
+
+        session.notes = 'Reviewed'
+        with django_assert_num_queries(1):
+            session.save(update_fields=['notes'])
+
+        assert self.row().total_seconds == 600
+
+    def test_days_follow_default_timezone(self, settings):
+        """Test that the active request timezone does not move sessions between days"""
+        settings.TIME_ZONE = 'America/New_York'
+        start = datetime(2026, 10, 16, 2, 0, tzinfo=dt_timezone.utc)
+
+        with timezone.override('Asia/Tokyo'):
+            TimerSession.objects.create(
+                task='Late', created_by=self.user, status='completed', duration=600, start_time=start
+            )
+            assert check_daily_stats() == []
+
+        assert DailyTimerStats.objects.get(user=self.user).date == date(2026, 10, 15)
+
+    def test_weekly_stats_sum_days(self):
+        """Test that weekly stats add up the week's rows"""
+        today = timezone.localdate()
+        monday = today - timedelta(days=today.weekday())
+        DailyTimerStats.objects.create(
+            user=self.user, date=monday, total_sessions=2, completed_sessions=2, total_seconds=3000
+        )
+        DailyTimerStats.objects.create(
+            user=self.user, date=monday - timedelta(days=1), total_sessions=9, total_seconds=9000
+        )
+
+        stats = self.engine.get_weekly_stats()
+
+        assert stats == {'total_sessions': 2, 'completed_sessions': 2, 'total_minutes': 50}
+
+    def test_rebuild_and_check(self):
+        """Test that the checker finds drift and a rebuild repairs it"""
+        TimerSession.objects.create(
+            task='Done', created_by=self.user, status='completed', duration=600
+        )
+        DailyTimerStats.objects.filter(user=self.user).update(total_seconds=1)
+
+        mismatches = check_daily_stats()
+        assert len(mismatches) == 1
+        assert mismatches[0][2]['total_seconds'] == 600
+
+        assert rebuild_daily_stats() == 1
+        assert check_daily_stats() == []
+        assert self.row().total_seconds == 600
+
+
+@pytest.mark.django_db
+class TestRollupCommands:
+    """Tests for the rollup management commands"""
+
+    def test_check_reports_and_fixes(self):
+        """Test check_timer_stats with and without --fix"""
+        user = User.objects.create_user(username='testuser', password='testpass')
+        TimerSession.objects.create(task='Done', created_by=user, status='stopped', duration=60)
+        DailyTimerStats.objects.all().delete()
+
+        with pytest.raises(CommandError):
+            call_command('check_timer_stats')
+
+        call_command('check_timer_stats', '--fix')
+        call_command('check_timer_stats')
+
+    def test_rebuild_for_one_user(self):
+        """Test rebuild_timer_stats --user"""
+        user = User.objects.create_user(username='testuser', password='testpass')
+        TimerSession.objects.create(task='Done', created_by=user, status='completed', duration=60)
+        DailyTimerStats.objects.all().delete()
+
+        call_command('rebuild_timer_stats', '--user', 'testuser')
+
+        assert DailyTimerStats.objects.get(user=user).completed_sessions == 1
+
+    def test_rebuild_unknown_user(self):
+        """Test rebuild_timer_stats with a username that does not exist"""
+        with pytest.raises(CommandError):
+            call_command('rebuild_timer_stats', '--user', 'nobody')
@@ -0,0 +1,183 @@
+"""
+Tests for bucketed statistics series
+"""
+from datetime import date, datetime, timezone as dt_timezone
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python < 3.9
+    from backports.zoneinfo import ZoneInfo
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from task_timer.models import TimerSession
+from task_timer.services import TimerEngine
+from task_timer.services import series
+
+
+def make_session(user, start_time, duration=600, status='completed'):
+    return TimerSession.objects.create(
+        task='Task',
+        created_by=user,
+        start_time=start_time,
+        duration=duration,
+        status=status
+    )
+
+
+class TestBucketStarts:
+    """Tests for the gap-free bucket key list"""
+
+    def test_day_buckets(self):
+        keys = series.bucket_starts(date(2024, 1, 30), date(2024, 2, 2), 'day')
+        assert keys == [date(2024, 1, 30), date(2024, 1, 31), date(2024, 2, 1), date(2024, 2, 2)]
+
+    def test_week_and_month_buckets(self):
+        # 2024-01-03 is a Wednesday
+        assert series.bucket_starts(date(2024, 1, 3), date(2024, 1, 15), 'week') == [
+            date(2024, 1, 1), date(2024, 1, 8), date(2024, 1, 15)
+        ]
+        assert series.bucket_starts(date(2024, 1, 20), date(2024, 3, 1), 'month') == [
+            date(2024, 1, 1), date(2024, 2, 1), date(2024, 3, 1)
+        ]
+
+    def test_hour_buckets(self):
+        keys = series.bucket_starts(date(2024, 1, 1), date(2024, 1, 1), 'hour', dt_timezone.utc)
+        assert len(keys) == 24
+        assert keys[0] == datetime(2024, 1, 1, 0, tzinfo=dt_timezone.utc)
+        assert keys[-1] == datetime(2024, 1, 1, 23, tzinfo=dt_timezone.utc)
+
+    def test_hour_buckets_across_dst(self):
+        berlin = ZoneInfo('Europe/Berlin')
+
+        spring = series.bucket_starts(date(2024, 3, 31), date(2024, 3, 31), 'hour', berlin)
+        autumn = series.bucket_starts(date(2024, 10, 27), date(2024, 10, 27), 'hour', berlin)
+
+        assert len(spring) == 23
+        assert len(autumn) == 25
+        assert series.bucket_label(autumn[0], 'hour', berlin) == '2024-10-27T00:00:00+02:00'
+        assert series.bucket_label(autumn[-1], 'hour', berlin) == '2024-10-27T23:00:00+01:00'
+
+    def test_invalid_requests(self):
+        with pytest.raises(ValueError, match='Bucket must be one of'):
+            series.bucket_starts(date(2024, 1, 1), date(2024, 1, 2), 'year')
+        with pytest.raises(ValueError, match='must not be before'):
+            series.bucket_starts(date(2024, 1, 2), date(2024, 1, 1), 'day')
+        with pytest.raises(ValueError, match='Too many hour buckets'):
+            series.bucket_starts(date(2020, 1, 1), date(2024, 1, 1), 'hour')
+
+
+@pytest.mark.django_db
+class TestStatsSeries:
+    """Tests for TimerEngine.get_stats_series"""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.engine = TimerEngine(user=self.user)
+
+    def test_daily_series_fills_gaps(self, django_assert_num_queries):
+        utc = dt_timezone.utc
+        make_session(self.user, datetime(2024, 3, 1, 9, tzinfo=utc), duration=1200)
+        make_session(self.user, datetime(2024, 3, 1, 15, tzinfo=utc), duration=600, status='stopped')
+        make_session(self.user, datetime(2024, 3, 3, 9, tzinfo=utc), duration=1800)
+        # Outside the range
+        make_session(self.user, datetime(2024, 3, 4, 9, tzinfo=utc), duration=1800)
+
+        with django_assert_num_queries(1):
+            result = self.engine.get_stats_series(date(2024, 3, 1), date(2024, 3, 3), tzinfo=utc)
+
+        assert result['bucket'] == 'day'
+        assert result['fields'] == ['start', 'total_sessions', 'completed_sessions', 'total_minutes']
+        assert result['data'] == [
+            ['2024-03-01', 2, 1, 30],
+            ['2024-03-02', 0, 0, 0],
+            ['2024-03-03', 1, 1, 30],
+        ]
+
+    def test_buckets_follow_timezone(self):
+        # 23:30 UTC on the 1st is already the 2nd in Berlin
+        make_session(self.user, datetime(2024, 3, 1, 23, 30, tzinfo=dt_timezone.utc))
+
+        result = self.engine.get_stats_series(
+            date(2024, 3, 1), date(2024, 3, 2), tzinfo=ZoneInfo('Europe/Berlin')
+        )
+
+        assert result['timezone'] == 'Europe/Berlin'
+        assert result['data'] == [['2024-03-01', 0, 0, 0], ['2024-03-02', 1, 1, 10]]
+
+    def test_hourly_series(self):
+        utc = dt_timezone.utc
+        make_session(self.user, datetime(2024, 3, 1, 9, 15, tzinfo=utc))
+        make_session(self.user, datetime(2024, 3, 1, 9, 45, tzinfo=utc))
+
+        result = self.engine.get_stats_series(date(2024, 3, 1), date(2024, 3, 1), bucket='hour', tzinfo=utc)
+
+        assert len(result['data']) == 24
+        assert result['data'][9] == ['2024-03-01T09:00:00+00:00', 2, 2, 20]
+
+    def test_hourly_series_keeps_repeated_hour_apart(self):
+        berlin = ZoneInfo('Europe/Berlin')
+        # 02:30 summer time, then 02:30 again an hour later in winter time
+        make_session(self.user, datetime(2024, 10, 27, 0, 30, tzinfo=dt_timezone.utc), duration=600)
+        make_session(self.user, datetime(2024, 10, 27, 1, 30, tzinfo=dt_timezone.utc), duration=1200)
+
+        result = self.engine.get_stats_series(date(2024, 10, 27), date(2024, 10, 27), bucket='hour', tzinfo=berlin)
+
+        assert len(result['data']) == 25
+        assert result['data'][2] == ['2024-10-27T02:00:00+02:00', 1, 1, 10]
+        assert result['data'][3] == ['2024-10-27T02:00:00+01:00', 1, 1, 20]
+
+    def test_monthly_series_ignores_other_users(self):
+        other = User.objects.create_user(username='other', password='pass')
+        utc = dt_timezone.utc
+        make_session(self.user, datetime(2024, 2, 10, tzinfo=utc))
+        make_session(other, datetime(2024, 2, 10, tzinfo=utc))
+
+        result = self.engine.get_stats_series(date(2024, 1, 1), date(2024, 2, 29), bucket='month', tzinfo=utc)
+
+        assert result['data'] == [['2024-01-01', 0, 0, 0], ['2024-02-01', 1, 1, 10]]
+
+
+@pytest.mark.django_db
+class TestStatsSeriesAPI:
+    """Tests for GET /api/timer/stats/series/"""
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('task_timer:timer-stats-series')
+
+    def test_series(self):
+        make_session(self.user, datetime(2024, 3, 2, 12, tzinfo=dt_timezone.utc))
+
+        response = self.client.get(self.url, {
+            'from': '2024-03-01', 'to': '2024-03-31', 'bucket': 'week', 'tz': 'UTC'
+        })
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['bucket'] == 'week'
+        assert response.data['data'][0] == ['2024-02-26', 1, 1, 10]
+        assert len(response.data['data']) == 5
+
+    def test_defaults_to_last_30_days(self):
+        response = self.client.get(self.url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['bucket'] == 'day'
+        assert len(response.data['data']) == 30
+
+    @pytest.mark.parametrize('params', [
+        {'from': 'yesterday'},
+        {'tz': 'Mars/Olympus'},
+        {'bucket': 'fortnight'},
+        {'from': '2024-03-02', 'to': '2024-03-01'},
+    ])
+    def test_invalid_parameters(self, params):
+        response = self.client.get(self.url, params)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'error' in response.data
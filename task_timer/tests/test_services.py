@@ -42,6 +42,26 @@ class TestTimerEngine:
         with pytest.raises(ValueError, match="already has an active session"):
             engine.start_session(task='Second task')
 
+    def test_start_session_is_one_insert(self, django_assert_num_queries):
+        """Test that starting relies on the constraint instead of a lookup"""
+        user = User.objects.create_user(username='testuser', password='testpass')
+        engine = TimerEngine(user=user)
+
+        # The INSERT, wrapped in a savepoint
+        with django_assert_num_queries(3):
+            engine.start_session(task='First task')
+
+    def test_failed_start_keeps_transaction_usable(self):
+        """Test that a rejected start can be followed by more queries"""
+        user = User.objects.create_user(username='testuser', password='testpass')
+        engine = TimerEngine(user=user)
+        engine.start_session(task='First task')
+
+        with pytest.raises(ValueError):
+            engine.start_session(task='Second task')
+
+        assert engine.get_active_session().task == 'First task'
+
     def test_get_active_session(self):
         """Test getting user's active session"""
         user = User.objects.create_user(username='testuser', password='testpass')
@@ -137,6 +157,110 @@ class TestTimerEngine:
         assert completed.end_time is not None
         assert completed.duration == 1500
 
+    def test_pause_accrues_running_time(self):
+        """Test that pausing folds the running stretch into duration"""
+        user = User.objects.create_user(username='testuser', password='testpass')
+        engine = TimerEngine(user=user)
+
+        session = engine.start_session(task='Test task')
+        TimerSession.objects.filter(pk=session.pk).update(
+            last_resumed_at=timezone.now() - timedelta(minutes=10)
+        )
+
+        paused = engine.pause_session()
+
+        assert 599 <= paused.duration <= 601
+        assert paused.paused_at is not None
+        assert paused.last_resumed_at is None
+
+    def test_resume_accrues_pause_duration(self):
+        """Test that resuming records how long the session was paused"""
+        user = User.objects.create_user(username='testuser', password='testpass')
+        engine = TimerEngine(user=user)
+
+        session = engine.start_session(task='Test task')
+        engine.pause_session()
+        TimerSession.objects.filter(pk=session.pk).update(
+            paused_at=timezone.now() - timedelta(minutes=3)
+        )
+
+        resumed = engine.resume_session()
+
+        assert 179 <= resumed.pause_duration <= 181
+        assert resumed.paused_at is None
+        assert resumed.last_resumed_at is not None
+
+    def test_stop_paused_session_keeps_worked_time(self):
+        """Test that stopping a paused session only adds to pause_duration"""
+        user = User.objects.create_user(username='testuser', password='testpass')
+        engine = TimerEngine(user=user)
+
+        session = engine.start_session(task='Test task')
+        TimerSession.objects.filter(pk=session.pk).update(
+            last_resumed_at=timezone.now() - timedelta(minutes=5)
+        )
+        engine.pause_session()
+        TimerSession.objects.filter(pk=session.pk).update(
+            paused_at=timezone.now() - timedelta(minutes=2)
+        )
+
+        stopped = engine.stop_session()
+
+        assert 299 <= stopped.duration <= 301
+        assert 119 <= stopped.pause_duration <= 121
+        assert stopped.paused_at is None
+
+    def test_transitions_are_single_statements(self, django_assert_num_queries):
+        """Test that each state change is one UPDATE ... RETURNING"""
+        user = User.objects.create_user(username='testuser', password='testpass')
+        engine = TimerEngine(user=user)
+        engine.start_session(task='Test task')
+
+        with django_assert_num_queries(1):
+            engine.pause_session()
+        with django_assert_num_queries(1):
+            engine.resume_session()
+        with django_assert_num_queries(1):
+            engine.update_session_duration(60)
+
+    def test_second_pause_loses_race(self):
+        """Test that a stale second pause fails instead of overwriting"""
+        user = User.objects.create_user(username='testuser', password='testpass')
+        engine = TimerEngine(user=user)
+        engine.start_session(task='Test task')
+
+        engine.pause_session()
+
+        with pytest.raises(ValueError, match="Can only pause running sessions"):
+            engine.pause_session()
+
+    def test_transitions_leave_text_columns_alone(self):
+        """Test that transitions do not rewrite task and notes"""
+        user = User.objects.create_user(username='testuser', password='testpass')
+        engine = TimerEngine(user=user)
+        session = engine.start_session(task='Test task', notes='Original')
+
+        # Edited elsewhere while the session runs
+        TimerSession.objects.filter(pk=session.pk).update(notes='Edited')
+        stopped = engine.stop_session()
+
+        assert stopped.notes == 'Edited'
+
+    def test_transitions_without_update_returning(self, monkeypatch):
+        """Test the fallback used on backends without UPDATE ... RETURNING"""
+        monkeypatch.setattr('task_timer.db.supports_update_returning', lambda connection: False)
+        user = User.objects.create_user(username='testuser', password='testpass')
+        engine = TimerEngine(user=user)
+        session = engine.start_session(task='Test task')
+
+        paused = engine.pause_session()
+        completed = engine.complete_session()
+
+        assert paused == session
+        assert paused.status == 'paused'
+        assert completed.status == 'completed'
+        assert completed.end_time is not None
+
     def test_get_session_history(self):
         """Test retrieving user's session history"""
         user = User.objects.create_user(username='testuser', password='testpass')
@@ -230,6 +354,60 @@ class TestTimerEngine:
         assert stats['total_minutes'] == 125  # 5 * 25
         assert stats['completed_sessions'] == 5
 
+    def test_dashboard_stats_reads_rollup(self, django_assert_num_queries):
+        """Test that today and this week come from the rollup and active session"""
+        user = User.objects.create_user(username='testuser', password='testpass')
+        engine = TimerEngine(user=user)
+
+        for status in ['completed', 'completed', 'stopped']:
+            TimerSession.objects.create(
+                task='Task',
+                created_by=user,
+                status=status,
+                duration=1500
+            )
+
+        # Rollup rows, then the active session lookup
+        with django_assert_num_queries(2):
+            stats = engine.get_dashboard_stats()
+
+        assert stats['today'] == {
+            'total_sessions': 3,
+            'completed_sessions': 2,
+            'total_minutes': 75
+        }
+        assert stats['week'] == stats['today']
+
+    def test_get_stats_for_arbitrary_windows(self):
+        """Test that each window only counts its own sessions"""
+        user = User.objects.create_user(username='testuser', password='testpass')
+        other = User.objects.create_user(username='other', password='testpass')
+        engine = TimerEngine(user=user)
+        now = timezone.now()
+
+        TimerSession.objects.create(
+            task='Recent', created_by=user, status='completed', duration=600,
+            start_time=now - timedelta(hours=1)
+        )
+        TimerSession.objects.create(
+            task='Older', created_by=user, status='stopped', duration=1200,
+            start_time=now - timedelta(days=10)
+        )
+        TimerSession.objects.create(
+            task='Not mine', created_by=other, status='completed', duration=1500,
+            start_time=now - timedelta(hours=1)
+        )
+
+        stats = engine.get_stats({
+            'last_day': (now - timedelta(days=1), now),
+            'last_month': (now - timedelta(days=30), now),
+            'empty': (now - timedelta(days=60), now - timedelta(days=40))
+        })
+
+        assert stats['last_day'] == {'total_sessions': 1, 'completed_sessions': 1, 'total_minutes': 10}
+        assert stats['last_month'] == {'total_sessions': 2, 'completed_sessions': 1, 'total_minutes': 30}
+        assert stats['empty'] == {'total_sessions': 0, 'completed_sessions': 0, 'total_minutes': 0}
+
     def test_update_session_duration(self):
         """Test updating session duration"""
         user = User.objects.create_user(username='testuser', password='testpass')
@@ -243,19 +421,39 @@ class TestTimerEngine:
         assert updated.duration == 600
         assert updated == session
 
+    def test_update_session_duration_restarts_running_stretch(self):
+        """Test that a reported duration is not counted twice on stop"""
+        user = User.objects.create_user(username='testuser', password='testpass')
+        engine = TimerEngine(user=user)
+
+        session = engine.start_session(task='Test task')
+        TimerSession.objects.filter(pk=session.pk).update(
+            last_resumed_at=timezone.now() - timedelta(minutes=10)
+        )
+
+        engine.update_session_duration(600)
+        stopped = engine.stop_session()
+
+        assert 600 <= stopped.duration <= 601
+
     def test_get_or_create_settings(self):
         """Test getting or creating user settings"""
         user = User.objects.create_user(username='testuser', password='testpass')
         engine = TimerEngine(user=user)
 
-        # Should create settings with defaults
+        # Defaults are returned without writing a row
         settings = engine.get_or_create_settings()
 
         assert settings.user == user
+        assert settings.pk is None
         assert settings.work_duration == 25
         assert settings.short_break_duration == 5
         assert settings.long_break_duration == 15
+        assert not TimerSettings.objects.filter(user=user).exists()
 
-        # Calling again should return same settings
+        # Once changed, the saved row is returned
+        saved = engine.update_settings(work_duration=50)
         settings2 = engine.get_or_create_settings()
-        assert settings == settings2
+        assert settings2 == saved
+        assert settings2.work_duration == 50
+        assert settings2.short_break_duration == 5
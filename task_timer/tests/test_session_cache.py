@@ -0,0 +1,121 @@
+"""
+Tests for the cached active session lookup
+"""
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from task_timer.models import TimerSession
+from task_timer.services import TimerEngine
+from task_timer.services import session_cache
+
+
+# Cache writes wait for commit, so these tests need real transactions
+@pytest.mark.django_db(transaction=True)
+class TestActiveSessionCache:
+    """Tests for TimerEngine.get_active_session with caching enabled"""
+
+    @pytest.fixture(autouse=True)
+    def cache_enabled(self, settings):
+        settings.TASK_TIMER_CACHE_ACTIVE_SESSION = True
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.engine = TimerEngine(user=self.user)
+
+    def test_repeat_lookups_skip_database(self, django_assert_num_queries):
+        """Test that a second lookup is served from the cache"""
+        session = self.engine.start_session(task='Test task')
+
+        with django_assert_num_queries(0):
+            active = self.engine.get_active_session()
+
+        assert active == session
+        assert active.task == 'Test task'
+        assert active.status == 'running'
+
+    def test_no_active_session_is_cached(self, django_assert_num_queries):
+        """Test that idle users are cached too"""
+        assert self.engine.get_active_session() is None
+
+        with django_assert_num_queries(0):
+            assert self.engine.get_active_session() is None
+
+    def test_transitions_update_cache(self, django_assert_num_queries):
+        """Test that state changes are written through to the cache"""
+        self.engine.start_session(task='Test task')
+        self.engine.pause_session()
+
+        with django_assert_num_queries(0):
+            assert self.engine.get_active_session().status == 'paused'
+
+        self.engine.stop_session()
+
+        with django_assert_num_queries(0):
+            assert self.engine.get_active_session() is None
+
+    def test_direct_save_invalidates(self):
+        """Test that ORM writes outside the engine drop the cached entry"""
+        session = self.engine.start_session(task='Test task')
+        self.engine.get_active_session()
+
+        session.status = 'completed'
+        session.save()
+
+        assert self.engine.get_active_session() is None
+
+    def test_delete_invalidates(self):
+        """Test that deleting the session drops the cached entry"""
+        session = self.engine.start_session(task='Test task')
+        self.engine.get_active_session()
+
+        session.delete()
+
+        assert self.engine.get_active_session() is None
+
+    def test_fill_after_miss_does_not_replace_newer_entry(self, monkeypatch):
+        """Test that a lookup which read the row before a transition cannot cache it"""
+        self.engine.start_session(task='Test task')
+        session_cache._cache().clear()
+        stale = TimerSession.objects.get()
+
+        def pause_during_lookup(user_id, session):
+            # Another request pauses the session between this lookup's
+            # SELECT and its cache fill
+            TimerEngine(user=self.user).pause_session()
+            fill(user_id, session)
+
+        fill = session_cache.fill_active_session
+        monkeypatch.setattr(session_cache, 'fill_active_session', pause_during_lookup)
+
+        assert self.engine.get_active_session().status == 'running'
+        assert session_cache.get_active_session(self.user.pk)[1].status == 'paused'
+
+        async_to_sync(session_cache.afill_active_session)(self.user.pk, stale)
+        assert session_cache.get_active_session(self.user.pk)[1].status == 'paused'
+
+    def test_cached_session_is_usable_instance(self):
+        """Test that cached sessions behave like loaded rows"""
+        self.engine.start_session(task='Test task')
+
+        active = self.engine.get_active_session()
+
+        assert isinstance(active, TimerSession)
+        assert active._state.adding is False
+        assert active.created_by == self.user
+        assert active.get_elapsed_seconds() >= 0
+
+
+@pytest.mark.django_db
+class TestActiveSessionCacheDisabled:
+    """Tests for the default uncached behaviour"""
+
+    def test_lookups_hit_database(self, django_assert_num_queries):
+        """Test that nothing is cached unless enabled"""
+        user = User.objects.create_user(username='testuser', password='testpass')
+        engine = TimerEngine(user=user)
+        engine.start_session(task='Test task')
+
+        with django_assert_num_queries(1):
+            engine.get_active_session()
+
+        assert session_cache.get_active_session(user.pk) == (False, None)
@@ -0,0 +1,143 @@
+"""
+Tests for the cached settings lookup
+"""
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.urls import reverse
+from task_timer.models import TimerSettings
+from task_timer.services import TimerEngine, settings_cache
+
+
+# Cache writes wait for commit, so these tests need real transactions
+@pytest.mark.django_db(transaction=True)
+class TestSettingsCache:
+    """Tests for TimerEngine.get_or_create_settings with caching enabled"""
+
+    @pytest.fixture(autouse=True)
+    def cache_enabled(self, settings):
+        settings.TASK_TIMER_CACHE_SETTINGS = True
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.engine = TimerEngine(user=self.user)
+
+    def test_defaults_are_cached(self, django_assert_num_queries):
+        """Test that users without a row are cached too"""
+        self.engine.get_or_create_settings()
+
+        with django_assert_num_queries(0):
+            settings = self.engine.get_or_create_settings()
+
+        assert settings.pk is None
+        assert settings.work_duration == 25
+
+    def test_fill_after_miss_does_not_replace_update(self, monkeypatch):
+        """Test that a lookup which read no row before an update cannot cache the defaults"""
+        def update_during_lookup(user_id, settings):
+            # Another request saves settings between this lookup's SELECT
+            # and its cache fill
+            TimerEngine(user=self.user).update_settings(work_duration=50)
+            fill(user_id, settings)
+
+        fill = settings_cache.fill_settings
+        monkeypatch.setattr(settings_cache, 'fill_settings', update_during_lookup)
+
+        assert self.engine.get_or_create_settings().work_duration == 25
+        assert self.engine.get_or_create_settings().work_duration == 50
+
+        async_to_sync(settings_cache.afill_settings)(self.user.pk, None)
+        assert self.engine.get_or_create_settings().work_duration == 50
+
+    def test_update_writes_through(self, django_assert_num_queries):
+        """Test that the first change creates the row and updates the cache"""
+        self.engine.get_or_create_settings()
+        saved = self.engine.update_settings(work_duration=45)
+
+        with django_assert_num_queries(0):
+            settings = self.engine.get_or_create_settings()
+
+        assert settings.pk == saved.pk
+        assert settings.work_duration == 45
+        assert TimerSettings.objects.filter(user=self.user).count() == 1
+
+    def test_direct_save_invalidates(self):
+        """Test that ORM writes outside the engine drop the cached entry"""
+        settings = self.engine.update_settings(work_duration=45)
+        self.engine.get_or_create_settings()
+
+        settings.work_duration = 30
+        settings.save()
+
+        assert self.engine.get_or_create_settings().work_duration == 30
+
+    def test_delete_invalidates(self):
+        """Test that deleting the row falls back to the defaults"""
+        self.engine.update_settings(work_duration=45)
+        self.engine.get_or_create_settings()
+
+        TimerSettings.objects.filter(user=self.user).delete()
+
+        assert self.engine.get_or_create_settings().work_duration == 25
+
+    def test_async_lookup_shares_cache(self, django_assert_num_queries):
+        """Test that the async API reads entries written by the sync one"""
+        self.engine.update_settings(work_duration=45)
+
+        with django_assert_num_queries(0):
+            settings = async_to_sync(self.engine.aget_or_create_settings)()
+
+        assert settings.work_duration == 45
+
+    def test_settings_endpoint_skips_query(self, client, django_assert_num_queries):
+        """Test that GET /api/settings/ is answered from the cache"""
+        client.force_login(self.user)
+        url = reverse('task_timer:settings-detail')
+        client.get(url)
+
+        # Only the session and user lookups remain
+        with django_assert_num_queries(2):
+            response = client.get(url)
+
+        assert response.json()['work_duration'] == 25
+
+
+@pytest.mark.django_db
+class TestLazySettings:
+    """Tests for settings rows created on first change"""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+
+    def test_get_settings_creates_no_row(self, client):
+        client.force_login(self.user)
+
+        response = client.get(reverse('task_timer:settings-detail'))
+
+        assert response.json()['id'] is None
+        assert response.json()['work_duration'] == 25
+        assert not TimerSettings.objects.exists()
+
+    def test_first_put_creates_row(self, client):
+        client.force_login(self.user)
+
+        response = client.put(
+            reverse('task_timer:settings-detail'),
+            {'work_duration': 50, 'short_break_duration': 10, 'long_break_duration': 20, 'auto_start_breaks': True},
+            content_type='application/json'
+        )
+
+        settings = TimerSettings.objects.get(user=self.user)
+        assert response.json()['id'] == settings.pk
+        assert settings.work_duration == 50
+
+    def test_settings_page_creates_row_on_post(self, client):
+        client.force_login(self.user)
+        url = reverse('task_timer:settings-view')
+
+        assert client.get(url).status_code == 200
+        assert not TimerSettings.objects.exists()
+
+        client.post(url, {'work_duration': 30, 'short_break_duration': 5, 'long_break_duration': 15})
+
+        assert TimerSettings.objects.get(user=self.user).work_duration == 30
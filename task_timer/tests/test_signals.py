@@ -5,46 +5,46 @@ Following TDD: Write tests first, then implement signals
 import pytest
 from django.contrib.auth.models import User
 from task_timer.models import TimerSettings
+from task_timer.services import TimerEngine
 
 
 @pytest.mark.django_db
 class TestUserSignals:
-    """Tests for user-related signals"""
+    """Tests for user creation and default settings"""
 
-    def test_user_creation_auto_creates_timer_settings(self):
+    def test_user_creation_does_not_create_timer_settings(self):
         """
-        When a new user is created, TimerSettings should be automatically
-        created with default values
+        Creating a user writes no TimerSettings row; the defaults are
+        served until the user changes something
         """
-        # Create a new user
         user = User.objects.create_user(
             username='testuser',
             password='testpass',
             email='test@example.com'
         )
 
-        # TimerSettings should automatically exist for this user
-        assert TimerSettings.objects.filter(user=user).exists()
+        assert not TimerSettings.objects.filter(user=user).exists()
 
-        # Verify default settings values
-        settings = TimerSettings.objects.get(user=user)
+        settings = TimerEngine(user=user).get_or_create_settings()
+        assert settings.pk is None
         assert settings.work_duration == 25
         assert settings.short_break_duration == 5
         assert settings.long_break_duration == 15
         assert settings.auto_start_breaks is False
 
+    def test_bulk_created_users_get_defaults(self):
+        """Users created without signals still get working settings"""
+        User.objects.bulk_create([User(username='user1'), User(username='user2')])
+
+        for user in User.objects.all():
+            assert TimerEngine(user=user).get_or_create_settings().work_duration == 25
+
     def test_existing_settings_not_overwritten(self):
         """
         If settings already exist for a user, they should not be overwritten
         """
-        # Create user with custom settings
         user = User.objects.create_user(username='testuser', password='testpass')
-        settings = TimerSettings.objects.get(user=user)
-
-        # Modify settings
-        settings.work_duration = 50
-        settings.short_break_duration = 10
-        settings.save()
+        settings = TimerEngine(user=user).update_settings(work_duration=50, short_break_duration=10)
 
         # Re-save the user (simulating an update)
         user.email = 'newemail@example.com'
@@ -56,12 +56,12 @@ class TestUserSignals:
         assert settings.short_break_duration == 10
 
     def test_multiple_users_get_separate_settings(self):
-        """Each user should get their own TimerSettings instance"""
+        """Each user's first change creates their own TimerSettings row"""
         user1 = User.objects.create_user(username='user1', password='pass1')
         user2 = User.objects.create_user(username='user2', password='pass2')
 
-        settings1 = TimerSettings.objects.get(user=user1)
-        settings2 = TimerSettings.objects.get(user=user2)
+        settings1 = TimerEngine(user=user1).update_settings(work_duration=30)
+        settings2 = TimerEngine(user=user2).update_settings(work_duration=40)
 
         assert settings1.id != settings2.id
         assert settings1.user == user1
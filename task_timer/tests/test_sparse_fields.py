@@ -0,0 +1,98 @@
+"""
+Tests for sparse fieldsets on the sessions API
+"""
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import serializers, status
+from rest_framework.test import APIClient
+from task_timer.models import TimerSession
+from task_timer.serializers import TimerSessionSerializer
+
+
+class TestSelectFields:
+    """Tests for TimerSessionSerializer.select_fields / only_fields"""
+
+    def test_fields_keep_serializer_order(self):
+        assert TimerSessionSerializer.select_fields(['status', 'id']) == ['id', 'status']
+
+    def test_omit(self):
+        fields = TimerSessionSerializer.select_fields(omit=['notes', 'task'])
+
+        assert 'notes' not in fields
+        assert 'task' not in fields
+        assert 'duration' in fields
+
+    def test_unknown_field(self):
+        with pytest.raises(serializers.ValidationError):
+            TimerSessionSerializer.select_fields(['id', 'secret'])
+
+    def test_computed_fields_load_their_sources(self):
+        columns = TimerSessionSerializer.only_fields(['elapsed_seconds', 'duration_formatted'])
+
+        assert columns == ['id', 'status', 'duration', 'last_resumed_at']
+
+
+@pytest.mark.django_db
+class TestSparseSessionList:
+    """Tests for ?fields= and ?omit= on GET /api/sessions/"""
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('task_timer:session-list')
+        TimerSession.objects.create(
+            task='Long task',
+            notes='x' * 5000,
+            created_by=self.user,
+            status='completed',
+            duration=1500
+        )
+
+    def test_fields(self):
+        response = self.client.get(self.url, {'fields': 'id,status,duration_formatted'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['results'] == [
+            {'id': response.data['results'][0]['id'], 'status': 'completed', 'duration_formatted': '25m'}
+        ]
+
+    def test_omit(self):
+        response = self.client.get(self.url, {'omit': 'notes,task'})
+
+        row = response.data['results'][0]
+        assert 'notes' not in row
+        assert 'task' not in row
+        assert row['duration'] == 1500
+
+    def test_unrequested_columns_are_not_loaded(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url, {'fields': 'id,duration'})
+
+        sql = queries.captured_queries[-1]['sql']
+        assert '"notes"' not in sql
+        assert '"task"' not in sql
+        assert len(queries) == 1
+
+    def test_detail_supports_fields(self):
+        session = TimerSession.objects.get()
+
+        response = self.client.get(
+            reverse('task_timer:session-detail', args=[session.pk]), {'fields': 'task'}
+        )
+
+        assert response.data == {'task': 'Long task'}
+
+    def test_unknown_field_is_400(self):
+        response = self.client.get(self.url, {'fields': 'id,password'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'fields' in response.data
+
+    def test_default_is_full_representation(self):
+        response = self.client.get(self.url)
+
+        assert set(response.data['results'][0]) == set(TimerSessionSerializer.Meta.fields)
@@ -0,0 +1,140 @@
+"""
+Tests for the versioned stats cache
+"""
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework.test import APIClient
+from task_timer.models import TimerSession
+from task_timer.services import TimerEngine
+from task_timer.services import heartbeats, rollup, stats_cache
+
+
+# Version bumps wait for commit, so these tests need real transactions
+@pytest.mark.django_db(transaction=True)
+class TestStatsCache:
+    """Tests for TimerEngine stats with TASK_TIMER_CACHE_STATS enabled"""
+
+    @pytest.fixture(autouse=True)
+    def cache_enabled(self, settings):
+        settings.TASK_TIMER_CACHE_STATS = True
+        stats_cache.reset_counters()
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.engine = TimerEngine(user=self.user)
+
+    def test_repeat_requests_skip_database(self, django_assert_num_queries):
+        """Test that repeat stats reads are cache hits with no queries"""
+        first = self.engine.get_dashboard_stats()
+
+        with django_assert_num_queries(0):
+            again = self.engine.get_dashboard_stats()
+
+        assert again == first
+        assert stats_cache.get_counters() == {'hits': 1, 'misses': 1}
+
+    def test_daily_and_weekly_are_cached_separately(self):
+        """Test that each set of windows has its own entry"""
+        self.engine.get_daily_stats()
+        self.engine.get_weekly_stats()
+        self.engine.get_daily_stats()
+
+        assert stats_cache.get_counters() == {'hits': 1, 'misses': 2}
+
+    def test_transitions_bump_version(self):
+        """Test that engine transitions make cached stats unreachable"""
+        assert self.engine.get_daily_stats()['total_sessions'] == 0
+
+        self.engine.start_session(task='Test task')
+        assert self.engine.get_daily_stats()['total_sessions'] == 1
+
+        self.engine.update_session_duration(1500)
+        assert self.engine.get_daily_stats()['total_minutes'] == 25
+
+        self.engine.complete_session()
+        stats = self.engine.get_daily_stats()
+        assert stats['completed_sessions'] == 1
+
+        assert stats_cache.get_counters() == {'hits': 0, 'misses': 4}
+
+    def test_direct_save_bumps_version(self):
+        """Test that ORM writes outside the engine invalidate too"""
+        self.engine.get_daily_stats()
+
+        TimerSession.objects.create(
+            task='Imported',
+            created_by=self.user,
+            status='completed',
+            duration=600
+        )
+
+        assert self.engine.get_daily_stats()['total_minutes'] == 10
+
+    def test_versions_are_per_user(self):
+        """Test that one user's writes leave other users' entries alone"""
+        other = TimerEngine(user=User.objects.create_user(username='other', password='pass'))
+        other.get_daily_stats()
+
+        self.engine.start_session(task='Test task')
+
+        other.get_daily_stats()
+        assert stats_cache.get_counters() == {'hits': 1, 'misses': 1}
+
+    def test_heartbeat_flush_bumps_version(self, settings):
+        """Test that flushed write-behind heartbeats show up in stats"""
+        settings.TASK_TIMER_HEARTBEAT_WRITE_BEHIND = True
+        self.engine.start_session(task='Test task')
+        self.engine.update_session_duration(1200)
+        assert self.engine.get_daily_stats()['total_minutes'] == 0
+
+        heartbeats.flush_heartbeats()
+
+        assert self.engine.get_daily_stats()['total_minutes'] == 20
+
+    def test_rebuild_bumps_version(self):
+        """Test that rebuilding the rollup invalidates cached stats"""
+        TimerSession.objects.create(task='Done', created_by=self.user, status='completed', duration=600)
+        self.engine.get_daily_stats()
+
+        rollup.rebuild_daily_stats()
+        self.engine.get_daily_stats()
+
+        assert stats_cache.get_counters()['hits'] == 0
+
+    def test_evicted_version_does_not_reuse_old_entries(self):
+        """Test that a lost version key never resurrects stale stats"""
+        self.engine.get_daily_stats()
+        old_version = stats_cache.get_version(self.user.pk)
+
+        stats_cache._cache().delete(stats_cache.version_key(self.user.pk))
+
+        assert stats_cache.get_version(self.user.pk) != old_version
+
+    def test_api_stats_served_from_cache(self):
+        """Test that repeated GET /api/timer/stats/ stops reading timer tables"""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        url = reverse('task_timer:timer-stats')
+
+        first = client.get(url)
+        second = client.get(url)
+
+        assert second.data == first.data
+        assert stats_cache.get_counters() == {'hits': 1, 'misses': 1}
+
+
+@pytest.mark.django_db
+class TestStatsCacheDisabled:
+    """Tests for the default, uncached behaviour"""
+
+    def test_disabled_by_default(self, django_assert_num_queries):
+        user = User.objects.create_user(username='testuser', password='testpass')
+        engine = TimerEngine(user=user)
+        stats_cache.reset_counters()
+
+        engine.get_daily_stats()
+        with django_assert_num_queries(2):
+            engine.get_daily_stats()
+
+        assert stats_cache.get_counters() == {'hits': 0, 'misses': 0}
@@ -1,13 +1,105 @@
 """
 API Views for task_timer
 """
+from datetime import date, datetime, time, timedelta
+from time import monotonic, sleep
+
+try:
+    import zoneinfo
+except ImportError:  # Python < 3.9
+    from backports import zoneinfo
+
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from task_timer.models import TimerSession, TimerSettings
-from task_timer.serializers import TimerSessionSerializer, TimerSettingsSerializer
-from task_timer.services import TimerEngine
+from task_timer.conditional import conditional_response, make_etag
+from task_timer.conf import get_setting
+from task_timer.models import ArchivedTimerSession, TimerSession, TimerSettings
+from task_timer.serializers import TimerSessionSerializer, TimerSettingsSerializer, serialize_session_values
+from task_timer.services import TimerEngine, archive, events, rollup
+from task_timer.services.timer_engine import BatchError, liveness_enabled
+from task_timer.services.export import CONTENT_TYPES, async_chunks, encode_chunks, export_lines
+from task_timer.services.session_import import decode_lines, import_sessions, read_records
+
+
+def _parse_date(value):
+    """Parse an optional YYYY-MM-DD query parameter"""
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+
+def _day_start(day):
+    """Return the aware start of a date, or None"""
+    if day is None:
+        return None
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _day_end(day):
+    """Return the aware last moment of a date, or None"""
+    if day is None:
+        return None
+    return timezone.make_aware(datetime.combine(day, time.max))
+
+
+def _parse_timezone(value):
+    """Parse an optional IANA timezone name query parameter"""
+    if not value:
+        return None
+    try:
+        return zoneinfo.ZoneInfo(value)
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown timezone '{value}'")
+
+
+def _parse_field_list(value):
+    """Split an optional comma-separated query parameter"""
+    if not value:
+        return None
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def _parse_batch_operation(operation):
+    """
+    Validate one batch operation
+
+    Returns:
+        (name, kwargs) pair for TimerEngine.run_batch()
+
+    Raises:
+        ValueError: If the operation is malformed
+    """
+    if not isinstance(operation, dict):
+        raise ValueError('Each operation must be an object')
+
+    name = operation.get('op')
+    if name not in TimerEngine.BATCH_OPERATIONS:
+        raise ValueError(f"Operation must be one of: {', '.join(TimerEngine.BATCH_OPERATIONS)}")
+
+    if name == 'start':
+        if not operation.get('task'):
+            raise ValueError('Task is required')
+        return name, {'task': operation['task'], 'notes': operation.get('notes', '')}
+
+    if name == 'update-duration':
+        try:
+            duration = int(operation['duration'])
+        except KeyError:
+            raise ValueError('Duration is required')
+        except (TypeError, ValueError):
+            raise ValueError('Duration must be a whole number of seconds')
+        return name, {'duration': duration}
+
+    return name, {}
 
 
 class TimerViewSet(viewsets.ViewSet):
@@ -16,6 +108,9 @@ class TimerViewSet(viewsets.ViewSet):
     """
     permission_classes = [IsAuthenticated]
 
+    # Upper bound on operations in one batch request
+    MAX_BATCH_OPERATIONS = 20
+
     @action(detail=False, methods=['post'])
     def start(self, request):
         """Start a new timer session"""
@@ -52,8 +147,19 @@ class TimerViewSet(viewsets.ViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        serializer = TimerSessionSerializer(session)
-        return Response(serializer.data)
+        def build():
+            return Response(TimerSessionSerializer(session).data)
+
+        # elapsed_seconds of a running session changes every second
+        if session.status == 'running':
+            return conditional_response(request, build)
+
+        return conditional_response(
+            request,
+            build,
+            etag=make_etag(session.pk, session.updated_at),
+            last_modified=session.updated_at
+        )
 
     @action(detail=False, methods=['post'])
     def pause(self, request):
@@ -123,18 +229,129 @@ class TimerViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+    @action(detail=False, methods=['post', 'patch'])
+    def heartbeat(self, request):
+        """
+        Record the active session's duration without returning it
+
+        Without a duration, only marks the session as still open, so it is
+        not stopped as abandoned.
+        """
+        duration = request.data.get('duration')
+
+        if duration is not None:
+            try:
+                duration = int(duration)
+            except (TypeError, ValueError):
+                return Response(
+                    {'error': 'Duration must be a whole number of seconds'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        engine = TimerEngine(user=request.user)
+
+        try:
+            if duration is None:
+                engine.touch_session()
+            else:
+                engine.update_session_duration(duration)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """
+        Run an ordered list of operations in one transaction
+
+        Body: {"operations": [{"op": "stop"}, {"op": "start", "task": "..."}]}
+        with op one of start, pause, resume, stop, complete, update-duration.
+        Either all operations are applied or none are.
+        """
+        operations = request.data.get('operations')
+
+        if not isinstance(operations, list) or not operations:
+            return Response(
+                {'error': 'Operations must be a non-empty list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if len(operations) > self.MAX_BATCH_OPERATIONS:
+            return Response(
+                {'error': f'At most {self.MAX_BATCH_OPERATIONS} operations per batch'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        parsed = []
+        for index, operation in enumerate(operations):
+            try:
+                parsed.append(_parse_batch_operation(operation))
+            except ValueError as e:
+                return Response(
+                    {'error': str(e), 'index': index},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        engine = TimerEngine(user=request.user)
+
+        try:
+            sessions = engine.run_batch(parsed)
+        except BatchError as e:
+            return Response(
+                {'error': str(e), 'index': e.index, 'op': e.operation},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response({
+            'results': [
+                {'op': name, 'session': TimerSessionSerializer(session).data}
+                for (name, kwargs), session in zip(parsed, sessions)
+            ]
+        })
+
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get daily and weekly statistics"""
         engine = TimerEngine(user=request.user)
+        stats = engine.get_dashboard_stats()
 
-        daily_stats = engine.get_daily_stats()
-        weekly_stats = engine.get_weekly_stats()
+        return conditional_response(
+            request,
+            lambda: Response(stats),
+            etag=make_etag(stats)
+        )
 
-        return Response({
-            'today': daily_stats,
-            'week': weekly_stats
-        })
+    @action(detail=False, methods=['get'], url_path='stats/series')
+    def stats_series(self, request):
+        """Get statistics in hour/day/week/month buckets over a date range"""
+        try:
+            last_day = _parse_date(request.query_params.get('to')) or timezone.localdate()
+            first_day = _parse_date(request.query_params.get('from')) or last_day - timedelta(days=29)
+            tzinfo = _parse_timezone(request.query_params.get('tz'))
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        engine = TimerEngine(user=request.user)
+
+        try:
+            data = engine.get_stats_series(
+                first_day,
+                last_day,
+                bucket=request.query_params.get('bucket', 'day'),
+                tzinfo=tzinfo
+            )
+            return Response(data)
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
 
 class SessionViewSet(viewsets.ReadOnlyModelViewSet):
@@ -145,9 +362,193 @@ class SessionViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [IsAuthenticated]
     pagination_class = None  # Will be set in urls.py
 
+    # Always loaded: start_time for ordering and pagination cursors,
+    # status and updated_at for conditional GET
+    VALIDATOR_FIELDS = ['start_time', 'status', 'updated_at']
+
     def get_queryset(self):
         """Return sessions for authenticated user only"""
-        return TimerSession.objects.filter(created_by=self.request.user)
+        queryset = TimerSession.objects.filter(created_by=self.request.user)
+
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            queryset = queryset.only(*self.VALIDATOR_FIELDS, *TimerSessionSerializer.only_fields(fields))
+
+        return queryset
+
+    def get_archive_queryset(self):
+        """Return archived sessions for authenticated user only"""
+        queryset = ArchivedTimerSession.objects.filter(created_by=self.request.user)
+
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            queryset = queryset.only(*self.VALIDATOR_FIELDS, *TimerSessionSerializer.only_fields(fields))
+
+        return queryset
+
+    def get_object(self):
+        """Look up a session, falling back to the archive"""
+        try:
+            return super().get_object()
+        except Http404:
+            return get_object_or_404(self.get_archive_queryset(), pk=self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+
+    def paginate_queryset(self, queryset, archive=None):
+        """Paginate sessions, merging archived ones in with the keyset paginator"""
+        if archive is not None and isinstance(self.paginator, SessionCursorPagination):
+            return self.paginator.paginate_queryset(queryset, self.request, view=self, archive=archive)
+        return super().paginate_queryset(queryset)
+
+    def list(self, request, *args, **kwargs):
+        """List sessions from .values() rows, without per-row serializers"""
+        fields = self.get_sparse_fields() or TimerSessionSerializer.Meta.fields
+        columns = [*self.VALIDATOR_FIELDS, *TimerSessionSerializer.only_fields(fields)]
+        queryset = self.filter_queryset(self.get_queryset()).values(*columns)
+
+        archived = None
+        if archive.is_enabled():
+            archived = self.get_archive_queryset().values(*columns)
+
+        page = self.paginate_queryset(queryset, archive=archived)
+        if page is None:
+            page = list(queryset)
+            if archived is not None:
+                page += list(archived)
+                page.sort(key=lambda row: (row['start_time'], row['id']), reverse=True)
+
+        def build():
+            data = serialize_session_values(page, fields)
+            if self.paginator is None:
+                return Response(data)
+            return self.get_paginated_response(data)
+
+        # elapsed_seconds of a running session changes every second
+        if any(row['status'] == 'running' for row in page):
+            return conditional_response(request, build)
+
+        etag_parts = [fields, [(row['id'], row['updated_at']) for row in page]]
+        if self.paginator is not None:
+            etag_parts += [self.paginator.get_next_link(), self.paginator.get_previous_link()]
+
+        return conditional_response(request, build, etag=make_etag(*etag_parts))
+
+    def retrieve(self, request, *args, **kwargs):
+        """Get a session; finished sessions never change and may be cached"""
+        session = self.get_object()
+
+        def build():
+            return Response(self.get_serializer(session).data)
+
+        if session.status == 'running':
+            return conditional_response(request, build)
+
+        max_age = None
+        if session.status in rollup.FINISHED_STATUSES:
+            max_age = get_setting('FINISHED_SESSION_MAX_AGE')
+
+        return conditional_response(
+            request,
+            build,
+            etag=make_etag(session.pk, session.updated_at, self.get_sparse_fields()),
+            last_modified=session.updated_at,
+            max_age=max_age
+        )
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream the user's session history as NDJSON or CSV
+
+        Query parameters: output (ndjson or csv), from/to (YYYY-MM-DD,
+        inclusive), status, fields/omit, and gzip=1 for a .gz download.
+        """
+        export_format = request.query_params.get('output', 'ndjson')
+        status_filter = request.query_params.get('status')
+
+        try:
+            first_day = _parse_date(request.query_params.get('from'))
+            last_day = _parse_date(request.query_params.get('to'))
+            if status_filter and status_filter not in dict(TimerSession.STATUS_CHOICES):
+                raise ValueError(f"Unknown status '{status_filter}'")
+
+            engine = TimerEngine(user=request.user)
+            sources = engine.get_history_sources(
+                start_date=_day_start(first_day),
+                end_date=_day_end(last_day),
+                status=status_filter
+            )
+            lines = export_lines(sources, export_format, fields=self.get_sparse_fields())
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        compress = request.query_params.get('gzip') in ('1', 'true')
+        filename = f'sessions.{export_format}'
+        chunks = encode_chunks(lines, compress=compress)
+
+        # Under ASGI Django would buffer a sync iterator before sending it
+        if isinstance(request._request, ASGIRequest):
+            chunks = async_chunks(chunks)
+
+        if compress:
+            response = StreamingHttpResponse(chunks, content_type='application/gzip')
+            filename += '.gz'
+        else:
+            response = StreamingHttpResponse(
+                chunks,
+                content_type=f'{CONTENT_TYPES[export_format]}; charset=utf-8'
+            )
+
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    @action(detail=False, methods=['post'], url_path='import', url_name='import')
+    def import_sessions(self, request):
+        """
+        Import historical sessions from an NDJSON or CSV request body
+
+        The body is read line by line (or from a multipart 'file' upload).
+        The format comes from ?input=ndjson|csv, or from a text/csv
+        content type. Invalid rows are reported and skipped.
+        """
+        upload = None
+        if request.content_type.startswith('multipart/form-data'):
+            upload = request.FILES.get('file')
+            if upload is None:
+                return Response(
+                    {'error': "Upload the records as 'file'"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        content_type = upload.content_type if upload else request.content_type
+        default_format = 'csv' if content_type.startswith('text/csv') else 'ndjson'
+        import_format = request.query_params.get('input', default_format)
+
+        try:
+            records = read_records(decode_lines(upload or request.stream or []), import_format)
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        result = import_sessions(request.user, records)
+        return Response(result.as_dict())
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.get_sparse_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    def get_sparse_fields(self):
+        """Return the fields requested with ?fields= / ?omit=, or None for all"""
+        fields = _parse_field_list(self.request.query_params.get('fields'))
+        omit = _parse_field_list(self.request.query_params.get('omit'))
+        if fields is None and omit is None:
+            return None
+
+        return TimerSessionSerializer.select_fields(fields, omit)
 
 
 class SettingsViewSet(viewsets.ViewSet):
@@ -160,8 +561,14 @@ class SettingsViewSet(viewsets.ViewSet):
         """Get user settings"""
         engine = TimerEngine(user=request.user)
         settings = engine.get_or_create_settings()
-        serializer = TimerSettingsSerializer(settings)
-        return Response(serializer.data)
+
+        return conditional_response(
+            request,
+            lambda: Response(TimerSettingsSerializer(settings).data),
+            etag=make_etag(*[
+                getattr(settings, name) for name in TimerSettingsSerializer.Meta.fields
+            ])
+        )
 
     def update(self, request):
         """Update user settings"""
@@ -170,35 +577,134 @@ class SettingsViewSet(viewsets.ViewSet):
 
         serializer = TimerSettingsSerializer(settings, data=request.data)
         if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data)
+            # Saved through the engine, which creates the row on first change
+            settings = engine.update_settings(**serializer.validated_data)
+            return Response(TimerSettingsSerializer(settings).data)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+# Server-Sent Events
+def timer_events_view(request):
+    """
+    Stream the user's timer events as Server-Sent Events (WSGI)
+
+    A new connection first gets the current session and stats; a
+    reconnecting EventSource sends Last-Event-ID and gets what it missed.
+    The stream closes after TASK_TIMER_PUSH_EVENTS_STREAM_TIMEOUT seconds
+    and the browser reconnects, so a WSGI worker is never held forever.
+    Under ASGI, task_timer.async_urls serves async_views.timer_events_view
+    instead, which does not hold a thread.
+    """
+    error = events_unavailable(request.user)
+    if error:
+        return error
+
+    return event_stream_response(_event_stream(request.user, last_event_id(request)))
+
+
+def events_unavailable(user):
+    """Return the error response for an event stream request, or None"""
+    if not user.is_authenticated:
+        return JsonResponse(
+            {'detail': 'Authentication credentials were not provided.'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    if not events.is_enabled():
+        return JsonResponse(
+            {'detail': 'Push events are disabled'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    return None
+
+
+def last_event_id(request):
+    """Return the Last-Event-ID a reconnecting EventSource sent, or None"""
+    try:
+        return int(request.headers['Last-Event-ID'])
+    except (KeyError, ValueError):
+        return None
+
+
+def event_stream_response(stream):
+    """Wrap an SSE message iterator (sync or async) in a streaming response"""
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _event_stream(user, after_id):
+    """Yield SSE messages for a user until the stream timeout"""
+    poll_interval = get_setting('PUSH_EVENTS_POLL_INTERVAL')
+    keepalive = get_setting('PUSH_EVENTS_KEEPALIVE')
+    deadline = monotonic() + get_setting('PUSH_EVENTS_STREAM_TIMEOUT')
+
+    yield 'retry: 3000\n\n'
+
+    if after_id is None:
+        after_id = events.last_event_id(user.pk)
+        engine = TimerEngine(user=user)
+        session = engine.get_active_session()
+        yield events.format_sse('session', TimerSessionSerializer(session).data if session else None)
+        yield events.format_sse('stats', engine.get_dashboard_stats())
+
+    last_sent = monotonic()
+
+    while True:
+        for event in events.read_events(user.pk, after_id):
+            after_id = event['id']
+            yield events.format_sse(event['event'], event['data'], event_id=event['id'])
+            last_sent = monotonic()
+
+        now = monotonic()
+        if now >= deadline:
+            return
+
+        if now - last_sent >= keepalive:
+            yield ': keep-alive\n\n'
+            last_sent = now
+
+        sleep(poll_interval)
+
+
 # Frontend views
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from task_timer.pagination import SessionCursorPagination, paginate_keyset
 
 
 @login_required
 def dashboard_view(request):
     """Dashboard with timer interface"""
-    return render(request, 'task_timer/dashboard.html')
+    return render(request, 'task_timer/dashboard.html', {
+        # The page only opens an event stream when the server publishes events
+        'push_events': events.is_enabled(),
+        # ... and only pings while abandoned sessions are detected, no more
+        # often than a ping can write last_seen
+        'keepalive_interval': get_setting('LAST_SEEN_INTERVAL') if liveness_enabled() else None,
+    })
 
 
 @login_required
 def history_view(request):
     """Session history page"""
     sessions = TimerSession.objects.filter(created_by=request.user)
-    paginator = Paginator(sessions, 20)
 
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    archived = None
+    if archive.is_enabled():
+        archived = ArchivedTimerSession.objects.filter(created_by=request.user)
+
+    try:
+        page = paginate_keyset(sessions, request.GET.get('cursor'), 20, archive=archived)
+    except ValueError:
+        page = paginate_keyset(sessions, None, 20, archive=archived)
 
     return render(request, 'task_timer/history.html', {
-        'sessions': page_obj
+        'sessions': page
     })
 
 
@@ -209,11 +715,12 @@ def settings_view(request):
     settings = engine.get_or_create_settings()
 
     if request.method == 'POST':
-        settings.work_duration = int(request.POST.get('work_duration', 25))
-        settings.short_break_duration = int(request.POST.get('short_break_duration', 5))
-        settings.long_break_duration = int(request.POST.get('long_break_duration', 15))
-        settings.auto_start_breaks = 'auto_start_breaks' in request.POST
-        settings.save()
+        engine.update_settings(
+            work_duration=int(request.POST.get('work_duration', 25)),
+            short_break_duration=int(request.POST.get('short_break_duration', 5)),
+            long_break_duration=int(request.POST.get('long_break_duration', 15)),
+            auto_start_breaks='auto_start_breaks' in request.POST
+        )
         return redirect('task_timer:settings-view')
 
     return render(request, 'task_timer/settings.html', {
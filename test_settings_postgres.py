@@ -0,0 +1,23 @@
+"""
+Django settings for testing django-task-timer against PostgreSQL
+
+Connection details come from the standard PG* environment variables.
+Set TASK_TIMER_PARTITION_SESSIONS=1 to run migration 0009's conversion
+and the whole suite against the partitioned table.
+"""
+import os
+
+from test_settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('PGDATABASE', 'task_timer'),
+        'USER': os.environ.get('PGUSER', 'postgres'),
+        'PASSWORD': os.environ.get('PGPASSWORD', ''),
+        'HOST': os.environ.get('PGHOST', 'localhost'),
+        'PORT': os.environ.get('PGPORT', '5432'),
+    }
+}
+
+TASK_TIMER_PARTITION_SESSIONS = os.environ.get('TASK_TIMER_PARTITION_SESSIONS') == '1'
@@ -7,5 +7,5 @@ from django.urls import path, include
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("accounts/", include("django.contrib.auth.urls")),  # Login/logout URLs
-    path("timer/", include("task_timer.urls")),
+    path("timer/", include("task_timer.async_urls")),  # Async hot endpoints under ASGI
 ]